@@ -2,10 +2,18 @@ from google.adk.agents import LlmAgent
 from .sub_agents.architecture_agent import architecture_summarizer_agent
 from .sub_agents.tools.github_tools import extract_owner_and_repo
 from .sub_agents.constants import repo_navigator_model
-from google.adk.sessions import InMemorySessionService
+from .sub_agents.history_budget import HISTORY_PERSIST_OFFLOADED, HistoryBudgetPlugin
+from .sub_agents.tools.artifacts import ARTIFACT_DIR, TOOL_RESULT_ARTIFACTS
+from .sub_agents.tools.async_github_tools import aclose_async_clients
+from .sub_agents.tools.backends import close_backends
+from .sub_agents.tools.metrics import METRICS_PORT, start_metrics_server
+from .session_store import session_service_from_env
+from google.adk.artifacts import FileArtifactService
 from google.adk.runners import Runner
 from google.adk.apps.app import App, EventsCompactionConfig
+from google.adk.plugins.base_plugin import BasePlugin
 from google.adk.plugins.logging_plugin import LoggingPlugin 
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -43,6 +51,17 @@ root_agent = LlmAgent(
     )
 
 
+class ToolResourcesPlugin(BasePlugin):
+    """Releases the tools' GitHub connections and local backends when the runner is closed (`await runner.close()`)."""
+
+    def __init__(self):
+        super().__init__(name="tool_resources")
+
+    async def close(self) -> None:
+        await aclose_async_clients()
+        await asyncio.to_thread(close_backends)
+
+
 root_app_compacting = App(
     name="repo_analysis_app_compacting",
     root_agent=root_agent,
@@ -51,14 +70,22 @@ root_app_compacting = App(
         overlap_size=1,  # Keep 1 previous turn for context
     ), 
     plugins=[
-        LoggingPlugin()
+        LoggingPlugin(),
+        HistoryBudgetPlugin(),
+        ToolResourcesPlugin(),
     ],
 )
 
-session_service = InMemorySessionService() 
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
+
+session_service = session_service_from_env()
+# Also holds the tool results HistoryBudgetPlugin offloads, so recall_tool_result outlives session trimming.
+artifact_service = FileArtifactService(ARTIFACT_DIR) if TOOL_RESULT_ARTIFACTS or HISTORY_PERSIST_OFFLOADED else None
 runner = Runner(
     app=root_app_compacting,
     session_service=session_service ,
+    artifact_service=artifact_service,
 )
 
 
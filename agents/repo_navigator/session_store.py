@@ -0,0 +1,390 @@
+# session_store.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from .sub_agents.tools.utils import logger
+
+# "sqlite" (default) or "memory" (InMemorySessionService, for local experiments).
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite").lower()
+# SQLite file shared by all runner processes on the host.
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", ".cache/repo_navigator/sessions.sqlite3")
+# Per-session caps: the oldest events are dropped past either one.
+SESSION_MAX_EVENTS = int(os.getenv("SESSION_MAX_EVENTS", "400"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(8 * 1024 * 1024)))
+# Newest events `get_session` loads when the caller asks for no limit (the runner never does); 0 loads all.
+SESSION_LOAD_EVENTS = int(os.getenv("SESSION_LOAD_EVENTS", "200"))
+# Sessions idle for longer than this are deleted; checked at most every SESSION_EVICT_INTERVAL seconds.
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", str(7 * 24 * 3600)))
+SESSION_EVICT_INTERVAL = float(os.getenv("SESSION_EVICT_INTERVAL", "600"))
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " app_name TEXT NOT NULL, user_id TEXT NOT NULL, id TEXT NOT NULL, state TEXT NOT NULL,"
+    " last_update_time REAL NOT NULL, event_count INTEGER NOT NULL DEFAULT 0,"
+    " event_bytes INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (app_name, user_id, id))",
+    "CREATE INDEX IF NOT EXISTS sessions_last_update ON sessions(last_update_time)",
+    "CREATE TABLE IF NOT EXISTS events ("
+    " seq INTEGER PRIMARY KEY AUTOINCREMENT, app_name TEXT NOT NULL, user_id TEXT NOT NULL,"
+    " session_id TEXT NOT NULL, timestamp REAL NOT NULL, size INTEGER NOT NULL, data TEXT NOT NULL,"
+    " boundary INTEGER NOT NULL DEFAULT 1)",
+    "CREATE INDEX IF NOT EXISTS events_session ON events(app_name, user_id, session_id, seq)",
+    "CREATE TABLE IF NOT EXISTS app_states (app_name TEXT PRIMARY KEY, state TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS user_states ("
+    " app_name TEXT NOT NULL, user_id TEXT NOT NULL, state TEXT NOT NULL, PRIMARY KEY (app_name, user_id))",
+)
+
+
+# Where a session's history may start (events.boundary): at a user message, at any
+# event that is not a tool response, or not at all (it answers the call before it).
+_TOOL_RESPONSE, _EVENT, _TURN = 0, 1, 2
+
+
+def _boundary(event: Event) -> int:
+    if event.get_function_responses():
+        return _TOOL_RESPONSE
+    return _TURN if event.author == "user" else _EVENT
+
+
+def _first_boundary(boundaries: list[int], start: int = 0) -> int | None:
+    """Index of the first turn start at or after `start`, else of the first event that is not a tool response."""
+    for wanted in (_TURN, _EVENT):
+        found = next((i for i in range(start, len(boundaries)) if boundaries[i] >= wanted), None)
+        if found is not None:
+            return found
+    return None
+
+
+def _split_state(delta: dict | None) -> tuple[dict, dict, dict]:
+    """Split a state delta into (app, user, session) parts; temp: keys are dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in (delta or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+# -----------------------------
+# SqliteSessionService
+# -----------------------------
+class SqliteSessionService(BaseSessionService):
+    """
+    ADK session service persisted in one SQLite file.
+
+    Nothing is kept in process memory between calls: `get_session` loads the
+    events it is asked for (`GetSessionConfig.num_recent_events` /
+    `after_timestamp` become SQL limits; without a limit, the newest
+    `load_events`, starting at a turn) and `list_sessions` loads none, so a
+    worker's memory stays flat however many sessions it has served.
+
+    Each session is capped at `max_events` events and `max_bytes` of serialized
+    events; past either cap the oldest turns are dropped. History is only cut
+    where a turn starts, or, within a turn that alone exceeds the caps, before
+    an event that is not a tool response, so a function call is never kept
+    without its response or vice versa. Sessions idle for
+    longer than `idle_ttl` seconds are deleted, checked at most every
+    `evict_interval` seconds on writes (or explicitly with `evict_idle`).
+
+    Several runner processes can share the file: it runs in WAL mode, writes
+    are `BEGIN IMMEDIATE` transactions, and appending to a session that another
+    process updated after it was loaded fails with ValueError, as in ADK's own
+    database service. Blocking SQLite calls run in worker threads.
+    """
+
+    def __init__(self, db_path: str, max_events: int = SESSION_MAX_EVENTS, max_bytes: int = SESSION_MAX_BYTES,
+                 idle_ttl: float = SESSION_IDLE_TTL, evict_interval: float = SESSION_EVICT_INTERVAL,
+                 load_events: int = SESSION_LOAD_EVENTS):
+        self.db_path = db_path
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.load_events = load_events
+        self.idle_ttl = idle_ttl
+        self.evict_interval = evict_interval
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._last_eviction = 0.0
+        self._counters = {"events_appended": 0, "events_trimmed": 0, "sessions_evicted": 0}
+
+    # ---- storage ----
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (importing the agent creates no files)."""
+        if self._db is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                db.execute(statement)
+            if "boundary" not in {column[1] for column in db.execute("PRAGMA table_info(events)")}:
+                # Files written before events recorded their boundary.
+                db.execute("ALTER TABLE events ADD COLUMN boundary INTEGER NOT NULL DEFAULT 1")
+            self._db = db
+        return self._db
+
+    def _run(self, fn, *args):
+        """Run `fn(db, *args)` in one transaction (writes take the lock up front)."""
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(db, *args)
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            return result
+
+    async def _call(self, fn, *args):
+        return await asyncio.to_thread(self._run, fn, *args)
+
+    @staticmethod
+    def _merge_scoped(db, table: str, where: tuple, delta: dict) -> None:
+        if not delta:
+            return
+        columns = ("app_name",) if table == "app_states" else ("app_name", "user_id")
+        condition = " AND ".join(f"{c} = ?" for c in columns)
+        row = db.execute(f"SELECT state FROM {table} WHERE {condition}", where).fetchone()
+        state = {**(json.loads(row[0]) if row else {}), **delta}
+        db.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, state) VALUES ({', '.join('?' * len(where))}, ?)",
+            (*where, json.dumps(state)),
+        )
+
+    @staticmethod
+    def _scoped_state(db, app_name: str, user_id: str) -> dict:
+        """app: and user: keys to merge into a loaded session's state."""
+        merged = {}
+        row = db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        if row:
+            merged.update({State.APP_PREFIX + k: v for k, v in json.loads(row[0]).items()})
+        row = db.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)).fetchone()
+        if row:
+            merged.update({State.USER_PREFIX + k: v for k, v in json.loads(row[0]).items()})
+        return merged
+
+    @staticmethod
+    def _delete(db, app_name: str, user_id: str, session_id: str) -> None:
+        db.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", (app_name, user_id, session_id))
+        db.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", (app_name, user_id, session_id))
+
+    # ---- BaseSessionService ----
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        now = time.time()
+
+        def create(db):
+            app, user, session_state = _split_state(state)
+            try:
+                db.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, last_update_time) VALUES (?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, json.dumps(session_state), now),
+                )
+            except sqlite3.IntegrityError:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            self._merge_scoped(db, "app_states", (app_name,), app)
+            self._merge_scoped(db, "user_states", (app_name, user_id), user)
+            return {**session_state, **self._scoped_state(db, app_name, user_id)}
+
+        merged = await self._call(create)
+        await self._maybe_evict()
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged, last_update_time=now)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        def load(db):
+            row = db.execute(
+                "SELECT state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            query = "SELECT data, boundary FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: list = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY seq DESC"
+            limit = config.num_recent_events if config and config.num_recent_events else None
+            if limit or self.load_events:
+                query += " LIMIT ?"
+                params.append(limit or self.load_events)
+            rows = db.execute(query, params).fetchall()[::-1]
+            if not limit and self.load_events and len(rows) == self.load_events:
+                # The default window may begin mid-turn; start it where the history can be cut.
+                rows = rows[_first_boundary([b for _, b in rows]) or 0:]
+            return row, [data for data, _ in rows], self._scoped_state(db, app_name, user_id)
+
+        loaded = await self._call(load)
+        if loaded is None:
+            return None
+        (state, last_update_time), events, scoped = loaded
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state={**json.loads(state), **scoped},
+            events=[Event.model_validate_json(data) for data in events],
+            last_update_time=last_update_time,
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        def list_rows(db):
+            query = "SELECT user_id, id, state, last_update_time FROM sessions WHERE app_name = ?"
+            params: list = [app_name]
+            if user_id is not None:
+                query += " AND user_id = ?"
+                params.append(user_id)
+            rows = db.execute(query + " ORDER BY last_update_time", params).fetchall()
+            scoped = {uid: self._scoped_state(db, app_name, uid) for uid in {r[0] for r in rows}}
+            return rows, scoped
+
+        rows, scoped = await self._call(list_rows)
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=uid, id=sid, state={**json.loads(state), **scoped[uid]},
+                    last_update_time=updated)
+            for uid, sid, state, updated in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._call(self._delete, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = self._trim_temp_delta_state(event)
+        data = event.model_dump_json(exclude_none=True)
+
+        def append(db):
+            row = db.execute(
+                "SELECT state, last_update_time, event_count, event_bytes FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                (session.app_name, session.user_id, session.id),
+            ).fetchone()
+            if row is None:
+                logger.warning("Failed to append event to session %s: session not found", session.id)
+                return False
+            state, last_update_time, count, size = row
+            if last_update_time > session.last_update_time:
+                raise ValueError(
+                    f"The last_update_time provided in the session object {session.last_update_time} is earlier "
+                    f"than the update_time in storage {last_update_time}. Please check if it is a stale session."
+                )
+
+            app, user, session_delta = _split_state(event.actions.state_delta if event.actions else None)
+            self._merge_scoped(db, "app_states", (session.app_name,), app)
+            self._merge_scoped(db, "user_states", (session.app_name, session.user_id), user)
+            db.execute(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, size, data, boundary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, event.timestamp, len(data), data, _boundary(event)),
+            )
+            count, size = count + 1, size + len(data)
+            if count > self.max_events or size > self.max_bytes:
+                count, size = self._trim(db, session, count, size)
+            db.execute(
+                "UPDATE sessions SET state = ?, last_update_time = ?, event_count = ?, event_bytes = ? "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps({**json.loads(state), **session_delta}), event.timestamp, count, size,
+                 session.app_name, session.user_id, session.id),
+            )
+            return True
+
+        if await self._call(append):
+            await super().append_event(session=session, event=event)
+            session.last_update_time = event.timestamp
+            self._counters["events_appended"] += 1
+            await self._maybe_evict()
+        return event
+
+    def _trim(self, db, session: Session, count: int, size: int) -> tuple[int, int]:
+        """
+        Drop the oldest events (never the newest) until the session fits its caps,
+        cutting at the first boundary (see `_first_boundary`) at or after the
+        oldest event that has to stay.
+        """
+        rows = db.execute(
+            "SELECT seq, size, boundary FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+            (session.app_name, session.user_id, session.id),
+        ).fetchall()
+        keep, left, left_size = len(rows) - 1, count, size
+        for i, (_, event_size, _) in enumerate(rows[:-1]):
+            if left <= self.max_events and left_size <= self.max_bytes:
+                keep = i
+                break
+            left, left_size = left - 1, left_size - event_size
+        if keep <= 0:
+            return count, size
+
+        cut = _first_boundary([b for _, _, b in rows], keep)
+        cut = keep if cut is None else cut
+        db.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq < ?",
+            (session.app_name, session.user_id, session.id, rows[cut][0]),
+        )
+        self._counters["events_trimmed"] += cut
+        return count - cut, size - sum(event_size for _, event_size, _ in rows[:cut])
+
+    # ---- eviction ----
+    def evict_idle(self, now: float | None = None) -> int:
+        """Delete sessions idle for longer than `idle_ttl`; returns how many were deleted."""
+        cutoff = (now or time.time()) - self.idle_ttl
+
+        def evict(db):
+            idle = db.execute("SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?", (cutoff,)).fetchall()
+            for app_name, user_id, session_id in idle:
+                self._delete(db, app_name, user_id, session_id)
+            return len(idle)
+
+        evicted = self._run(evict)
+        self._counters["sessions_evicted"] += evicted
+        if evicted:
+            logger.info("Evicted %s idle sessions from %s", evicted, self.db_path)
+        return evicted
+
+    async def _maybe_evict(self) -> None:
+        now = time.time()
+        if now - self._last_eviction < self.evict_interval:
+            return
+        self._last_eviction = now
+        await asyncio.to_thread(self.evict_idle, now)
+
+    def stats(self) -> dict:
+        """Stored sessions/events plus this process's append, trim and eviction counters."""
+        sessions, events, size = self._run(
+            lambda db: db.execute(
+                "SELECT (SELECT COUNT(*) FROM sessions), COUNT(*), COALESCE(SUM(size), 0) FROM events"
+            ).fetchone()
+        )
+        return {**self._counters, "sessions": sessions, "events": events, "event_bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def session_service_from_env() -> BaseSessionService:
+    """Session service selected by SESSION_STORE ("sqlite" at SESSION_DB_PATH, or "memory")."""
+    if SESSION_STORE == "memory":
+        return InMemorySessionService()
+    if SESSION_STORE != "sqlite":
+        raise ValueError(f"Unknown SESSION_STORE '{SESSION_STORE}'; use 'sqlite' or 'memory'.")
+    return SqliteSessionService(SESSION_DB_PATH)
@@ -1,7 +1,8 @@
 from google.adk.agents import LlmAgent
-from google.adk.tools import AgentTool
-from .tools.github_tools import get_repo_structure
-from .file_summarizer_agent import file_architecture_summarizer_agent
+from .tools.async_github_tools import find_symbols, get_dependency_graph, get_repo_structure
+from .batch_summarizer import code_summarizer_tool, summarize_files
+from .history_budget import recall_tool_result
+from .tools.artifacts import read_artifact
 from .constants import repo_navigator_model
 
 INSTRUCTION_ARCHITECTURE = """
@@ -36,11 +37,16 @@ The goal is to answer the **ORIGINAL USER QUESTION**. Follow these steps strictl
 3.  Use the `owner` and `repo_name` established from the context.
 4.  On SUBSEQUENT queries about the SAME repository, you may skip this step if repo structure is already available in conversation history and sufficient to answer.
 5. if you need to know about deeper structure later, you can call get_repo_structure again with higher max_depth or optional module present in the repository.
+6. The structure is a compact listing: one entry per line, children indented one space under their directory, directories end with "/", files are followed by their size in bytes, "/…" marks a directory deeper than max_depth. A file's path is its parent directory names joined with "/" (prefixed by "root" when set).
+7. If the result has "next_cursor", the listing is one page of a larger tree; call get_repo_structure again with cursor=<next_cursor> only if the files you need are not listed yet.
+8. If the result has "artifact" instead of the full listing, it was stored by reference: use its "preview", and call `read_artifact` with that artifact and a line range only for the parts you need.
 
 ### STEP 2: Analyze and Identify Files
+0.  For "where is X defined", "what does module Y define/export" or signature questions, call `find_symbols` (query=<name> or path=<file>) first. If its result answers the question, skip STEP 3 and answer from it in STEP 4.
 1.  Analyze the **ORIGINAL USER QUESTION** and the available repository structure.
+    For "flow", "pipeline", "how does it start/run" or "how do modules depend on each other" questions, call `get_dependency_graph` once (no path) to get the detected entry points and most imported modules; to follow one entry point, call it with path=<entry point file> and depth=2. Pick the files to summarize from its results instead of guessing from file names.
 2.  Intelligently identify relevant files that match the question:
-    * For "flow" or "pipeline" questions: Look for main entry points, scripts with names suggesting workflow (transcribe, process, pipeline, etc.)
+    * For "flow" or "pipeline" questions: Use the entry points and their imports from `get_dependency_graph`; otherwise look for scripts with names suggesting workflow (transcribe, process, pipeline, etc.)
     * For "what does X do": Look for files with X in the name or core logic files
     * For architecture/structure questions: Look at key modules and their relationships
 3.  **Be proactive:** If the question mentions "ex: transcript flow" and you see file names similar "transcribe.py" or "batch_transcribe.py", use those files. Do not ask the user to clarify.
@@ -49,8 +55,9 @@ The goal is to answer the **ORIGINAL USER QUESTION**. Follow these steps strictl
     **Constraint:** If more than 5 relevant files are identified, stop and ask the user to narrow the scope based on question and available repo information.
 
 ### STEP 3: Summarize Identified Files (Tool Use)
-1.  For each identified file path in STEP 2, you **MUST** call: **`code_summarizer`** iteratively.
-2.  You **MUST** ensure the request argument uses the **STRICT FORMAT**:
+1.  If exactly ONE file was identified in STEP 2, you **MUST** call **`code_summarizer`** for it.
+    If TWO OR MORE files were identified, you **MUST** call **`summarize_files`** ONCE with owner, repo_name, question=<original user question> and file_paths=<all identified paths>; it summarizes them in parallel and returns the summaries in the same order. Entries with "error" have no summary; answer from the others.
+2.  For `code_summarizer`, you **MUST** ensure the request argument uses the **STRICT FORMAT**:
     `<original user question> for owner:<owner> repo:<repo> githuburl:<github url with file path>`
     Example: "what is the flow for owner:VandanaJn repo:yt-channel-crawler githuburl:https://github.com/VandanaJn/yt-channel-crawler/blob/main/batch_transcribe_v3.py"
 3.  After receiving all necessary summaries, proceed to STEP 4.
@@ -61,11 +68,18 @@ The goal is to answer the **ORIGINAL USER QUESTION**. Follow these steps strictl
 1.  Synthesize the final answer based on the information from structure and file summaries:
     * **If file summaries were generated (Specific Question):** Combine the summaries into a concise, deterministic answer that directly addresses the **ORIGINAL USER QUESTION**.
     * **If only structure was generated (High-Level Question):** Summarize the repository's purpose, key files, and modules based **only** on the top-level structure data.
-    * Never include facts of repository that are not in the structure or file summaries.
+    * Never include facts of repository that are not in the structure, symbol lookups, dependency graph or file summaries.
 2.  **FINAL OUTPUT RULE:** Output MUST be concise, short, clear, and deterministic. No conversational openers, greetings, or commentary about tools or reasoning.
 """
 
 
+def compact_structure_by_default(tool, args, tool_context):
+    """before_tool_callback: request the token-efficient structure listing unless the model picked a format."""
+    if tool.name == "get_repo_structure":
+        args.setdefault("output_format", "compact")
+    return None
+
+
 DESCRIPTION_ARCHITECTURE = "A deterministic specialist for GitHub repository analysis. It uses established OWNER/REPO context to fetch code structure, summarize files, and provide concise, consistent answers regarding code architecture and flow."
 
 
@@ -74,5 +88,6 @@ architecture_summarizer_agent = LlmAgent(
     model=repo_navigator_model,
     instruction=INSTRUCTION_ARCHITECTURE,
     description=DESCRIPTION_ARCHITECTURE,
-    tools=[get_repo_structure, AgentTool(file_architecture_summarizer_agent)],
+    tools=[get_repo_structure, code_summarizer_tool, find_symbols, get_dependency_graph, summarize_files, recall_tool_result, read_artifact],
+    before_tool_callback=compact_structure_by_default,
 )
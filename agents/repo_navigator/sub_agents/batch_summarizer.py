@@ -0,0 +1,93 @@
+# batch_summarizer.py
+import asyncio
+import os
+import time
+
+from google.adk.tools import ToolContext
+
+from .file_summarizer_agent import file_architecture_summarizer_agent
+from .summary_cache import CachedAgentTool, summary_cache
+from .tools import github_tools
+from .tools.utils import logger, error_response, tool_safety
+
+# Files summarized at once by one summarize_files call, the most it accepts,
+# and how long one file may take before its summary is given up on.
+SUMMARIZE_FILES_CONCURRENCY = int(os.getenv("SUMMARIZE_FILES_CONCURRENCY", "5"))
+SUMMARIZE_FILES_MAX = int(os.getenv("SUMMARIZE_FILES_MAX", "5"))
+SUMMARIZE_FILE_TIMEOUT = float(os.getenv("SUMMARIZE_FILE_TIMEOUT", "90"))
+
+# The summarizer as a tool; shared by the architecture agent and summarize_files
+# so both go through the same summary cache.
+code_summarizer_tool = CachedAgentTool(file_architecture_summarizer_agent, summary_cache)
+
+
+def _default_branch(owner: str, repo_name: str) -> str | None:
+    backend = github_tools.get_backend(owner, repo_name)
+    if not backend:
+        return None
+    branch = backend.default_branch(f"{owner}/{repo_name}")
+    return branch if isinstance(branch, str) else None
+
+
+@tool_safety("summarize_files")
+async def summarize_files(
+    owner: str,
+    repo_name: str,
+    question: str,
+    file_paths: list[str],
+    branch: str | None = None,
+    tool_context: ToolContext = None,
+) -> dict:
+    """
+    Summarize several files of a repository concurrently for one question.
+
+    Runs `code_summarizer` on every file at the same time (at most
+    SUMMARIZE_FILES_CONCURRENCY at once) and returns the summaries in the order
+    the files were given. A file that takes longer than SUMMARIZE_FILE_TIMEOUT
+    seconds or fails gets an error entry instead of holding up the others.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        question (str): The original user question the summaries should answer.
+        file_paths (list[str]): Paths of the files to summarize (at most SUMMARIZE_FILES_MAX).
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        tool_context (ToolContext): Injected by ADK; passed on to the summarizer.
+
+    Returns:
+        dict: {"summaries": [{"path", "summary"} | {"path", "error"}], "seconds": float}
+            or {"error": {...}} on failure
+    """
+    paths = list(dict.fromkeys(p.strip("/") for p in file_paths if p and p.strip("/")))
+    if not paths:
+        return error_response("Pass at least one file path.")
+    if len(paths) > SUMMARIZE_FILES_MAX:
+        return error_response(f"At most {SUMMARIZE_FILES_MAX} files can be summarized at once; narrow the scope.")
+
+    ref = branch or await asyncio.to_thread(_default_branch, owner, repo_name)
+    if not ref:
+        return error_response(f"Could not determine the default branch of '{owner}/{repo_name}'.")
+
+    semaphore = asyncio.Semaphore(SUMMARIZE_FILES_CONCURRENCY)
+    started = time.perf_counter()
+
+    async def summarize(path: str) -> dict:
+        url = f"https://github.com/{owner}/{repo_name}/blob/{ref}/{path}"
+        args = {"request": f"{question} for owner:{owner} repo:{repo_name} githuburl:{url}"}
+        async with semaphore:
+            try:
+                summary = await asyncio.wait_for(
+                    code_summarizer_tool.run_async(args=args, tool_context=tool_context),
+                    timeout=SUMMARIZE_FILE_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Summary of %s/%s:%s timed out", owner, repo_name, path)
+                return {"path": path, "error": f"Summary timed out after {SUMMARIZE_FILE_TIMEOUT:g}s."}
+            except Exception as e:
+                logger.exception("Summary of %s/%s:%s failed: %s", owner, repo_name, path, e)
+                return {"path": path, "error": "Summary failed."}
+        return {"path": path, "summary": summary}
+
+    summaries = await asyncio.gather(*(summarize(path) for path in paths))
+    return {"summaries": list(summaries), "seconds": round(time.perf_counter() - started, 3)}
@@ -1,5 +1,6 @@
 from google.adk.agents import LlmAgent
-from .tools.github_tools import read_file_content
+from .tools.artifacts import read_artifact
+from .tools.async_github_tools import read_file_content, read_files
 from .constants import repo_navigator_model
 
 INSTRUCTION_FILE_SUMMARIZER = """
@@ -15,10 +16,12 @@ to understand the flow and architecture of the system.
    Never assume or guess.
 
 3. NEVER ask the user for owner/repo if both are already present in the URL.
-4. Extract the filename/path
+4. Extract the filename/path. If the request names several files, read them all with ONE `read_files` call instead of calling `read_file_content` per file. If a result is `truncated`, read the next part with `start_line` = its `end_line` + 1 only when the question needs it.
+   If a result has "artifact" instead of "content", the file was stored by reference: start from its "preview" and call `read_artifact` with that artifact and a line range for the parts the question needs.
 5. Summarize based on request and user's question to give the caller enough context about the file.
 6. Keep the facts, names, versions etc, don't make assumptions.
 7. Keep relevant code only, avoid including comments, or any non-essential parts, unless they are critical to answering the question.
+   File reads come back with comments, docstrings, license headers and generated code already removed ("[N lines elided: ...]" marks removed spans). Pass compact="signatures" to get only the outline of a very large file, or compact="none" when the question is about comments or docstrings.
 8. If the file is small just return code as it is after removing unnecessary comments.
 9. for other files summarize it to keep flow and architecture info clear and concise
 10. Do not look for performance, errors, security or any other issue in the code
@@ -32,11 +35,19 @@ to understand the flow and architecture of the system.
     <concise/short summary of file>
 """
 
+def compact_reads_by_default(tool, args, tool_context):
+    """before_tool_callback: strip comments and docstrings from file reads unless the model picked a mode."""
+    if tool.name in ("read_file_content", "read_files"):
+        args.setdefault("compact", "comments")
+    return None
+
+
 DESCRIPTION_FILE_SUMMARIZER = "An assistant that can read a file and summarize it to be useful for understanding architecture."
 file_architecture_summarizer_agent = LlmAgent(
     name="code_summarizer",
     model=repo_navigator_model, 
     instruction=INSTRUCTION_FILE_SUMMARIZER,
     description=DESCRIPTION_FILE_SUMMARIZER,
-    tools=[read_file_content]
+    tools=[read_file_content, read_files, read_artifact],
+    before_tool_callback=compact_reads_by_default,
 )
\ No newline at end of file
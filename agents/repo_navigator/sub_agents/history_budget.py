@@ -0,0 +1,219 @@
+# history_budget.py
+import hashlib
+import json
+import os
+import re
+import threading
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from .tools.utils import error_response, logger, tool_safety
+
+# Prompt budget in (estimated) tokens; past it, older tool results are offloaded.
+HISTORY_BUDGET_TOKENS = int(os.getenv("HISTORY_BUDGET_TOKENS", "12000"))
+CHARS_PER_TOKEN = 4
+# Tool results smaller than this stay inline; offloaded ones keep a preview this long.
+HISTORY_OFFLOAD_MIN_CHARS = int(os.getenv("HISTORY_OFFLOAD_MIN_CHARS", "2000"))
+HISTORY_PREVIEW_CHARS = int(os.getenv("HISTORY_PREVIEW_CHARS", "300"))
+# Most characters one recall_tool_result call returns.
+RECALL_MAX_CHARS = 20000
+# Keep offloaded results as session artifacts, so they can be recalled after the events
+# holding them are trimmed from the session or fall outside the window it loads.
+HISTORY_PERSIST_OFFLOADED = os.getenv("HISTORY_PERSIST_OFFLOADED", "true").lower() in ("1", "true", "yes")
+
+# How ADK renders another agent's tool result when it is shown to this agent.
+_FOREIGN_RESULT = re.compile(r"^(\[[^\]]+\] `[^`]+` tool returned result: )(.*)$", re.S)
+
+
+def _digest(rendered: str) -> str:
+    return hashlib.sha256(rendered.encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def result_handle(response) -> str:
+    """Stable handle for a tool result: a digest of how ADK renders it in prompts."""
+    return _digest(str(response))
+
+
+def _artifact_name(handle: str) -> str:
+    return f"offloaded-{handle}.json"
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_response:
+        return len(str(part.function_response.response))
+    if part.function_call:
+        return len(str(part.function_call.args))
+    return 0
+
+
+def _stub(handle: str, rendered: str) -> dict:
+    return {
+        "offloaded": handle,
+        "chars": len(rendered),
+        "preview": rendered[:HISTORY_PREVIEW_CHARS],
+        "note": "Older tool result removed from history; call recall_tool_result(handle) if it is needed again.",
+    }
+
+
+# -----------------------------
+# Prompt compaction
+# -----------------------------
+class HistoryBudgetPlugin(BasePlugin):
+    """
+    Keep model prompts within a size budget by offloading old tool results.
+
+    Before each model call, if the prompt is estimated above `budget_tokens`,
+    tool results from earlier turns (function responses, and other agents'
+    results that ADK renders as "... tool returned result: ..." text) larger
+    than `min_chars` are replaced, oldest first, with a stub holding a handle,
+    their size and a short preview, until the prompt fits. Results of the
+    current turn are never touched.
+
+    Only the outgoing request changes: session events keep the full results,
+    and `recall_tool_result` finds them again by handle. With an artifact service
+    on the runner (and HISTORY_PERSIST_OFFLOADED), each offloaded result is also
+    saved as a session artifact named by its handle, so it can still be recalled
+    once the session store has trimmed its event or no longer loads it. This complements the
+    app's invocation-count EventsCompactionConfig, which summarizes text turns
+    but leaves tool results of the uncompacted window in every prompt.
+    """
+
+    def __init__(self, budget_tokens: int = HISTORY_BUDGET_TOKENS, min_chars: int = HISTORY_OFFLOAD_MIN_CHARS):
+        super().__init__(name="history_budget")
+        self.budget_chars = budget_tokens * CHARS_PER_TOKEN
+        self.min_chars = min_chars
+        self._lock = threading.Lock()
+        self._counters = {"requests_compacted": 0, "results_offloaded": 0, "chars_saved": 0}
+
+    @staticmethod
+    def _turn_start(contents: list[types.Content], user_content: types.Content | None) -> int:
+        """Index of the current user message; everything from it on is the current turn."""
+        texts = {p.text for p in (user_content.parts or []) if p.text} if user_content else set()
+        for i in range(len(contents) - 1, -1, -1):
+            content = contents[i]
+            if content.role == "user" and any(p.text in texts for p in content.parts or [] if p.text):
+                return i
+        return max(len(contents) - 1, 0)
+
+    def compact(self, contents: list[types.Content], user_content: types.Content | None = None,
+                offloaded: dict | None = None) -> int:
+        """
+        Offload old tool results in `contents` (in place) until it fits; returns chars saved.
+        Each result offloaded is added to `offloaded` as {handle: (tool, JSON text)}.
+        """
+        total = sum(_part_chars(p) for c in contents for p in c.parts or [])
+        if total <= self.budget_chars:
+            return 0
+        saved = count = 0
+        for content in contents[: self._turn_start(contents, user_content)]:
+            for part in content.parts or []:
+                if total - saved <= self.budget_chars:
+                    break
+                size = _part_chars(part)
+                if size < self.min_chars:
+                    continue
+                if part.function_response and "offloaded" not in (part.function_response.response or {}):
+                    response = part.function_response.response
+                    rendered = str(response)
+                    part.function_response.response = stub = _stub(result_handle(response), rendered)
+                    saved += size - len(str(stub))
+                    payload = (part.function_response.name, json.dumps(response, ensure_ascii=False, default=str))
+                elif part.text and (match := _FOREIGN_RESULT.match(part.text)):
+                    stub = _stub(_digest(match[2]), match[2])
+                    part.text = match[1] + json.dumps(stub)
+                    saved += size - len(part.text)
+                    payload = (match[1].split("`")[1], match[2])
+                else:
+                    continue
+                count += 1
+                if offloaded is not None:
+                    offloaded[stub["offloaded"]] = payload
+        if count:
+            with self._lock:
+                self._counters["requests_compacted"] += 1
+                self._counters["results_offloaded"] += count
+                self._counters["chars_saved"] += saved
+            logger.info("Offloaded %s tool results (%s chars) from a %s char prompt", count, saved, total)
+        return saved
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest):
+        offloaded = {}
+        self.compact(llm_request.contents, callback_context.user_content, offloaded)
+        if offloaded and HISTORY_PERSIST_OFFLOADED:
+            await _persist(callback_context, offloaded)
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+async def _persist(context: CallbackContext, offloaded: dict) -> None:
+    """Save offloaded results not stored yet as artifacts of the session; skipped without an artifact service."""
+    try:
+        stored = set(await context.list_artifacts())
+        for handle, (tool, text) in offloaded.items():
+            if _artifact_name(handle) not in stored:
+                part = types.Part(text=json.dumps({"tool": tool, "content": text}, ensure_ascii=False))
+                await context.save_artifact(_artifact_name(handle), part)
+    except ValueError as e:  # no artifact service configured on the runner
+        logger.debug("Offloaded results kept in session events only: %s", e)
+
+
+# -----------------------------
+# Re-expansion
+# -----------------------------
+@tool_safety("recall_tool_result")
+async def recall_tool_result(handle: str, start: int = 0, max_chars: int = RECALL_MAX_CHARS,
+                             tool_context: ToolContext = None) -> dict:
+    """
+    Re-read a tool result that was removed from the conversation history.
+
+    Older tool results are replaced by {"offloaded": <handle>, "preview": ...}
+    stubs to keep prompts small. Call this only when the preview is not enough.
+
+    Args:
+        handle (str): The "offloaded" value from the stub.
+        start (int, optional): Character offset to read from. Defaults to 0.
+        max_chars (int, optional): Most characters to return. Defaults to 20000.
+        tool_context (ToolContext): Injected by ADK; the session holding the result.
+
+    Returns:
+        dict: {"tool", "content", "start", "end", "total_chars", "truncated"}
+            or {"error": {...}} if the result is no longer in the session
+    """
+    session = tool_context.session if tool_context else None
+    for event in reversed(session.events if session else []):
+        for response in event.get_function_responses():
+            if result_handle(response.response) == handle:
+                text = json.dumps(response.response, ensure_ascii=False, default=str)
+                return _recalled(response.name, text, start, max_chars)
+
+    # Trimmed from the session, or older than the events it loads: try the saved copy.
+    try:
+        part = await tool_context.load_artifact(_artifact_name(handle)) if tool_context else None
+    except ValueError:  # no artifact service configured on the runner
+        part = None
+    if part is not None and part.text is not None:
+        saved = json.loads(part.text)
+        return _recalled(saved["tool"], saved["content"], start, max_chars)
+    return error_response(f"No tool result with handle '{handle}' in this session; call the original tool again.")
+
+
+def _recalled(tool: str, text: str, start: int, max_chars: int) -> dict:
+    start = max(start, 0)
+    end = min(start + max(1, min(max_chars, RECALL_MAX_CHARS)), len(text))
+    return {
+        "tool": tool,
+        "content": text[start:end],
+        "start": start,
+        "end": end,
+        "total_chars": len(text),
+        "truncated": end < len(text),
+    }
@@ -0,0 +1,207 @@
+# summary_cache.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from google.adk.tools import AgentTool, ToolContext
+
+from .tools import async_github_tools
+from .tools.cache import ContentCache
+from .tools.utils import logger
+
+# Summaries older than this are regenerated even if the commit did not change
+# (the model or prompt may have improved).
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+SUMMARY_CACHE_MEMORY_BYTES = int(os.getenv("SUMMARY_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+# Optional SQLite file shared by worker processes and kept across restarts.
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH") or None
+SUMMARY_CACHE_DISK_BYTES = int(os.getenv("SUMMARY_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+
+# Question classes a summary can be reused for; the first class with a word
+# starting with one of its prefixes wins, anything else is a general "overview".
+# Narrow classes come first: "how does it read its config" is about config, and
+# "flow" only takes phrases that ask about control flow, not words like "work"
+# or "run" that most questions contain.
+QUESTION_INTENTS = (
+    ("config", ("config", "setting", "environment", "env var", "option", "flag")),
+    ("dependencies", ("depend", "import", "librar", "package", "requirement")),
+    ("api", ("function", "class", "method", "signature", "interface", "api", "define", "export", "parameter")),
+    ("flow", ("flow", "pipeline", "sequence", "step", "process", "lifecycle", "what happens", "how does", "how do",
+              "call graph", "call chain", "order of")),
+)
+_INTENT_PATTERNS = [
+    (intent, re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + ")"))
+    for intent, keywords in QUESTION_INTENTS
+]
+
+
+def question_intent(question: str) -> str:
+    """Normalize a question to the class of summary it needs."""
+    text = " ".join(question.lower().split())
+    for intent, pattern in _INTENT_PATTERNS:
+        if pattern.search(text):
+            return intent
+    return "overview"
+
+
+_REQUEST = re.compile(r"^(?P<question>.*?)\s+for\s+owner:\s*(?P<owner>\S+)\s+repo:\s*(?P<repo>\S+)\s+githuburl:\s*(?P<url>\S+)", re.S)
+
+
+def parse_summary_request(request: str) -> dict | None:
+    """
+    Split a `code_summarizer` request ("<question> for owner:<o> repo:<r> githuburl:<url>")
+    into question, owner, repo, ref and file path. Returns None when it does not
+    name a single file (`.../blob/<ref>/<path>`).
+    """
+    match = _REQUEST.match(request.strip())
+    if not match:
+        return None
+    segments = [s for s in urlparse(match["url"]).path.split("/") if s]
+    # owner / repo / blob / <ref> / <path...>
+    if len(segments) < 5 or segments[2] != "blob":
+        return None
+    return {
+        "question": match["question"],
+        "owner": match["owner"],
+        "repo": match["repo"],
+        "ref": segments[3],
+        "path": "/".join(segments[4:]),
+    }
+
+
+# -----------------------------
+# SummaryCache
+# -----------------------------
+class SummaryCache:
+    """
+    TTL + LRU cache of file summaries, optionally persisted to SQLite.
+
+    Storage is a `ContentCache` (memory LRU and optional disk tier); entries carry
+    their creation time and the model seconds spent producing them, so hits
+    older than `ttl` are treated as misses and `stats()` can report the
+    LLM time saved.
+    """
+
+    def __init__(self, ttl: float, max_memory_bytes: int, disk_path: str | None = None, max_disk_bytes: int = 0,
+                 clock=time.time):
+        self.ttl = ttl
+        self._store = ContentCache(max_memory_bytes, disk_path=disk_path, max_disk_bytes=max_disk_bytes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "llm_seconds_saved": 0.0}
+
+    def get(self, key: tuple) -> str | None:
+        raw = self._store.get(key)
+        entry = json.loads(raw) if raw is not None else None
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if self._clock() - entry["created"] > self.ttl:
+                self._counters["misses"] += 1
+                self._counters["expired"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["llm_seconds_saved"] += entry["llm_seconds"]
+            return entry["summary"]
+
+    def put(self, key: tuple, summary: str, llm_seconds: float) -> None:
+        entry = {"summary": summary, "created": self._clock(), "llm_seconds": round(llm_seconds, 3)}
+        self._store.put(key, json.dumps(entry).encode("utf-8"))
+        with self._lock:
+            self._counters["stores"] += 1
+
+    def stats(self) -> dict:
+        """Hit rate, model seconds saved by hits, and storage sizes."""
+        store = self._store.stats()
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "llm_seconds_saved": round(self._counters["llm_seconds_saved"], 3),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                "memory_bytes": store["memory_bytes"],
+                "disk_bytes": store["disk_bytes"],
+            }
+
+    def clear(self) -> None:
+        self._store.clear()
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+summary_cache = SummaryCache(
+    ttl=SUMMARY_CACHE_TTL,
+    max_memory_bytes=SUMMARY_CACHE_MEMORY_BYTES,
+    disk_path=SUMMARY_CACHE_PATH,
+    max_disk_bytes=SUMMARY_CACHE_DISK_BYTES,
+)
+
+
+def get_summary_cache_stats() -> dict:
+    """Return hit rate and LLM seconds saved by the file summary cache."""
+    return summary_cache.stats()
+
+
+# -----------------------------
+# CachedAgentTool
+# -----------------------------
+class CachedAgentTool(AgentTool):
+    """
+    `AgentTool` for the file summarizer that answers repeated requests from a cache.
+
+    Requests are keyed by (repo, commit SHA, file path, question intent), so the
+    same file at the same commit is summarized once per kind of question, across
+    sessions and users. The summarizer's prompt and model are part of the key;
+    changing either starts a fresh cache. Requests that do not name a single
+    file, or whose ref cannot be resolved, always run the agent.
+    """
+
+    def __init__(self, agent, cache: SummaryCache, skip_summarization: bool = False):
+        super().__init__(agent, skip_summarization=skip_summarization)
+        self._cache = cache
+        self._version = hashlib.sha256(f"{agent.model}\n{agent.instruction}".encode("utf-8")).hexdigest()[:16]
+
+    async def _cache_key(self, args: dict, tool_context: ToolContext | None) -> tuple | None:
+        request = parse_summary_request(str(args.get("request", "")))
+        if request is None:
+            return None
+        full_name = f"{request['owner']}/{request['repo']}"
+        sha = await self._resolve_sha(request, tool_context)
+        if sha is None:
+            return None
+        return ("summary", self._version, full_name, sha, request["path"], question_intent(request["question"]))
+
+    @staticmethod
+    async def _resolve_sha(request: dict, tool_context: ToolContext | None) -> str | None:
+        backend = async_github_tools.get_async_backend(request["owner"], request["repo"])
+        if not backend:
+            return None
+        sha = await async_github_tools.resolve_commit_sha(
+            backend, f"{request['owner']}/{request['repo']}", request["ref"], tool_context
+        )
+        return sha if isinstance(sha, str) else None
+
+    async def run_async(self, *, args: dict, tool_context: ToolContext):
+        try:
+            key = await self._cache_key(args, tool_context)
+        except Exception as e:
+            logger.warning("Summary cache key unavailable, summarizing without cache: %s", e)
+            key = None
+
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                logger.info("Summary cache hit for %s@%s:%s (%s)", key[2], key[3], key[4], key[5])
+                return cached
+
+        started = time.perf_counter()
+        result = await super().run_async(args=args, tool_context=tool_context)
+        if key is not None and isinstance(result, str) and result.strip():
+            self._cache.put(key, result, time.perf_counter() - started)
+        return result
@@ -1 +1,6 @@
-from .github_tools import get_repo_structure, read_file_content, extract_owner_and_repo
\ No newline at end of file
+from dotenv import load_dotenv
+
+# Before the tool modules read their settings from the environment.
+load_dotenv()
+
+from .github_tools import get_repo_structure, read_file_content, extract_owner_and_repo
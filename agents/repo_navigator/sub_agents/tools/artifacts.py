@@ -0,0 +1,127 @@
+# artifacts.py
+import functools
+import hashlib
+import json
+import os
+
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from .utils import error_response, logger, tool_safety
+
+# Return large tool results by reference: stored as session artifacts, replaced by a preview.
+TOOL_RESULT_ARTIFACTS = os.getenv("TOOL_RESULT_ARTIFACTS", "false").lower() in ("1", "true", "yes")
+# Root of the local FileArtifactService the runner uses in that mode.
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", ".cache/repo_navigator/artifacts")
+# Results up to this many characters stay inline; offloaded ones keep this many preview lines.
+ARTIFACT_INLINE_MAX_CHARS = int(os.getenv("ARTIFACT_INLINE_MAX_CHARS", "8000"))
+ARTIFACT_PREVIEW_LINES = int(os.getenv("ARTIFACT_PREVIEW_LINES", "40"))
+# Most lines one read_artifact call returns.
+ARTIFACT_READ_MAX_LINES = int(os.getenv("ARTIFACT_READ_MAX_LINES", "300"))
+
+# Result fields holding the bulky text, in order of preference; results without
+# one are stored whole as indented JSON (nested structures).
+PAYLOAD_FIELDS = ("content", "tree")
+
+
+def _payload(result: dict) -> tuple[str, dict]:
+    """Split a tool result into (text to store, fields kept inline)."""
+    for field in PAYLOAD_FIELDS:
+        if isinstance(result.get(field), str):
+            return result[field], {k: v for k, v in result.items() if k != field}
+    rest = {k: v for k, v in result.items() if k.startswith("_next")}
+    body = {k: v for k, v in result.items() if k not in rest}
+    return json.dumps(body, indent=1, ensure_ascii=False), rest
+
+
+async def store_result(tool_name: str, result: dict, tool_context: ToolContext | None) -> dict:
+    """
+    Replace a large tool result by a reference to a session artifact.
+
+    The payload is saved once per session under a content-addressed name, so
+    repeated calls returning the same text reuse the artifact. Results that are
+    errors, small enough, or produced without an artifact service are returned
+    unchanged.
+    """
+    if not TOOL_RESULT_ARTIFACTS or tool_context is None or not isinstance(result, dict) or "error" in result:
+        return result
+    text, inline = _payload(result)
+    if len(text) <= ARTIFACT_INLINE_MAX_CHARS:
+        return result
+
+    name = f"{tool_name}-{hashlib.sha256(text.encode('utf-8', 'replace')).hexdigest()[:16]}.txt"
+    try:
+        if name not in await tool_context.list_artifacts():
+            await tool_context.save_artifact(name, types.Part(text=text))
+    except ValueError as e:  # no artifact service configured on the runner
+        logger.warning("Returning %s inline: %s", tool_name, e)
+        return result
+
+    lines = text.splitlines()
+    return {
+        **inline,
+        "artifact": name,
+        "chars": len(text),
+        "lines": len(lines),
+        "preview": "\n".join(lines[:ARTIFACT_PREVIEW_LINES]),
+        "note": "Full result stored by reference; call read_artifact(artifact, start_line, end_line) for the lines you need.",
+    }
+
+
+def returns_by_reference(tool_name: str):
+    """Decorator for async tools: pass large results through `store_result` (needs `tool_context`)."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            return await store_result(tool_name, result, kwargs.get("tool_context"))
+        return wrapper
+    return decorator
+
+
+# -----------------------------
+# read_artifact
+# -----------------------------
+@tool_safety("read_artifact")
+async def read_artifact(
+    artifact: str,
+    start_line: int = 1,
+    end_line: int | None = None,
+    tool_context: ToolContext = None,
+) -> dict:
+    """
+    Read a line range of a tool result that was returned by reference.
+
+    Large `get_repo_structure` and `read_file_content` results come back as
+    {"artifact": <name>, "preview": ...}. Read only the lines the question needs.
+
+    Args:
+        artifact (str): The "artifact" value of the result.
+        start_line (int, optional): First line to return (1-based). Defaults to 1.
+        end_line (int | None, optional): Last line to return (inclusive). Defaults
+            to ARTIFACT_READ_MAX_LINES lines after start_line.
+        tool_context (ToolContext): Injected by ADK; the session owning the artifact.
+
+    Returns:
+        dict: {"artifact", "content", "start_line", "end_line", "total_lines", "truncated"}
+            or {"error": {...}} if the artifact does not exist
+    """
+    if start_line < 1 or (end_line is not None and end_line < start_line):
+        return error_response("start_line must be >= 1 and end_line >= start_line.")
+    try:
+        part = await tool_context.load_artifact(artifact) if tool_context else None
+    except ValueError:  # no artifact service configured on the runner
+        part = None
+    if part is None or part.text is None:
+        return error_response(f"Artifact '{artifact}' does not exist in this session.")
+
+    lines = part.text.splitlines()
+    last = min(end_line or len(lines), start_line + ARTIFACT_READ_MAX_LINES - 1, len(lines))
+    return {
+        "artifact": artifact,
+        "content": "\n".join(lines[start_line - 1:last]),
+        "start_line": start_line,
+        "end_line": last,
+        "total_lines": len(lines),
+        "truncated": last < min(end_line or len(lines), len(lines)),
+    }
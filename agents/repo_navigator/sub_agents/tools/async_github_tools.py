@@ -0,0 +1,897 @@
+# async_github_tools.py
+import asyncio
+import hashlib
+import json
+import os
+import weakref
+from urllib.parse import quote
+
+import httpx
+from github import GithubException, RateLimitExceededException
+from google.adk.tools import ToolContext
+
+from . import github_tools
+from .artifacts import returns_by_reference
+from .backends import AsyncRepoBackend, ThreadedBackend, TreeEntry, get_local_backend
+from .cache import TTLCache
+from .compaction import CompactionSink, check_compact
+from .github_http import GITHUB_API_URL
+from .github_tools import GITHUB_POOL_SIZE, GITHUB_REPO_CACHE_TTL, RESOLVED_REFS_STATE_KEY, STRUCTURE_WALK_WORKERS
+from .line_window import LineWindow, make_window, utf8_boundary
+from .metrics import tool_metrics
+from .rate_limit import RateLimitScheduler, github_scheduler, is_rate_limited
+from .repo_cache import (
+    UNSHARED,
+    cached_tree,
+    cached_walk,
+    content_cache,
+    etag_store,
+    get_snapshot,
+    inflight,
+    store_tree,
+    store_walk,
+    to_sink,
+    tree_key,
+)
+from .structure import (
+    begin_walk,
+    build_structure_from_tree,
+    format_structure,
+    listing_rate_limited,
+    missing_commit,
+    missing_listing,
+    normalize_listing,
+    paginate_structure,
+    structure_page_args,
+    tree_rate_limited,
+    tree_truncated,
+)
+from .utils import logger, error_response, tool_safety
+
+JSON_MEDIA_TYPE = "application/vnd.github+json"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+
+# read_files: parallel fetches per call, files per call, and total content bytes returned.
+READ_FILES_CONCURRENCY = int(os.getenv("READ_FILES_CONCURRENCY", "5"))
+READ_FILES_MAX_FILES = int(os.getenv("READ_FILES_MAX_FILES", "20"))
+READ_FILES_MAX_BYTES = int(os.getenv("READ_FILES_MAX_BYTES", "200000"))
+# Streamed files up to this size are also kept in the content cache.
+CACHEABLE_BLOB_BYTES = 1024 * 1024
+
+
+# -----------------------------
+# Async GitHub client
+# -----------------------------
+class AsyncGithubClient:
+    """
+    Minimal non-blocking GitHub REST client built on `httpx.AsyncClient`.
+
+    Mirrors what the sync tools get from PyGithub plus the shared client setup:
+    pooled keep-alive connections, ETag revalidation through `etag_store`, a TTL
+    cache of repository metadata, and pacing, token rotation and rate-limit
+    retries through the shared `github_scheduler`, which waits with
+    `asyncio.sleep` so other sessions on the event loop keep running.
+
+    Errors are raised as PyGithub's `GithubException` /
+    `RateLimitExceededException` so tool code handles both paths the same way.
+    Cancelling the awaiting task aborts the in-flight request or backoff sleep.
+    """
+
+    def __init__(self, token: str, *, base_url: str = GITHUB_API_URL, pool_size: int = GITHUB_POOL_SIZE,
+                 timeout: float = 15, max_retries: int = 3, transport: httpx.AsyncBaseTransport | None = None,
+                 scheduler: RateLimitScheduler = github_scheduler):
+        self.max_retries = max_retries
+        self.scheduler = scheduler
+        self.token = token
+        self._auth_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        self._repos = TTLCache(ttl=GITHUB_REPO_CACHE_TTL)
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"token {token}",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "repo-navigator-ai",
+            },
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    # ---- transport ----
+    def _send(self, request: httpx.Request, stream: bool = False):
+        """Scheduler attempt: send `request` with the leased token (None keeps the client's own)."""
+        async def attempt(token):
+            if token:
+                request.headers["Authorization"] = f"token {token}"
+            response = await self._http.send(request, stream=stream)
+            tool_metrics.record_api_call(0 if stream else len(response.content), response.headers)
+            return response
+        return attempt
+
+    async def request(self, path: str, *, params: dict | None = None, accept: str = JSON_MEDIA_TYPE) -> bytes:
+        """GET `path` and return the body, revalidating with ETags; rate limits go through the scheduler."""
+        request = self._http.build_request("GET", path, params=params, headers={"Accept": accept})
+        key = (str(request.url), self._auth_key, accept)
+        cached = etag_store.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+            etag_store.count("conditional_requests")
+
+        response = await self.scheduler.send_async(self._send(request), attempts=self.max_retries)
+
+        if response.status_code == 304 and cached is not None:
+            etag_store.count("not_modified")
+            return cached[2]
+
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            if etag:
+                etag_store.put(key, etag, dict(response.headers), response.content)
+            return response.content
+
+        if is_rate_limited(response.status_code, response.headers):
+            raise RateLimitExceededException(response.status_code, _json_or_text(response), dict(response.headers))
+        raise GithubException(response.status_code, _json_or_text(response), dict(response.headers))
+
+    async def request_json(self, path: str, *, params: dict | None = None):
+        return json.loads(await self.request(path, params=params))
+
+    # ---- repository API ----
+    async def get_repo(self, full_name: str) -> dict:
+        """Repository metadata (`full_name`, `default_branch`, ...), cached with a TTL."""
+        key = full_name.lower()
+        repo = self._repos.get(key)
+        if repo is None:
+            repo = await inflight.do_async(("repo", key), lambda: self.request_json(f"/repos/{full_name}"))
+            self._repos.set(key, repo)
+        return repo
+
+    async def resolve_ref(self, full_name: str, ref: str) -> str:
+        """Resolve a branch, tag or SHA to a commit SHA (plain-text SHA media type)."""
+        body = await self.request(f"/repos/{full_name}/commits/{quote(ref, safe='')}", accept=SHA_MEDIA_TYPE)
+        return body.decode("ascii").strip()
+
+    async def get_tree(self, full_name: str, sha: str) -> dict:
+        return await self.request_json(f"/repos/{full_name}/git/trees/{sha}", params={"recursive": "1"})
+
+    async def get_contents(self, full_name: str, path: str, ref: str):
+        return await self.request_json(f"/repos/{full_name}/contents/{quote(path)}", params={"ref": ref})
+
+    async def get_raw(self, full_name: str, path: str, ref: str) -> bytes:
+        return await self.request(f"/repos/{full_name}/contents/{quote(path)}", params={"ref": ref}, accept=RAW_MEDIA_TYPE)
+
+    async def open_raw(self, full_name: str, path: str, ref: str) -> httpx.Response:
+        """
+        Start streaming a file's raw bytes. The caller reads `aiter_bytes()` and must
+        `aclose()` the response. Rate limits are retried before the body starts.
+        """
+        request = self._http.build_request(
+            "GET", f"/repos/{full_name}/contents/{quote(path)}", params={"ref": ref}, headers={"Accept": RAW_MEDIA_TYPE}
+        )
+        response = await self.scheduler.send_async(self._send(request, stream=True), attempts=self.max_retries)
+        if response.status_code == 200:
+            return response
+        await response.aread()
+        await response.aclose()
+
+        if is_rate_limited(response.status_code, response.headers):
+            raise RateLimitExceededException(response.status_code, _json_or_text(response), dict(response.headers))
+        raise GithubException(response.status_code, _json_or_text(response), dict(response.headers))
+
+
+def _json_or_text(response: httpx.Response):
+    try:
+        return response.json()
+    except ValueError:
+        return {"message": response.text}
+
+
+# One client per event loop: httpx connection pools must not cross loops.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGithubClient]" = weakref.WeakKeyDictionary()
+# Close tasks of replaced clients, referenced until they finish.
+_closing: set[asyncio.Task] = set()
+
+
+def _get_async_client():
+    """
+    Return the AsyncGithubClient for the running event loop, or None without GITHUB_TOKEN.
+
+    A client is reused until GITHUB_TOKEN changes; the replaced client is closed
+    in a background task on the same loop, so its connection pool is released.
+    """
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        logger.error("GITHUB_TOKEN not set.")
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.token != token:
+        if client is not None:
+            task = loop.create_task(client.aclose())
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+        client = AsyncGithubClient(token)
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_clients() -> None:
+    """
+    Close the running event loop's GitHub client and its connection pool.
+
+    Call before the loop ends (the runner does so in `Runner.close()`); a later
+    tool call on the same loop opens a new client.
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+
+
+# -----------------------------
+# AsyncRestBackend
+# -----------------------------
+class AsyncRestBackend(AsyncRepoBackend):
+    """
+    `AsyncRepoBackend` over the GitHub REST API through `AsyncGithubClient`.
+
+    Async twin of `github_tools.RestBackend`: reads go through snapshot mode when
+    it is enabled and through the commit-keyed content cache otherwise, and
+    concurrent identical fetches (ref, tree, listing, blob) share one request
+    through `inflight`. Streamed files are read from the raw contents endpoint
+    chunk by chunk, so a large file is never held whole.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def _full_name(self, full_name: str) -> str:
+        """Canonical `owner/repo` spelling, so cache keys match the sync tools'."""
+        return (await self.client.get_repo(full_name))["full_name"]
+
+    async def default_branch(self, full_name: str) -> str:
+        return (await self.client.get_repo(full_name))["default_branch"]
+
+    async def resolve_ref(self, full_name: str, ref: str):
+        full_name = await self._full_name(full_name)
+        try:
+            return await inflight.do_async(("ref", full_name, ref), lambda: self.client.resolve_ref(full_name, ref))
+        except RateLimitExceededException:
+            return error_response(f"Rate limited while resolving ref: {ref}")
+        except GithubException as e:
+            if e.status in (404, 422):
+                return None
+            raise e
+
+    async def list_tree(self, full_name: str, sha: str):
+        full_name = await self._full_name(full_name)
+        snapshot = await asyncio.to_thread(get_snapshot, full_name, sha)
+        if snapshot is not None:
+            with snapshot:
+                return [TreeEntry(*e) for e in snapshot.entries()]
+        return await safe_get_tree(self.client, full_name, sha)
+
+    async def list_dir(self, full_name: str, sha: str, path: str):
+        full_name = await self._full_name(full_name)
+        return await inflight.do_async(
+            ("dir", full_name, sha, path.strip("/")),
+            lambda: _listing(self.client, full_name, path, sha),
+        )
+
+    async def read_blob(self, full_name: str, sha: str, path: str):
+        full_name = await self._full_name(full_name)
+        snapshot = await asyncio.to_thread(get_snapshot, full_name, sha)
+        if snapshot is not None:
+            with snapshot:
+                return snapshot.read(path)
+
+        key = ("file", full_name, sha, path.strip("/"))
+        data = content_cache.get(key)
+        if data is not None:
+            return data
+
+        async def fetch():
+            data = await self.client.get_raw(full_name, path.strip("/"), sha)
+            content_cache.put(key, data)
+            return data
+
+        try:
+            data = await inflight.do_async(key, fetch)
+            if data is UNSHARED:  # joined a sync read of a file over the inline limit
+                data = await fetch()
+        except RateLimitExceededException:
+            return error_response(f"Rate limited repeatedly while fetching file: {path} from repository {full_name}.")
+        except GithubException as e:
+            if e.status in (404, 422):
+                return None
+            raise e
+        return data
+
+    async def stream_blob(self, full_name: str, sha: str, path: str, sink):
+        """
+        Snapshot and cached content are sliced in memory. Otherwise the raw body is
+        streamed; files up to the contents API's 1 MB inline limit are still stored
+        in the content cache and handed to concurrent reads of the same file, which
+        join the stream instead of starting their own.
+        """
+        full_name = await self._full_name(full_name)
+        snapshot = await asyncio.to_thread(get_snapshot, full_name, sha)
+        if snapshot is not None:
+            with snapshot:
+                return to_sink(snapshot.read(path), sink)
+        key = ("file", full_name, sha, path.strip("/"))
+        data = content_cache.get(key)
+        if data is not None:
+            return to_sink(data, sink)
+
+        size = None
+
+        async def stream():
+            nonlocal size
+            size, data = await _stream_into(self.client, full_name, path.strip("/"), sha, sink, key)
+            return data
+
+        try:
+            data = await inflight.do_async(key, stream)
+            if size is None:
+                if data is UNSHARED:  # the shared read was too large to keep: stream a copy
+                    size, _ = await _stream_into(self.client, full_name, path.strip("/"), sha, sink, key)
+                else:
+                    size = to_sink(data, sink)
+        except RateLimitExceededException:
+            return error_response(f"Rate limited repeatedly while fetching file: {path} from repository {full_name}.")
+        except GithubException as e:
+            if e.status in (404, 422):
+                return None
+            raise e
+        return size
+
+
+async def _stream_into(client, full_name: str, path: str, sha: str, sink, key: tuple):
+    """Stream a raw file into `sink`; returns (size, its bytes if small enough to cache else UNSHARED)."""
+    response = await client.open_raw(full_name, path, sha)
+    buffer, size = bytearray(), 0
+    try:
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            sink(chunk)
+            if buffer is not None:
+                buffer += chunk
+                if len(buffer) > CACHEABLE_BLOB_BYTES:
+                    buffer = None
+    finally:
+        await response.aclose()
+        tool_metrics.record_bytes(size)
+    if buffer is None:
+        return size, UNSHARED
+    data = bytes(buffer)
+    content_cache.put(key, data)
+    return size, data
+
+
+async def safe_get_contents(client, full_name: str, path: str, ref: str):
+    """Async contents listing with rate-limit retries; mirrors `github_tools.safe_get_contents`."""
+    try:
+        return await client.get_contents(full_name, path, ref)
+    except RateLimitExceededException:
+        return listing_rate_limited(path)
+    except GithubException as e:
+        if e.status == 404:
+            return missing_listing(full_name, path, ref)
+        raise e
+
+
+async def _listing(client, full_name: str, path: str, sha: str):
+    return normalize_listing(await safe_get_contents(client, full_name, path, sha))
+
+
+async def safe_get_tree(client, full_name: str, sha: str):
+    """Async recursive tree fetch; returns entries, None if truncated, or an error dict."""
+    cached = cached_tree(full_name, sha)
+    if cached is not None:
+        return cached
+    return await inflight.do_async(tree_key(full_name, sha), lambda: _fetch_tree(client, full_name, sha))
+
+
+async def _fetch_tree(client, full_name: str, sha: str):
+    try:
+        tree = await client.get_tree(full_name, sha)
+    except RateLimitExceededException:
+        return tree_rate_limited(sha)
+    except GithubException as e:
+        if e.status in (404, 422):
+            return missing_commit(full_name, sha)
+        raise e
+
+    if tree.get("truncated"):
+        return tree_truncated(full_name, sha)
+    return store_tree(full_name, sha, [TreeEntry(e["path"], e["type"], e.get("size"), e.get("sha")) for e in tree.get("tree", [])])
+
+
+def get_async_backend(owner: str, repo_name: str) -> AsyncRepoBackend | None:
+    """
+    Async counterpart of `github_tools.get_backend`: a registered local backend,
+    run in worker threads, if it has owner/repo, else the REST API.
+    """
+    backend = get_local_backend(f"{owner}/{repo_name}")
+    if backend is not None:
+        return ThreadedBackend(backend)
+    client = _get_async_client()
+    return AsyncRestBackend(client) if client else None
+
+
+def _build_backends(owner: str, repo_name: str):
+    """
+    (async backend, sync backend) for the index-based tools, or None. Refs are
+    resolved with the async one so `tool_context.state` is only written on the
+    event loop; the sync one feeds the index build in its worker thread.
+    """
+    async_backend = get_async_backend(owner, repo_name)
+    backend = github_tools.get_backend(owner, repo_name)
+    if async_backend is None or backend is None:
+        return None
+    return async_backend, backend
+
+
+# -----------------------------
+# Shared helpers
+# -----------------------------
+async def resolve_commit_sha(backend, full_name: str, ref: str | None, tool_context: ToolContext | None = None):
+    """Async counterpart of `github_tools.resolve_commit_sha` (same session-state memo)."""
+    ref = ref or await backend.default_branch(full_name)
+    key = f"{full_name}@{ref}"
+    resolved = {}
+    if tool_context is not None:
+        resolved = tool_context.state.get(RESOLVED_REFS_STATE_KEY) or {}
+    if key in resolved:
+        return resolved[key]
+
+    sha = await backend.resolve_ref(full_name, ref)
+    if sha is None:
+        return {"error": f"Ref '{ref}' does not exist in repo '{full_name}'."}
+    if isinstance(sha, dict):
+        return sha
+    if tool_context is not None:
+        tool_context.state[RESOLVED_REFS_STATE_KEY] = {**resolved, key: sha}
+    return sha
+
+
+async def _missing_path(backend, full_name: str, file_path: str, branch: str | None) -> dict:
+    return {"error": f"Path '{file_path}' does not exist in '{full_name}' on '{branch or await backend.default_branch(full_name)}'."}
+
+
+async def _read_blob(backend, full_name: str, sha: str, file_path: str, branch: str | None = None):
+    """`backend.read_blob` with the tools' "does not exist" error for missing files."""
+    data = await backend.read_blob(full_name, sha, file_path)
+    if data is None:
+        return await _missing_path(backend, full_name, file_path, branch)
+    return data
+
+
+# -----------------------------
+# get_repo_structure (async)
+# -----------------------------
+@tool_safety("get_repo_structure")
+@returns_by_reference("get_repo_structure")
+async def get_repo_structure(
+    owner: str,
+    repo_name: str,
+    branch: str | None = None,
+    max_depth: int = 3,
+    module: str | None = None,
+    output_format: str = "nested",
+    max_entries: int | None = None,
+    cursor: str | None = None,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Retrieve the directory structure of a GitHub repository.
+
+    Traverses the repository starting at the root or an optional subdirectory (`module`)
+    and builds a nested dictionary of folders and files. The depth of recursion is limited
+    by `max_depth` to prevent very large outputs.
+
+    Non-blocking version of `github_tools.get_repo_structure`: same arguments and
+    output, but all GitHub I/O and rate-limit backoff are awaited on the event loop.
+    When the recursive tree is truncated, directories are listed breadth-first with
+    up to STRUCTURE_WALK_WORKERS requests in flight. Large structures are paged from
+    the cached tree with `max_entries` and `cursor`.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        max_depth (int, optional): Maximum folder depth to traverse. Defaults to 3.
+        module (str | None, optional): Optional subdirectory to start traversal.
+        output_format (str, optional): "nested" (default) for the dict below, or
+            "compact" for an indented listing that costs far fewer tokens.
+        max_entries (int | None, optional): Page size. Defaults to STRUCTURE_MAX_ENTRIES.
+        cursor (str | None, optional): `_next_cursor` of the previous page; pins the
+            commit, module and max_depth of the first call.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict: Nested dictionary representing repository structure:
+            - Directories are represented as nested dicts
+            - Files are represented as {"type": "file", "path": ..., "size": ...}
+            - {"_truncated": True} when max_depth is exceeded
+            - {"_error": ...} for a directory whose listing failed during a walk
+            - "_next_cursor": <cursor> at the top level when more entries remain
+            - {"error": {...}} on failure
+          With output_format="compact": {"root": <module or "">, "tree": <listing>}
+          plus "next_cursor" when paged.
+    """
+    page = structure_page_args(owner, repo_name, module, max_depth, output_format, max_entries, cursor)
+    if "error" in page:
+        return page
+
+    backend = get_async_backend(owner, repo_name)
+    if not backend:
+        return error_response("GitHub client unavailable.")
+
+    full_name = f"{owner}/{repo_name}"
+    sha = page["sha"] or await resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+
+    structure = await _repo_structure(backend, full_name, sha, page["max_depth"], page["module"], owner, repo_name)
+    structure = paginate_structure(structure, full_name, sha, page)
+    return format_structure(structure, output_format, page["module"])
+
+
+async def _repo_structure(backend, full_name, sha, max_depth, module, owner, repo_name) -> dict:
+    """Nested structure dict (or error dict) of full_name@sha behind the async `get_repo_structure`."""
+    start_path = module.strip("/") if module else ""
+
+    entries = await backend.list_tree(full_name, sha)
+    if isinstance(entries, dict) and "error" in entries:
+        return entries
+    if entries is not None:
+        return build_structure_from_tree(entries, start_path, max_depth, owner, repo_name)
+
+    # Slow path: breadth-first walk, each level's directories listed concurrently.
+    cached = cached_walk(full_name, sha, start_path, max_depth)
+    if cached is not None:
+        return cached
+
+    semaphore = asyncio.Semaphore(STRUCTURE_WALK_WORKERS)
+
+    async def list_dir(path: str):
+        async with semaphore:
+            return await backend.list_dir(full_name, sha, path)
+
+    walk = begin_walk(await list_dir(start_path), module, max_depth, owner, repo_name)
+    if isinstance(walk, dict):
+        return walk
+    while walk.pending:
+        walk.fill(await asyncio.gather(*(list_dir(path) for path in walk.pending)))
+
+    store_walk(full_name, sha, start_path, max_depth, walk.root)
+    return walk.root
+
+
+# -----------------------------
+# read_file_content (async)
+# -----------------------------
+@tool_safety("read_file_content")
+@returns_by_reference("read_file_content")
+async def read_file_content(
+    owner: str,
+    repo_name: str,
+    file_path: str,
+    branch: str | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    max_bytes: int | None = None,
+    compact: str | None = None,
+    tool_context: ToolContext | None = None,
+):
+    """
+    Read the content of a specific file in a GitHub repository.
+
+    This tool fetches the contents of a single file in the repository at the specified
+    branch. It automatically retries on GitHub API rate limits and returns an LLM-safe
+    error envelope if the file does not exist or other errors occur. Content is cached
+    by the branch's resolved commit SHA, so repeated reads skip the download.
+
+    Large files are streamed and cut to a line range and byte budget as they arrive,
+    so only the returned window is held in memory. At most READ_FILE_MAX_BYTES are
+    returned per call; page through bigger files with `start_line`/`end_line`.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        file_path (str): Path to the file inside the repository.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        start_line (int | None, optional): First line to return (1-based).
+        end_line (int | None, optional): Last line to return (inclusive).
+        max_bytes (int | None, optional): Byte budget for the returned content,
+            capped at READ_FILE_MAX_BYTES.
+        compact (str | None, optional): Shrink the file before returning it:
+            "headers" elides license headers and generated code, "comments" also
+            drops comments and docstrings, "signatures" also collapses function
+            bodies to `...`. Lines refer to the compacted text. Files over
+            COMPACT_MAX_BYTES are returned uncompacted. Defaults to none.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict: A dictionary containing the file content or an error:
+            - {"content": "<file content>"} on success
+            - plus "start_line", "end_line" (last complete line returned), "total_lines",
+              "total_bytes" and "truncated" when a window was requested, the content
+              was cut at the byte budget or the file was compacted
+            - plus "compaction": {"mode", "original_bytes", "compacted_bytes",
+              "compression_ratio"} when compacted, or {"mode": "none",
+              "original_bytes", "skipped"} when the file was too large to compact
+            - {"error": {...}} on failure
+    """
+    window = make_window(start_line, end_line, max_bytes, github_tools.READ_FILE_MAX_BYTES)
+    if isinstance(window, dict):
+        return window
+    invalid = check_compact(compact)
+    if invalid:
+        return invalid
+
+    backend = get_async_backend(owner, repo_name)
+    if not backend:
+        return error_response("GitHub client unavailable.")
+
+    full_name = f"{owner}/{repo_name}"
+    sha = await resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+
+    sink = CompactionSink(window) if compact and compact != "none" else window
+    size = await backend.stream_blob(full_name, sha, file_path, sink.feed)
+    if size is None:
+        return await _missing_path(backend, full_name, file_path, branch)
+    if isinstance(size, dict) and "error" in size:
+        return size
+    if sink is not window:
+        return sink.result(file_path, compact)
+    return window.result(with_metadata=start_line is not None or end_line is not None or max_bytes is not None)
+
+
+# -----------------------------
+# read_files (async, batched)
+# -----------------------------
+@tool_safety("read_files")
+async def read_files(
+    owner: str,
+    repo_name: str,
+    paths: list[str],
+    branch: str | None = None,
+    compact: str | None = None,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Read several files from a GitHub repository in one call.
+
+    Files are fetched concurrently (at most READ_FILES_CONCURRENCY at a time) and
+    returned in the order requested. Each entry carries either the content or its
+    own error, so one missing file does not fail the batch. The combined content is
+    capped at READ_FILES_MAX_BYTES, spent in request order: each file is streamed
+    through a window capped at what the files before it left, files past the budget
+    are cut short and flagged, and once it is spent no further file is downloaded.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        paths (list[str]): File paths inside the repository.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        compact (str | None, optional): Compaction applied to every file before the
+            byte budget is spent; same modes as `read_file_content`.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict: {"files": [...], "total_bytes": int, "truncated": bool} where each file is
+            - {"path": ..., "content": ..., "truncated": bool} on success, plus
+              "compaction" when compacted
+            - {"path": ..., "content": "", "truncated": True} when the budget was spent
+              before it (not downloaded)
+            - {"path": ..., "error": ...} on failure
+          plus "duplicates": [...] listing paths requested more than once (read once),
+          or {"error": {...}} if the repository or ref cannot be resolved.
+    """
+    if not paths:
+        return error_response("No file paths given.")
+    if len(paths) > READ_FILES_MAX_FILES:
+        return error_response(f"Too many files requested ({len(paths)}); the limit is {READ_FILES_MAX_FILES}.")
+    invalid = check_compact(compact)
+    if invalid:
+        return invalid
+
+    backend = get_async_backend(owner, repo_name)
+    if not backend:
+        return error_response("GitHub client unavailable.")
+
+    full_name = f"{owner}/{repo_name}"
+    sha = await resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+
+    unique_paths = list(dict.fromkeys(paths))
+    duplicates = list(dict.fromkeys(p for i, p in enumerate(paths) if p in paths[:i]))
+    semaphore = asyncio.Semaphore(READ_FILES_CONCURRENCY)
+    kept: list[int | None] = [None] * len(unique_paths)
+    settled = [asyncio.Event() for _ in unique_paths]
+
+    def budget_left(index: int) -> int:
+        # Exact once every earlier file has settled, an upper bound before that.
+        return READ_FILES_MAX_BYTES - sum(k for k in kept[:index] if k is not None)
+
+    async def read(index: int, path: str) -> dict:
+        try:
+            async with semaphore:
+                limit = budget_left(index)
+                result = None
+                if limit > 0:
+                    result = await _read_capped(backend, full_name, sha, path, branch, compact, limit)
+            # Spend the byte budget in request order so the result is deterministic.
+            for event in settled[:index]:
+                await event.wait()
+            if result is None:
+                return {"path": path, "content": "", "truncated": True}
+            if "error" in result:
+                return {"path": path, **result}
+            data = result["content"].encode("utf-8")
+            chunk = data[:utf8_boundary(data, budget_left(index))]
+            kept[index] = len(chunk)
+            entry = {
+                "path": path,
+                "content": str(chunk, "utf-8", errors="ignore"),
+                "truncated": result.get("truncated", False) or len(chunk) < len(data),
+            }
+            if "compaction" in result:
+                entry["compaction"] = result["compaction"]
+            return entry
+        finally:
+            if kept[index] is None:
+                kept[index] = 0
+            settled[index].set()
+
+    files = await asyncio.gather(*(read(i, p) for i, p in enumerate(unique_paths)))
+
+    result = {
+        "files": files,
+        "total_bytes": sum(kept),
+        "truncated": any(f.get("truncated") for f in files),
+    }
+    if duplicates:
+        result["duplicates"] = duplicates
+    return result
+
+
+async def _read_capped(backend, full_name: str, sha: str, path: str, branch: str | None, compact: str | None,
+                       limit: int) -> dict:
+    """Stream one `read_files` file through a window of at most `limit` bytes (compacted first if asked)."""
+    window = LineWindow(max_bytes=limit)
+    sink = CompactionSink(window) if compact and compact != "none" else window
+    size = await backend.stream_blob(full_name, sha, path, sink.feed)
+    if size is None:
+        return await _missing_path(backend, full_name, path, branch)
+    if isinstance(size, dict) and "error" in size:
+        return size
+    return sink.result(path, compact) if sink is not window else window.result()
+
+
+# -----------------------------
+# find_symbols (async)
+# -----------------------------
+@tool_safety("find_symbols")
+async def find_symbols(
+    owner: str,
+    repo_name: str,
+    query: str | None = None,
+    path: str | None = None,
+    kind: str | None = None,
+    branch: str | None = None,
+    max_results: int = 50,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Look up classes, functions and methods in a repository without reading files.
+
+    Answers "where is X defined" (`query`) and "what does module Y define / import"
+    (`path`) from a symbol index built once per commit by parsing the repository's
+    Python files. The ref is resolved here, on the event loop; only the index
+    build and lookup run in a worker thread, since the build parses in a process
+    pool.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        query (str | None, optional): Symbol name or part of a dotted name, e.g.
+            "Runner" or "Client.get". Exact name matches are listed first.
+        path (str | None, optional): File path; returns that module's symbols,
+            imports and `__all__` exports instead of searching.
+        kind (str | None, optional): Only "class", "function" or "method" symbols.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        max_results (int, optional): Most symbols returned for a query. Defaults to 50.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict: Same as `github_tools.find_symbols`.
+    """
+    invalid = github_tools.symbol_args_error(query, path, kind)
+    if invalid:
+        return invalid
+
+    backends = _build_backends(owner, repo_name)
+    if not backends:
+        return error_response("GitHub client unavailable.")
+    async_backend, backend = backends
+
+    full_name = f"{owner}/{repo_name}"
+    sha = await resolve_commit_sha(async_backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+    return await asyncio.to_thread(
+        github_tools.symbol_lookup, backend, full_name, sha, query, path, kind, max_results
+    )
+
+
+# -----------------------------
+# get_dependency_graph (async)
+# -----------------------------
+@tool_safety("get_dependency_graph")
+async def get_dependency_graph(
+    owner: str,
+    repo_name: str,
+    path: str | None = None,
+    depth: int = 1,
+    branch: str | None = None,
+    max_results: int = 20,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Entry points and the module import graph of a repository, computed from code.
+
+    Without `path`, returns how the repository is started (`__main__` blocks, console
+    scripts, Makefile/Dockerfile/Procfile commands, framework app objects) and its
+    most imported modules. With `path`, returns what that file imports, which files
+    import it and, for `depth` > 1, the files reachable through its imports. The
+    ref is resolved on the event loop; only the graph build runs in a worker thread.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        path (str | None, optional): File to show the neighbourhood of.
+        depth (int, optional): Import hops followed from `path`. Defaults to 1.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        max_results (int, optional): Most entries per returned list. Defaults to 20.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict: Same as `github_tools.get_dependency_graph`.
+    """
+    if depth < 1:
+        return error_response("depth must be at least 1.")
+
+    backends = _build_backends(owner, repo_name)
+    if not backends:
+        return error_response("GitHub client unavailable.")
+    async_backend, backend = backends
+
+    full_name = f"{owner}/{repo_name}"
+    sha = await resolve_commit_sha(async_backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+    return await asyncio.to_thread(
+        github_tools.dependency_lookup, backend, full_name, sha, path, depth, max_results
+    )
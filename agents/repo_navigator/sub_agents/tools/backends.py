@@ -0,0 +1,440 @@
+# backends.py
+import asyncio
+import atexit
+import hashlib
+import os
+import re
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Callable
+
+from .line_window import CHUNK_BYTES, iter_chunks
+from .utils import error_response, logger
+
+# Flat recursive tree entry; duck-types PyGithub's GitTreeElement. `sha` is the
+# git object id when the source knows it (lets per-file results be reused across commits).
+TreeEntry = namedtuple("TreeEntry", ["path", "type", "size", "sha"], defaults=[None])
+
+# GitHub owner and repository names; "." and ".." are rejected separately.
+_REPO_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+_COMMIT_SHA = re.compile(r"[0-9a-fA-F]{4,64}")
+
+
+def commit_not_found(full_name: str, sha: str) -> dict:
+    return error_response(f"Commit '{sha}' not found in '{full_name}'.")
+
+
+def path_not_found(full_name: str, sha: str, path: str) -> dict:
+    return error_response(f"Path '{path}' does not exist in '{full_name}' at '{sha}'.")
+
+
+# -----------------------------
+# RepoBackend interface
+# -----------------------------
+class RepoBackend(ABC):
+    """
+    Source of repository data for the GitHub tools.
+
+    Every method may also return an LLM-safe error dict (see `error_response`)
+    for failures other than "not found", e.g. rate limiting.
+    """
+
+    def handles(self, full_name: str) -> bool:
+        """Whether this backend can serve `owner/repo`."""
+        return True
+
+    @abstractmethod
+    def default_branch(self, full_name: str) -> str:
+        """Name of the repository's default branch."""
+
+    @abstractmethod
+    def resolve_ref(self, full_name: str, ref: str):
+        """Commit SHA for a branch, tag or SHA; None if the ref does not exist."""
+
+    @abstractmethod
+    def list_tree(self, full_name: str, sha: str):
+        """
+        All entries of commit `sha` as `TreeEntry`s, parents before children.
+
+        None means the backend cannot produce the whole tree at once and the
+        caller should walk it with `list_dir`; an unknown `sha` is an error.
+        """
+
+    @abstractmethod
+    def read_blob(self, full_name: str, sha: str, path: str):
+        """Bytes (or a bytes-like view) of file `path` at `sha`; None if missing."""
+
+    def stream_blob(self, full_name: str, sha: str, path: str, sink: Callable[[bytes], None]):
+        """
+        Pass file `path` at `sha` to `sink` chunk by chunk, for reads that should not
+        hold a large blob in memory. Returns the number of bytes streamed, None if the
+        file is missing, or an error dict. Defaults to slicing `read_blob`.
+        """
+        data = self.read_blob(full_name, sha, path)
+        if data is None or isinstance(data, dict):
+            return data
+        for chunk in iter_chunks(data):
+            sink(chunk)
+        return len(data)
+
+    @abstractmethod
+    def list_dir(self, full_name: str, sha: str, path: str):
+        """
+        One directory listing, normalized as for `structure.listing_to_node`: a
+        list of (type, name, path, size) with type "dir" or "file", a single
+        ("file", ...) tuple when `path` is a file, or an error dict.
+        """
+
+    def snapshot(self, full_name: str, sha: str):
+        """
+        A `RepoSnapshot` of commit `sha` for reading many files at once (e.g. to
+        build a symbol index), or None when per-file reads are as cheap. The
+        caller releases it when done.
+        """
+        return None
+
+    def close(self) -> None:
+        """Release processes or connections held by the backend; it may be used again afterwards."""
+
+
+def _git_blob_sha(data: bytes) -> str:
+    """Object id git would give `data` as a blob."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+# -----------------------------
+# AsyncRepoBackend interface
+# -----------------------------
+class AsyncRepoBackend(ABC):
+    """
+    Non-blocking counterpart of `RepoBackend` used by the async tools.
+
+    Same methods, arguments and return values, awaited. `ThreadedBackend` adapts
+    any blocking `RepoBackend`; the REST API has its own implementation,
+    `async_github_tools.AsyncRestBackend`.
+    """
+
+    @abstractmethod
+    async def default_branch(self, full_name: str) -> str:
+        """Name of the repository's default branch."""
+
+    @abstractmethod
+    async def resolve_ref(self, full_name: str, ref: str):
+        """Commit SHA for a branch, tag or SHA; None if the ref does not exist."""
+
+    @abstractmethod
+    async def list_tree(self, full_name: str, sha: str):
+        """All entries of commit `sha` as `TreeEntry`s, or None to walk with `list_dir`."""
+
+    @abstractmethod
+    async def read_blob(self, full_name: str, sha: str, path: str):
+        """Bytes of file `path` at `sha`; None if missing."""
+
+    async def stream_blob(self, full_name: str, sha: str, path: str, sink: Callable[[bytes], None]):
+        """Pass file `path` at `sha` to `sink` chunk by chunk; see `RepoBackend.stream_blob`."""
+        data = await self.read_blob(full_name, sha, path)
+        if data is None or isinstance(data, dict):
+            return data
+        for chunk in iter_chunks(data):
+            sink(chunk)
+        return len(data)
+
+    @abstractmethod
+    async def list_dir(self, full_name: str, sha: str, path: str):
+        """One directory listing; see `RepoBackend.list_dir`."""
+
+
+class ThreadedBackend(AsyncRepoBackend):
+    """
+    `AsyncRepoBackend` running a blocking `RepoBackend` (disk, git subprocess) in
+    worker threads, so the event loop keeps serving other sessions meanwhile.
+    The `stream_blob` sink is called from the worker thread.
+    """
+
+    def __init__(self, backend: RepoBackend):
+        self.backend = backend
+
+    async def default_branch(self, full_name: str) -> str:
+        return await asyncio.to_thread(self.backend.default_branch, full_name)
+
+    async def resolve_ref(self, full_name: str, ref: str):
+        return await asyncio.to_thread(self.backend.resolve_ref, full_name, ref)
+
+    async def list_tree(self, full_name: str, sha: str):
+        return await asyncio.to_thread(self.backend.list_tree, full_name, sha)
+
+    async def read_blob(self, full_name: str, sha: str, path: str):
+        return await asyncio.to_thread(self.backend.read_blob, full_name, sha, path)
+
+    async def stream_blob(self, full_name: str, sha: str, path: str, sink: Callable[[bytes], None]):
+        return await asyncio.to_thread(self.backend.stream_blob, full_name, sha, path, sink)
+
+    async def list_dir(self, full_name: str, sha: str, path: str):
+        return await asyncio.to_thread(self.backend.list_dir, full_name, sha, path)
+
+
+# -----------------------------
+# InMemoryBackend
+# -----------------------------
+class InMemoryBackend(RepoBackend):
+    """
+    Backend serving repositories held in memory; meant for tests and fixtures.
+
+        backend = InMemoryBackend()
+        sha = backend.add_commit("owner/repo", {"src/app.py": b"print(1)"})
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._repos: dict[str, dict] = {}
+
+    def add_commit(self, full_name: str, files: dict[str, bytes], ref: str = "main", default: bool = True) -> str:
+        """Store a commit with `files`, point `ref` at it and return its SHA."""
+        digest = hashlib.sha1()
+        for path in sorted(files):
+            digest.update(path.encode("utf-8") + b"\0" + files[path] + b"\0")
+        sha = digest.hexdigest()
+        with self._lock:
+            repo = self._repos.setdefault(full_name.lower(), {"default_branch": ref, "refs": {}, "commits": {}})
+            repo["commits"][sha] = {path.strip("/"): data for path, data in files.items()}
+            repo["refs"][ref] = sha
+            if default:
+                repo["default_branch"] = ref
+        return sha
+
+    def handles(self, full_name: str) -> bool:
+        return full_name.lower() in self._repos
+
+    def default_branch(self, full_name: str) -> str:
+        return self._repos[full_name.lower()]["default_branch"]
+
+    def resolve_ref(self, full_name: str, ref: str):
+        repo = self._repos[full_name.lower()]
+        if ref in repo["commits"]:
+            return ref
+        return repo["refs"].get(ref)
+
+    def list_tree(self, full_name: str, sha: str):
+        files = self._repos[full_name.lower()]["commits"].get(sha)
+        if files is None:
+            return commit_not_found(full_name, sha)
+        entries, seen_dirs = [], set()
+        for path in sorted(files, key=lambda p: p.split("/")):
+            parts = path.split("/")
+            for i in range(1, len(parts)):
+                directory = "/".join(parts[:i])
+                if directory not in seen_dirs:
+                    seen_dirs.add(directory)
+                    entries.append(TreeEntry(directory, "tree", None))
+            entries.append(TreeEntry(path, "blob", len(files[path]), _git_blob_sha(files[path])))
+        return entries
+
+    def list_dir(self, full_name: str, sha: str, path: str):
+        files = self._repos[full_name.lower()]["commits"].get(sha)
+        if files is None:
+            return commit_not_found(full_name, sha)
+        path = path.strip("/")
+        if path in files:
+            return ("file", path.rsplit("/", 1)[-1], path, len(files[path]))
+        prefix = f"{path}/" if path else ""
+        listing = {}
+        for file_path in sorted(files):
+            if file_path.startswith(prefix):
+                name, sep, _ = file_path[len(prefix):].partition("/")
+                if name not in listing:
+                    listing[name] = ("dir", name, prefix + name, None) if sep else ("file", name, file_path, len(files[file_path]))
+        return list(listing.values()) if listing else path_not_found(full_name, sha, path)
+
+    def read_blob(self, full_name: str, sha: str, path: str):
+        files = self._repos[full_name.lower()]["commits"].get(sha, {})
+        return files.get(path.strip("/"))
+
+
+# -----------------------------
+# GitMirrorBackend
+# -----------------------------
+class GitMirrorBackend(RepoBackend):
+    """
+    Backend reading bare git mirrors on local disk (`<root>/<owner>/<repo>.git`).
+
+    Blobs are read through one long-lived `git cat-file --batch` process per
+    mirror, so each read is a pipe round trip instead of a process spawn or an
+    HTTP request. Keep mirrors fresh with `git remote update` outside the agent.
+    """
+
+    def __init__(self, root: str, git: str = "git"):
+        self.root = root
+        self.git = git
+        self._lock = threading.Lock()
+        self._cat_files: dict[str, tuple[subprocess.Popen, threading.Lock]] = {}
+
+    def _mirror(self, full_name: str) -> str:
+        """
+        Path of the mirror of `owner/repo`. Names come from the model, so only
+        GitHub's name characters are accepted and the path must stay under `root`;
+        raises ValueError otherwise.
+        """
+        owner, _, repo = full_name.partition("/")
+        for name in (owner, repo):
+            if not _REPO_NAME.fullmatch(name) or name in (".", ".."):
+                raise ValueError(f"Invalid repository name '{full_name}'")
+        path = os.path.join(self.root, owner, f"{repo}.git")
+        if not os.path.realpath(path).startswith(os.path.join(os.path.realpath(self.root), "")):
+            raise ValueError(f"Mirror of '{full_name}' is outside {self.root}")
+        return path
+
+    def _run(self, full_name: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [self.git, "--git-dir", self._mirror(full_name), *args],
+            capture_output=True,
+            check=False,
+        )
+
+    def handles(self, full_name: str) -> bool:
+        try:
+            return os.path.isdir(self._mirror(full_name))
+        except ValueError:
+            return False
+
+    def default_branch(self, full_name: str) -> str:
+        result = self._run(full_name, "symbolic-ref", "--short", "HEAD")
+        return result.stdout.decode("utf-8").strip() or "main"
+
+    def resolve_ref(self, full_name: str, ref: str):
+        if not ref or ref.startswith("-"):
+            return None
+        result = self._run(full_name, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode("ascii").strip()
+
+    def _ls_tree(self, full_name: str, sha: str, *paths: str, recursive: bool = False) -> list[TreeEntry] | None:
+        """`git ls-tree -l` of `paths` (the root by default) at `sha`; None if the commit is unknown."""
+        if not _COMMIT_SHA.fullmatch(sha or ""):
+            return None
+        result = self._run(full_name, "ls-tree", "-l", "-z", *(("-r", "-t") if recursive else ()), sha, "--", *paths)
+        if result.returncode != 0:
+            return None
+        entries = []
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            _, type_, object_sha, size = meta.split()
+            entries.append(TreeEntry(
+                path.decode("utf-8", errors="replace"),
+                type_.decode("ascii"),
+                None if size == b"-" else int(size),
+                object_sha.decode("ascii"),
+            ))
+        return entries
+
+    def list_tree(self, full_name: str, sha: str):
+        entries = self._ls_tree(full_name, sha, recursive=True)
+        return commit_not_found(full_name, sha) if entries is None else entries
+
+    def list_dir(self, full_name: str, sha: str, path: str):
+        path = path.strip("/")
+        entries = self._ls_tree(full_name, sha, path) if path else []
+        if entries is None:
+            return commit_not_found(full_name, sha)
+        if path and not entries:
+            return path_not_found(full_name, sha, path)
+        if path and entries[0].type != "tree":
+            return ("file", path.rsplit("/", 1)[-1], path, entries[0].size)
+        # A trailing slash lists the directory's children.
+        entries = self._ls_tree(full_name, sha, f"{path}/") if path else self._ls_tree(full_name, sha)
+        if entries is None:
+            return commit_not_found(full_name, sha)
+        return [("dir" if e.type == "tree" else "file", e.path.rsplit("/", 1)[-1], e.path, e.size) for e in entries]
+
+    def _cat_file(self, full_name: str):
+        with self._lock:
+            entry = self._cat_files.get(full_name)
+            if entry is None or entry[0].poll() is not None:
+                proc = subprocess.Popen(
+                    [self.git, "--git-dir", self._mirror(full_name), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+                entry = self._cat_files[full_name] = (proc, threading.Lock())
+            return entry
+
+    def read_blob(self, full_name: str, sha: str, path: str):
+        chunks = []
+        size = self.stream_blob(full_name, sha, path, chunks.append, chunk_size=None)
+        return None if size is None else b"".join(chunks)
+
+    def stream_blob(self, full_name: str, sha: str, path: str, sink: Callable[[bytes], None], chunk_size: int | None = CHUNK_BYTES):
+        path = path.strip("/")
+        if "\n" in path:
+            return None
+        proc, lock = self._cat_file(full_name)
+        with lock:
+            proc.stdin.write(f"{sha}:{path}\n".encode("utf-8"))
+            proc.stdin.flush()
+            header = proc.stdout.readline().rstrip(b"\n")
+            if header.endswith((b" missing", b" ambiguous")):
+                # "<sha>:<path> missing": nothing else follows. The path may contain spaces.
+                return None
+            _, type_, size = header.rsplit(b" ", 2)
+            remaining = size = int(size)
+            while remaining:
+                # The object is always consumed in full to keep the batch stream in sync.
+                chunk = proc.stdout.read(min(remaining, chunk_size or remaining))
+                if not chunk:
+                    raise EOFError(f"git cat-file exited while reading {full_name}:{path}")
+                remaining -= len(chunk)
+                if type_ == b"blob":
+                    sink(chunk)
+            proc.stdout.read(1)  # trailing newline
+        return size if type_ == b"blob" else None
+
+    def close(self) -> None:
+        """Stop the `git cat-file` helper processes."""
+        with self._lock:
+            for proc, _ in self._cat_files.values():
+                if proc.poll() is None:
+                    proc.stdin.close()
+                    try:
+                        proc.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                proc.stdout.close()
+            self._cat_files.clear()
+
+
+# -----------------------------
+# Backend registry
+# -----------------------------
+_local_backends: list[RepoBackend] = []
+
+
+def register_backend(backend: RepoBackend) -> None:
+    """Serve the repositories `backend` handles from it instead of the GitHub API."""
+    _local_backends.insert(0, backend)
+    logger.info("Registered repository backend %s", type(backend).__name__)
+
+
+def unregister_backend(backend: RepoBackend) -> None:
+    if backend in _local_backends:
+        _local_backends.remove(backend)
+
+
+def close_backends() -> None:
+    """Close every registered backend (stops e.g. `git cat-file` helpers); runs at exit."""
+    for backend in list(_local_backends):
+        try:
+            backend.close()
+        except Exception as e:
+            logger.warning("Closing backend %s failed: %s", type(backend).__name__, e)
+
+
+atexit.register(close_backends)
+
+
+def get_local_backend(full_name: str) -> RepoBackend | None:
+    """The most recently registered backend that handles `owner/repo`, if any."""
+    return next((b for b in _local_backends if b.handles(full_name)), None)
@@ -0,0 +1,206 @@
+# cache.py
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .utils import logger
+
+
+# -----------------------------
+# TTLCache
+# -----------------------------
+class TTLCache:
+    """
+    Small thread-safe key/value cache whose entries expire after `ttl` seconds.
+
+    Used for cheap-to-keep, expensive-to-fetch handles (e.g. PyGithub
+    `Repository` objects) that are shared across concurrent sessions.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: dict[Any, tuple[float, Any]] = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                # Drop the entry closest to expiry to make room.
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (self._clock() + self.ttl, value)
+
+    def get_or_create(self, key, factory: Callable[[], Any]):
+        """Return the cached value for `key`, calling `factory()` on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# -----------------------------
+# ContentCache
+# -----------------------------
+class ContentCache:
+    """
+    Two-tier byte cache for immutable repository content.
+
+    Keys are tuples such as ("file", "owner/repo", <commit sha>, <path>). Because
+    the commit SHA is part of the key, an entry can never go stale and is only
+    ever dropped to reclaim space.
+
+    - Memory tier: LRU bounded by `max_memory_bytes`.
+    - Disk tier (optional): SQLite file at `disk_path`, bounded by `max_disk_bytes`
+      and evicted least-recently-used first.
+
+    Hit/miss counters are available through `stats()`.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_path: str | None = None, max_disk_bytes: int = 0):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[tuple, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        self._db = None
+        self._disk_bytes = 0
+        if disk_path:
+            self._open_disk(disk_path)
+
+    # ---- disk tier ----
+    def _open_disk(self, disk_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS content ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS content_last_access ON content(last_access)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM content").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning("Content cache disk tier disabled (%s): %s", disk_path, e)
+            self._db = None
+
+    @staticmethod
+    def _disk_key(key: tuple) -> str:
+        return "\x1f".join(str(part) for part in key)
+
+    def _disk_get(self, key: tuple) -> bytes | None:
+        dkey = self._disk_key(key)
+        row = self._db.execute("SELECT value FROM content WHERE key = ?", (dkey,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE content SET last_access = ? WHERE key = ?", (time.time(), dkey))
+        return bytes(row[0])
+
+    def _disk_put(self, key: tuple, value: bytes) -> None:
+        size = len(value)
+        if size > self.max_disk_bytes:
+            return
+        dkey = self._disk_key(key)
+        previous = self._db.execute("SELECT size FROM content WHERE key = ?", (dkey,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO content (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+            (dkey, sqlite3.Binary(value), size, time.time()),
+        )
+        self._disk_bytes += size - (previous[0] if previous else 0)
+        while self._disk_bytes > self.max_disk_bytes:
+            victim = self._db.execute("SELECT key, size FROM content ORDER BY last_access LIMIT 1").fetchone()
+            if victim is None:
+                break
+            self._db.execute("DELETE FROM content WHERE key = ?", (victim[0],))
+            self._disk_bytes -= victim[1]
+            self._counters["disk_evictions"] += 1
+
+    # ---- memory tier ----
+    def _memory_put(self, key: tuple, value: bytes) -> None:
+        if len(value) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._counters["evictions"] += 1
+
+    # ---- public API ----
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return value
+            if self._db is not None:
+                value = self._disk_get(key)
+                if value is not None:
+                    self._counters["disk_hits"] += 1
+                    self._memory_put(key, value)
+                    return value
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: tuple, value: bytes) -> None:
+        with self._lock:
+            self._memory_put(key, value)
+            if self._db is not None:
+                self._disk_put(key, value)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_enabled": self._db is not None,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop every entry in both tiers and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for name in self._counters:
+                self._counters[name] = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM content")
+                self._disk_bytes = 0
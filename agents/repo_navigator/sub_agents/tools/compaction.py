@@ -0,0 +1,276 @@
+# compaction.py
+import ast
+import io
+import os
+import re
+import tokenize
+
+from .line_window import LineWindow
+from .utils import error_response
+
+# Compaction levels, each including the previous one:
+# - headers: elide license headers and generated code
+# - comments: also drop comments and docstrings
+# - signatures: also collapse function bodies to `...` (Python; other languages stop at comments)
+COMPACT_MODES = ("headers", "comments", "signatures")
+# Largest file buffered for compaction; bigger files are returned as streamed, uncompacted.
+COMPACT_MAX_BYTES = int(os.getenv("COMPACT_MAX_BYTES", str(512 * 1024)))
+
+C_STYLE_EXTENSIONS = frozenset({
+    ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".java", ".kt", ".kts", ".scala", ".go", ".rs", ".swift",
+    ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".php", ".dart",
+})
+HASH_COMMENT_EXTENSIONS = frozenset({
+    ".sh", ".bash", ".zsh", ".rb", ".pl", ".r", ".yml", ".yaml", ".toml", ".cfg", ".ini", ".mk",
+})
+HASH_COMMENT_FILES = frozenset({"Makefile", "Dockerfile", "Procfile", ".gitignore", ".dockerignore"})
+
+_LICENSE = re.compile(r"copyright|licen[cs]e|spdx-license-identifier|all rights reserved", re.I)
+_HEADER_COMMENT = re.compile(r"^\s*(#(?!!)|//|/\*|\*|\*/|<!--|-->|--|;)")
+_GENERATED_FILE = re.compile(r"@generated|code generated .* do not edit|auto-?generated file|<auto-generated", re.I)
+_GENERATED_BEGIN = re.compile(r"\b(begin|start) (auto-?)?generated\b|<editor-fold.*generated", re.I)
+_GENERATED_END = re.compile(r"\bend (auto-?)?generated\b|</editor-fold>", re.I)
+
+
+def check_compact(compact: str | None) -> dict | None:
+    """Error dict for an unknown `compact` argument, else None."""
+    if compact is not None and compact not in COMPACT_MODES + ("none",):
+        return error_response(f"Unknown compact mode '{compact}'; use one of {', '.join(COMPACT_MODES)} or none.")
+    return None
+
+
+def _elided(count: int, what: str) -> str:
+    return f"[{count} line{'' if count == 1 else 's'} elided: {what}]"
+
+
+def _language(path: str) -> str | None:
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    if ext in (".py", ".pyi"):
+        return "python"
+    if ext in C_STYLE_EXTENSIONS:
+        return "c"
+    if ext in HASH_COMMENT_EXTENSIONS or name in HASH_COMMENT_FILES or name.startswith("Dockerfile"):
+        return "hash"
+    return None
+
+
+# -----------------------------
+# Comment stripping
+# -----------------------------
+def _strip_python(text: str, lines: list, out: list, signatures: bool) -> bool:
+    """Drop comments and docstrings (and bodies) in `out`; False if the source does not parse."""
+    try:
+        tree = ast.parse(text)
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (SyntaxError, ValueError, tokenize.TokenError):
+        return False
+
+    for token in tokens:
+        if token.type == tokenize.COMMENT and not (token.start == (1, 0) and token.string.startswith("#!")):
+            row, col = token.start
+            before = lines[row - 1][:col]
+            out[row - 1] = before.rstrip() if before.strip() else None
+
+    def replace(start: int, end: int, text: str | None) -> None:
+        out[start - 1] = text
+        for i in range(start, end):
+            out[i] = None
+
+    def visit(node) -> None:
+        body = getattr(node, "body", None)
+        if not isinstance(body, list) or not body:
+            return
+        is_function = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        indent = " " * body[0].col_offset
+        if signatures and is_function and body[0].lineno > node.lineno:
+            replace(body[0].lineno, node.end_lineno, indent + "...")
+            return
+        first = body[0]
+        if isinstance(node, (ast.Module, ast.ClassDef)) or is_function:
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+                if first.lineno > getattr(node, "lineno", 0):
+                    replace(first.lineno, first.end_lineno, indent + "..." if len(body) == 1 else None)
+        for child in ast.iter_child_nodes(node):
+            visit(child)
+
+    visit(tree)
+    return True
+
+
+def _strip_c_style(text: str, lifetimes: bool = False) -> str:
+    """
+    Blank out // and /* */ comments outside string literals, keeping line breaks.
+    With `lifetimes` (Rust), a single quote only opens a char literal like 'a' or '\\n'.
+    """
+    out, i, n = [], 0, len(text)
+    quote = None
+    while i < n:
+        ch = text[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+        elif ch in "\"`" or (ch == "'" and not (lifetimes and text[i + 1:i + 2] != "\\" and text[i + 2:i + 3] != "'")):
+            quote = ch
+            out.append(ch)
+            i += 1
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            out.append("\n" * text.count("\n", i, end))
+            i = end
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _strip_comments(path: str, language: str, text: str, lines: list, out: list, signatures: bool) -> bool:
+    """Apply comment stripping for `language` to `out`; returns whether bodies were collapsed."""
+    if language == "python":
+        if _strip_python(text, lines, out, signatures):
+            return signatures
+        language = "hash"  # unparsable: at least drop full-line comments
+    if language == "c":
+        stripped = _strip_c_style(text, lifetimes=path.endswith(".rs")).split("\n")
+        for i, line in enumerate(stripped[:len(out)]):
+            out[i] = line.rstrip() if line.strip() or not lines[i].strip() else None
+    elif language == "hash":
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith("#") and not (i == 0 and line.startswith("#!")):
+                out[i] = None
+    return False
+
+
+# -----------------------------
+# Headers and generated code
+# -----------------------------
+def _license_header(lines: list) -> tuple[int, int] | None:
+    """1-based line range of a leading comment block that mentions a license."""
+    start = 1 if lines and lines[0].startswith("#!") else 0
+    end = start
+    while end < len(lines) and (not lines[end].strip() or _HEADER_COMMENT.match(lines[end])):
+        end += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if end > start and any(_LICENSE.search(line) for line in lines[start:end]):
+        return start + 1, end
+    return None
+
+
+def _generated_regions(lines: list) -> list[tuple[int, int]]:
+    regions, begin = [], None
+    for number, line in enumerate(lines, 1):
+        if begin is None and _GENERATED_BEGIN.search(line):
+            begin = number
+        elif begin is not None and _GENERATED_END.search(line):
+            regions.append((begin, number))
+            begin = None
+    return regions
+
+
+def compact_source(path: str, data: bytes, mode: str) -> tuple[bytes, dict]:
+    """
+    Deterministically shrink a source file before it is shown to a model.
+
+    Uses Python's tokenizer and AST for .py files and a string-aware scanner for
+    C-style languages; other files only get license/generated-code elision. Elided
+    spans are replaced by one "[N lines elided: ...]" line and blank-line runs are
+    collapsed, so the model still sees where code was removed.
+
+    Returns (compacted bytes, {"mode", "original_bytes", "compacted_bytes",
+    "compression_ratio"}) where mode is the level actually applied and the ratio
+    is original over compacted size.
+    """
+    text = str(data, "utf-8", errors="ignore")
+    lines = text.split("\n")
+    language = _language(path)
+    applied = "headers"
+
+    if any(_GENERATED_FILE.search(line) for line in lines[:5]):
+        head = [line for line in lines[:5] if line.strip()][:1]
+        result = "\n".join(head + [_elided(len(text.splitlines()) - len(head), "generated file")]) + "\n"
+    else:
+        out = list(lines)
+        if mode in ("comments", "signatures") and language:
+            applied = "signatures" if _strip_comments(path, language, text, lines, out, mode == "signatures") else "comments"
+
+        spans = [(start, end, "generated code") for start, end in _generated_regions(lines)]
+        header = _license_header(lines)
+        if header:
+            spans.append((*header, "license header"))
+        for start, end, what in spans:
+            out[start - 1] = _elided(end - start + 1, what)
+            for i in range(start, end):
+                out[i] = None
+
+        kept, blank = [], False
+        for line in out:
+            if line is None:
+                continue
+            if not line.strip():
+                if blank:
+                    continue
+                blank = True
+            else:
+                blank = False
+            kept.append(line)
+        result = "\n".join(kept)
+
+    compacted = result.encode("utf-8")
+    return compacted, {
+        "mode": applied,
+        "original_bytes": len(data),
+        "compacted_bytes": len(compacted),
+        "compression_ratio": round(len(data) / len(compacted), 2) if compacted else None,
+    }
+
+
+# -----------------------------
+# Streaming
+# -----------------------------
+class CompactionSink:
+    """
+    `stream_blob` sink for compacted reads that keeps memory bounded.
+
+    Every chunk goes through the caller's byte-capped `LineWindow`, as for a plain
+    read. Up to `max_bytes` (default COMPACT_MAX_BYTES) of the file are also buffered; if the whole file fits,
+    `result` compacts it and cuts the window out of the compacted text. A bigger
+    file drops its buffer and `result` returns the plain window, flagged in
+    "compaction" as not compacted.
+    """
+
+    def __init__(self, window: LineWindow, max_bytes: int | None = None):
+        self.window = window
+        self.max_bytes = max_bytes or COMPACT_MAX_BYTES
+        self._data: bytearray | None = bytearray()
+
+    def feed(self, chunk) -> None:
+        self.window.feed(chunk)
+        if self._data is not None:
+            if len(self._data) + len(chunk) > self.max_bytes:
+                self._data = None
+            else:
+                self._data += chunk
+
+    def result(self, path: str, mode: str) -> dict:
+        if self._data is None:
+            result = self.window.result()
+            result["compaction"] = {"mode": "none", "original_bytes": self.window.total_bytes,
+                                    "skipped": f"larger than {self.max_bytes} bytes"}
+            return result
+        compacted, stats = compact_source(path, bytes(self._data), mode)
+        window = LineWindow(self.window.start_line, self.window.end_line, self.window.max_bytes)
+        window.feed(compacted)
+        result = window.result()
+        result["compaction"] = stats
+        return result
@@ -0,0 +1,378 @@
+# dependency_graph.py
+import configparser
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+import tomllib
+import tracemalloc
+from collections import Counter, deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .symbol_index import build_symbol_index
+from .utils import logger
+
+# Bump when the graph layout changes so cached graphs are rebuilt.
+GRAPH_VERSION = 1
+# Build/run config files read for entry points, and the largest one read.
+DEPENDENCY_GRAPH_MAX_CONFIG_FILES = int(os.getenv("DEPENDENCY_GRAPH_MAX_CONFIG_FILES", "200"))
+DEPENDENCY_GRAPH_MAX_CONFIG_BYTES = int(os.getenv("DEPENDENCY_GRAPH_MAX_CONFIG_BYTES", str(256 * 1024)))
+# Trace allocations during a build to report its peak memory. tracemalloc is
+# process-wide: it slows every thread down while a build runs and overlapping
+# builds share one trace, so this is for benchmarks, not serving.
+DEPENDENCY_GRAPH_TRACE_MEMORY = os.getenv("DEPENDENCY_GRAPH_TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+
+CONFIG_FILE_NAMES = frozenset({
+    "Makefile", "makefile", "GNUmakefile", "Procfile", "pyproject.toml", "setup.cfg", "package.json",
+})
+
+
+def _is_config_file(path: str) -> bool:
+    name = posixpath.basename(path)
+    return name in CONFIG_FILE_NAMES or name.startswith("Dockerfile") or name.endswith(".dockerfile")
+
+
+# -----------------------------
+# Module names
+# -----------------------------
+def _module_parts(path: str) -> list[str]:
+    parts = posixpath.splitext(path)[0].split("/")
+    return parts[:-1] if parts[-1] == "__init__" else parts
+
+
+def _module_tables(paths, packages: set[str]) -> tuple[dict, dict]:
+    """
+    Map dotted module names to file paths.
+
+    `full` names modules by their path from the repository root. `short` names them
+    from their outermost package (or their own directory for scripts), which is how
+    they are imported when a source root like src/ is on sys.path. A short name
+    shared by several files maps to all of them.
+    """
+    full, short = {}, {}
+    for path in paths:
+        parts = _module_parts(path)
+        if not parts:
+            continue
+        full.setdefault(".".join(parts), path)
+        dirs = path.split("/")[:-1]
+        root = len(dirs)
+        while root > 0 and "/".join(dirs[:root]) in packages:
+            root -= 1
+        if root:
+            short.setdefault(".".join(parts[root:]), []).append(path)
+    return full, short
+
+
+def _closest(candidates: list[str], importer: str) -> str:
+    """The candidate sharing the longest directory prefix with the importing file."""
+    return max(candidates, key=lambda c: (len(posixpath.commonpath([c, importer])), -len(c)))
+
+
+def _lookup(name: str, importer: str, full: dict, short: dict) -> str | None:
+    if name in full:
+        return full[name]
+    candidates = short.get(name)
+    return _closest(candidates, importer) if candidates else None
+
+
+def _resolve_import(record: dict, importer: str, full: dict, short: dict) -> tuple[list[str], str | None]:
+    """
+    Files an import statement refers to, and the top-level name of the package when
+    it is not part of the repository (None for stdlib and unresolved relative imports).
+    """
+    if record["level"]:
+        package = _module_parts(importer)
+        if not importer.endswith("__init__.py") and not importer.endswith("__init__.pyi"):
+            package = package[:-1]
+        package = package[:len(package) - record["level"] + 1] if record["level"] > 1 else package
+        base = ".".join(package + ([record["module"]] if record["module"] else []))
+        lookup = lambda name: full.get(name)  # noqa: E731 - relative names are always full
+    else:
+        base = record["module"]
+        lookup = lambda name: _lookup(name, importer, full, short)  # noqa: E731
+
+    targets = [t for t in (lookup(f"{base}.{n}" if base else n) for n in record["names"]) if t]
+    # `import a.b.c` / `from a.b import c` also imports the packages on the way down.
+    parts = base.split(".") if base else []
+    for end in range(len(parts), 0, -1):
+        target = lookup(".".join(parts[:end]))
+        if target:
+            targets.append(target)
+            break
+
+    if targets or record["level"] or not parts:
+        return targets, None
+    top = parts[0]
+    return [], None if top in sys.stdlib_module_names else top
+
+
+# -----------------------------
+# Entry points from build/run config
+# -----------------------------
+def _script_entry(config_path: str, name: str, target: str, full: dict, short: dict) -> dict:
+    """`name = pkg.cli:main` → entry point on pkg/cli.py when it is in the repository."""
+    module = target.split(":")[0].strip()
+    path = _lookup(module, config_path, full, short) or config_path
+    return {"path": path, "kind": "console_script", "detail": f"{name} = {target.strip()}"}
+
+
+def _pyproject_entries(path: str, text: str, full: dict, short: dict) -> list[dict]:
+    data = tomllib.loads(text)
+    project = data.get("project", {})
+    scripts = {**project.get("scripts", {}), **project.get("gui-scripts", {})}
+    scripts.update(data.get("tool", {}).get("poetry", {}).get("scripts", {}))
+    return [_script_entry(path, name, target, full, short)
+            for name, target in scripts.items() if isinstance(target, str)]
+
+
+def _setup_cfg_entries(path: str, text: str, full: dict, short: dict) -> list[dict]:
+    parser = configparser.ConfigParser()
+    parser.read_string(text)
+    entries = []
+    for section in ("console_scripts", "gui_scripts"):
+        raw = parser.get("options.entry_points", section, fallback="")
+        for line in raw.splitlines():
+            if "=" in line:
+                name, target = line.split("=", 1)
+                entries.append(_script_entry(path, name.strip(), target, full, short))
+    return entries
+
+
+_MAKE_TARGET = re.compile(r"^([A-Za-z0-9_.\-/]+)\s*:(?!=)")
+
+
+def _makefile_entries(path: str, text: str) -> list[dict]:
+    """Each non-special target with the first command of its recipe."""
+    entries, current = [], None
+    for number, line in enumerate(text.splitlines(), 1):
+        match = _MAKE_TARGET.match(line)
+        if match:
+            current = None
+            if not match.group(1).startswith("."):
+                current = {"path": path, "kind": "make_target", "line": number, "detail": match.group(1)}
+                entries.append(current)
+        elif current and line.startswith("\t") and line.strip():
+            current["detail"] += f": {line.strip().lstrip('@')}"
+            current = None
+    return entries
+
+
+def _dockerfile_entries(path: str, text: str) -> list[dict]:
+    return [
+        {"path": path, "kind": "docker", "line": number, "detail": line.strip()}
+        for number, line in enumerate(text.splitlines(), 1)
+        if line.lstrip().upper().startswith(("CMD ", "ENTRYPOINT "))
+    ]
+
+
+def _procfile_entries(path: str, text: str) -> list[dict]:
+    return [
+        {"path": path, "kind": "procfile", "line": number, "detail": line.strip()}
+        for number, line in enumerate(text.splitlines(), 1)
+        if re.match(r"^[\w-]+\s*:", line)
+    ]
+
+
+def _package_json_entries(path: str, text: str) -> list[dict]:
+    data = json.loads(text)
+    scripts = data.get("scripts") or {}
+    entries = [{"path": path, "kind": "npm_script", "detail": f"{name}: {scripts[name]}"}
+               for name in ("start", "serve", "dev") if isinstance(scripts.get(name), str)]
+    bins = data.get("bin") or {}
+    if isinstance(bins, str):
+        bins = {data.get("name", "bin"): bins}
+    entries += [{"path": path, "kind": "npm_bin", "detail": f"{name}: {target}"} for name, target in bins.items()]
+    return entries
+
+
+def _config_entries(path: str, data: bytes, full: dict, short: dict) -> list[dict]:
+    text = str(data, "utf-8", errors="ignore")
+    name = posixpath.basename(path)
+    try:
+        if name == "pyproject.toml":
+            return _pyproject_entries(path, text, full, short)
+        if name == "setup.cfg":
+            return _setup_cfg_entries(path, text, full, short)
+        if name == "package.json":
+            return _package_json_entries(path, text)
+        if name == "Procfile":
+            return _procfile_entries(path, text)
+        if name in ("Makefile", "makefile", "GNUmakefile"):
+            return _makefile_entries(path, text)
+        return _dockerfile_entries(path, text)
+    except (ValueError, configparser.Error, AttributeError) as e:
+        logger.warning("Skipping unparsable %s: %s", path, e)
+        return []
+
+
+# -----------------------------
+# Graph build
+# -----------------------------
+def _reach(modules: dict, start: str) -> int:
+    seen, queue = {start}, deque([start])
+    while queue:
+        for target in modules[queue.popleft()]["imports"]:
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return len(seen) - 1
+
+
+def build_dependency_graph(backend, full_name: str, sha: str, cache) -> dict:
+    """
+    Build (or load) the module import graph and entry points of full_name@sha.
+
+    Python imports come from the commit's symbol index, so files already indexed
+    are not read again. Entry points are `__main__` guards and `__main__.py`
+    modules, application objects (`app = FastAPI()`, `root_agent = Agent(...)`),
+    console scripts from pyproject.toml/setup.cfg, Makefile targets, Dockerfile
+    CMD/ENTRYPOINT lines, Procfile processes and package.json start scripts.
+    The graph is cached in `cache` under the commit SHA, unless some files could
+    not be read: a partial graph is returned (stats.failed_reads) but rebuilt on
+    the next call. stats.max_rss_growth_bytes is how much the process's peak
+    resident memory grew during the build: approximate, since other threads
+    count too and parse workers do not. With DEPENDENCY_GRAPH_TRACE_MEMORY,
+    stats.peak_memory_bytes is the traced peak of the build's allocations.
+
+    Returns {"modules": {path: {"imports": [...], "external": [...]}},
+    "entry_points": [...], "stats": {...}} or an error dict.
+    """
+    key = ("depgraph", GRAPH_VERSION, full_name, sha)
+    cached = cache.get(key)
+    if cached is not None:
+        graph = json.loads(cached)
+        graph["stats"]["graph_bytes"] = len(cached)
+        return graph
+
+    tracing = DEPENDENCY_GRAPH_TRACE_MEMORY and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    max_rss = _max_rss_bytes()
+    started = time.perf_counter()
+    try:
+        graph = _build(backend, full_name, sha, cache)
+        if "error" in graph:
+            return graph
+        graph["stats"]["seconds"] = round(time.perf_counter() - started, 3)
+        graph["stats"]["max_rss_growth_bytes"] = max(0, _max_rss_bytes() - max_rss)
+        if tracing:
+            graph["stats"]["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    payload = json.dumps(graph).encode("utf-8")
+    graph["stats"]["graph_bytes"] = len(payload)
+    if graph["stats"]["failed_reads"]:
+        logger.warning("Dependency graph of %s@%s is partial, not cached: %s", full_name, sha, graph["stats"])
+        return graph
+    cache.put(key, payload)
+    logger.info("Dependency graph of %s@%s: %s", full_name, sha, graph["stats"])
+    return graph
+
+
+def _max_rss_bytes() -> int:
+    """Peak resident memory of this process so far (0 where getrusage is unavailable)."""
+    if resource is None:
+        return 0
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def _build(backend, full_name: str, sha: str, cache) -> dict:
+    index = build_symbol_index(backend, full_name, sha, cache)
+    if "error" in index:
+        return index
+    entries = backend.list_tree(full_name, sha)
+    if isinstance(entries, dict) and "error" in entries:
+        return entries
+
+    files = index["files"]
+    packages = {posixpath.dirname(p) for p in files if posixpath.basename(p) in ("__init__.py", "__init__.pyi")}
+    full, short = _module_tables(files, packages)
+
+    modules, entry_points = {}, []
+    for path, parsed in files.items():
+        imports, external = [], set()
+        for record in parsed["imports"]:
+            targets, package = _resolve_import(record, path, full, short)
+            imports.extend(t for t in targets if t != path)
+            if package:
+                external.add(package)
+        modules[path] = {"imports": sorted(set(imports)), "external": sorted(external)}
+
+        if posixpath.basename(path) == "__main__.py":
+            entry_points.append({"path": path, "kind": "main_module"})
+        if parsed.get("main_line"):
+            entry_points.append({"path": path, "kind": "main_guard", "line": parsed["main_line"]})
+        entry_points.extend(
+            {"path": path, "kind": "app_object", "line": app["line"], "detail": f"{app['name']} = {app['factory']}(...)"}
+            for app in parsed.get("app_objects", [])
+        )
+
+    configs = [e for e in entries or [] if e.type == "blob" and _is_config_file(e.path)
+               and (e.size or 0) <= DEPENDENCY_GRAPH_MAX_CONFIG_BYTES][:DEPENDENCY_GRAPH_MAX_CONFIG_FILES]
+    failed_reads = len(index.get("failed", []))
+    for entry in configs:
+        data = backend.read_blob(full_name, sha, entry.path)
+        if data is None or isinstance(data, dict):
+            failed_reads += 1
+        else:
+            entry_points.extend(_config_entries(entry.path, bytes(data), full, short))
+
+    for entry_point in entry_points:
+        if entry_point["path"] in modules:
+            entry_point["reaches"] = _reach(modules, entry_point["path"])
+
+    return {
+        "modules": modules,
+        "entry_points": entry_points,
+        "stats": {
+            "files": len(modules),
+            "edges": sum(len(m["imports"]) for m in modules.values()),
+            "entry_points": len(entry_points),
+            "index_seconds": index["stats"]["seconds"],
+            "failed_reads": failed_reads,
+        },
+    }
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def imported_by(graph: dict, path: str) -> list[str]:
+    return sorted(p for p, module in graph["modules"].items() if path in module["imports"])
+
+
+def central_modules(graph: dict, limit: int) -> list[dict]:
+    """Internal modules imported by the most other files."""
+    counts = Counter(t for module in graph["modules"].values() for t in module["imports"])
+    return [{"path": path, "imported_by": n} for path, n in counts.most_common(limit)]
+
+
+def external_packages(graph: dict, limit: int) -> list[dict]:
+    counts = Counter(p for module in graph["modules"].values() for p in module["external"])
+    return [{"name": name, "files": n} for name, n in counts.most_common(limit)]
+
+
+def reachable(graph: dict, path: str, depth: int) -> list[dict]:
+    """Files imported from `path`, directly (depth 1) or through up to `depth` hops, nearest first."""
+    modules = graph["modules"]
+    seen, level, out = {path}, [path], []
+    for hop in range(1, depth + 1):
+        next_level = []
+        for source in level:
+            for target in modules[source]["imports"]:
+                if target not in seen:
+                    seen.add(target)
+                    next_level.append(target)
+                    out.append({"path": target, "depth": hop})
+        level = next_level
+    return out
@@ -0,0 +1,253 @@
+# github_http.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+from urllib.parse import quote
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from github.Requester import HTTPSRequestsConnectionClass, RequestsResponse
+
+from .metrics import tool_metrics
+from .rate_limit import RateLimitScheduler, github_scheduler
+from .utils import logger
+
+# REST API root; GitHub Enterprise servers use https://<host>/api/v3.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+
+# -----------------------------
+# ETag store
+# -----------------------------
+class ETagStore:
+    """
+    Byte-bounded LRU of the last 200 response seen per (URL, credentials, Accept).
+
+    Used to send `If-None-Match` and to replay the stored body when GitHub
+    answers 304 Not Modified (which does not count against the rate limit).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[str, dict, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._counters = {"conditional_requests": 0, "not_modified": 0, "stored": 0}
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, etag: str, headers: dict, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[2])
+            self._entries[key] = (etag, headers, body)
+            self._bytes += len(body)
+            self._counters["stored"] += 1
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+    def clear(self) -> None:
+        """Drop every stored response and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+# -----------------------------
+# Conditional-request adapter
+# -----------------------------
+class ConditionalRequestAdapter(requests.adapters.HTTPAdapter):
+    """
+    HTTPAdapter that revalidates GET requests with stored ETags.
+
+    A 304 is rewritten into the cached 200 response (with the fresh rate-limit
+    headers from the 304 merged in), so callers such as PyGithub never see it.
+    With a `scheduler`, every request is paced and sent with a token leased from
+    it, and rate-limited responses are retried there. ETags stay keyed on the
+    client's own credentials, so revalidation works whichever token is leased.
+    """
+
+    def __init__(self, etag_store: ETagStore, scheduler: RateLimitScheduler | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.etag_store = etag_store
+        self.scheduler = scheduler
+
+    @staticmethod
+    def _key(request) -> tuple:
+        # Hash credentials so tokens are not kept around in cache keys.
+        auth = hashlib.sha256(request.headers.get("Authorization", "").encode("utf-8")).hexdigest()
+        return (request.url, auth, request.headers.get("Accept", ""))
+
+    def send(self, request, stream=False, **kwargs):
+        key = self._key(request)
+        if self.scheduler is None:
+            return self._send(request, key, stream, **kwargs)
+
+        def attempt(token):
+            if token:
+                request.headers["Authorization"] = f"token {token}"
+            return self._send(request, key, stream, **kwargs)
+
+        return self.scheduler.send(attempt)
+
+    def _send(self, request, key: tuple, stream: bool, **kwargs):
+        if request.method != "GET" or stream:
+            response = super().send(request, stream=stream, **kwargs)
+            tool_metrics.record_api_call(0 if stream else len(response.content), response.headers)
+            return response
+
+        cached = self.etag_store.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+            self.etag_store.count("conditional_requests")
+
+        response = super().send(request, stream=stream, **kwargs)
+        tool_metrics.record_api_call(len(response.content), response.headers)
+
+        if response.status_code == 304 and cached is not None:
+            self.etag_store.count("not_modified")
+            headers = CaseInsensitiveDict(cached[1])
+            headers.update(response.headers)
+            response.status_code = 200
+            response.reason = "OK"
+            response.headers = headers
+            response.encoding = requests.utils.get_encoding_from_headers(headers)
+            response._content = cached[2]
+            return response
+
+        etag = response.headers.get("ETag")
+        if response.status_code == 200 and etag:
+            self.etag_store.put(key, etag, dict(response.headers), response.content)
+        return response
+
+
+# -----------------------------
+# PyGithub connection class
+# -----------------------------
+class PooledHTTPSConnection(HTTPSRequestsConnectionClass):
+    """
+    Drop-in PyGithub HTTPS connection for one long-lived, shared client.
+
+    PyGithub keeps a single connection object per client and stashes the request
+    arguments on it between `request()` and `getresponse()`. Here they are kept
+    thread-local so concurrent sessions can share the client, and the session is
+    mounted with a `ConditionalRequestAdapter` sized to `pool_size`.
+    """
+
+    etag_store: ETagStore | None = None
+    scheduler: RateLimitScheduler | None = None
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        super().__init__(host, port, strict, timeout, retry, pool_size, **kwargs)
+        self._local = threading.local()
+        if self.etag_store is not None:
+            self.adapter = ConditionalRequestAdapter(
+                self.etag_store,
+                self.scheduler,
+                max_retries=self.retry,
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+            )
+            self.session.mount("https://", self.adapter)
+
+    def request(self, verb, url, input, headers, stream=False):
+        self._local.args = (verb, url, input, headers, stream)
+
+    def getresponse(self):
+        verb, url, input, headers, stream = self._local.args
+        r = self.session.request(
+            verb,
+            f"{self.protocol}://{self.host}:{self.port}{url}",
+            headers=headers,
+            data=input,
+            timeout=self.timeout,
+            verify=self.verify,
+            allow_redirects=False,
+            stream=stream,
+        )
+        return RequestsResponse(r)
+
+
+def install_pooled_connection(client, etag_store: ETagStore, scheduler: RateLimitScheduler | None = None) -> None:
+    """
+    Route all HTTPS traffic of a PyGithub `Github` client through `PooledHTTPSConnection`
+    (and, when given, the rate-limit `scheduler`).
+
+    PyGithub only exposes a process-wide hook for this (which also disables
+    connection reuse), so the per-client connection class is swapped directly.
+    """
+    connection_class = type("PooledHTTPSConnection", (PooledHTTPSConnection,), {"etag_store": etag_store, "scheduler": scheduler})
+    try:
+        requester = client.requester
+        if getattr(requester, "_Requester__scheme", "https") == "https":
+            requester._Requester__connectionClass = connection_class
+    except AttributeError as e:
+        logger.warning("Could not install pooled GitHub connection: %s", e)
+
+
+# -----------------------------
+# Raw content streaming
+# -----------------------------
+def scheduled_get(url: str, token: str, scheduler: RateLimitScheduler, *, headers: dict | None = None, **kwargs):
+    """
+    `requests.get` through the rate-limit `scheduler`; a leased token replaces
+    `token`. Returns the response (rate-limited only if retries ran out).
+    """
+    def attempt(leased):
+        response = requests.get(url, headers={**(headers or {}), "Authorization": f"token {leased or token}"}, **kwargs)
+        tool_metrics.record_api_call(0, response.headers)
+        return response
+
+    return scheduler.send(attempt)
+
+
+def stream_raw_content(api_url: str, full_name: str, path: str, ref: str, token: str,
+                       sink: Callable[[bytes], None], chunk_size: int = 64 * 1024, timeout: float = 60,
+                       scheduler: RateLimitScheduler = github_scheduler):
+    """
+    Stream a file's raw bytes from the contents API into `sink` without buffering
+    the body (works past the 1 MB limit of base64 content responses).
+
+    Returns the number of bytes streamed, or None if the file does not exist.
+    """
+    with scheduled_get(
+        f"{api_url}/repos/{full_name}/contents/{quote(path)}",
+        token,
+        scheduler,
+        params={"ref": ref},
+        headers={"Accept": "application/vnd.github.raw"},
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                size += len(chunk)
+                sink(chunk)
+        finally:
+            tool_metrics.record_bytes(size)
+        return size
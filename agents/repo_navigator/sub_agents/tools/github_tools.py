@@ -1,30 +1,183 @@
 # github_tools.py
 import os
-import time
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 from github import Github
-from dotenv import load_dotenv
 from github import Github, GithubException, RateLimitExceededException
-
+from google.adk.tools import ToolContext
+from urllib3.util.retry import Retry
+
+from .backends import GitMirrorBackend, RepoBackend, TreeEntry, get_local_backend, register_backend
+from .cache import TTLCache
+from .compaction import CompactionSink, check_compact
+from .dependency_graph import build_dependency_graph, central_modules, external_packages, imported_by, reachable
+from .github_http import GITHUB_API_URL, install_pooled_connection, stream_raw_content
+from .line_window import make_window
+from .metrics import propagate_context
+from .rate_limit import github_scheduler
+from .repo_cache import (
+    UNSHARED,
+    cached_tree,
+    cached_walk,
+    content_cache,
+    etag_store,
+    get_bulk_snapshot,
+    get_snapshot,
+    inflight,
+    store_tree,
+    store_walk,
+    to_sink,
+    tree_key,
+)
+from .structure import (
+    begin_walk,
+    build_structure_from_tree,
+    format_structure,
+    listing_rate_limited,
+    missing_commit,
+    missing_listing,
+    normalize_listing,
+    paginate_structure,
+    structure_page_args,
+    tree_rate_limited,
+    tree_truncated,
+)
+from .symbol_index import build_symbol_index, search_symbols
 from .utils import logger, error_response, tool_safety
 
-load_dotenv()
+# Connections kept alive per host by the shared client's HTTP adapter.
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "20"))
+# Seconds a resolved `Repository` handle is reused before it is fetched again.
+GITHUB_REPO_CACHE_TTL = float(os.getenv("GITHUB_REPO_CACHE_TTL", "300"))
+# Parallel directory listings when the structure has to be walked level by level.
+STRUCTURE_WALK_WORKERS = int(os.getenv("STRUCTURE_WALK_WORKERS", "8"))
+# Directory of bare mirrors (<owner>/<repo>.git) served locally instead of through the API.
+REPO_MIRRORS_DIR = os.getenv("REPO_MIRRORS_DIR") or None
+# Hard cap on the content bytes one read_file_content call returns.
+READ_FILE_MAX_BYTES = int(os.getenv("READ_FILE_MAX_BYTES", "100000"))
+# Session-state key holding {"owner/repo@ref": sha} for refs already resolved.
+RESOLVED_REFS_STATE_KEY = "resolved_refs"
 
 # -----------------------------
 # GitHub client
 # -----------------------------
+# Connection errors and 5xx are retried by urllib3; rate limits by `github_scheduler`.
+TRANSPORT_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+_client_lock = threading.Lock()
+_client = None
+_client_token = None
+_repo_cache = TTLCache(ttl=GITHUB_REPO_CACHE_TTL)
+if REPO_MIRRORS_DIR:
+    register_backend(GitMirrorBackend(REPO_MIRRORS_DIR))
+
+
 def _get_github_client():
-    """Create a GitHub API client from GITHUB_TOKEN."""
+    """
+    Return the process-wide GitHub API client for GITHUB_TOKEN.
+
+    The client (and its pooled keep-alive HTTP session) is created once and
+    reused by every tool call; it is rebuilt only if the token changes. All its
+    GET requests are revalidated with ETags, see `github_http.py`, and paced by
+    `github_scheduler`, which owns rate-limit handling and token rotation (so
+    PyGithub's own throttle and rate-limit retries are turned off).
+    """
+    global _client, _client_token
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         logger.error("GITHUB_TOKEN not set.")
         return None
-    try:
-        return Github(token, timeout=15)
-    except Exception as e:
-        logger.exception("Failed to initialize GitHub client: %s", e)
-        return None
+
+    with _client_lock:
+        if _client is not None and _client_token == token:
+            return _client
+        try:
+            _client = Github(
+                token,
+                base_url=GITHUB_API_URL,
+                timeout=15,
+                pool_size=GITHUB_POOL_SIZE,
+                retry=TRANSPORT_RETRY,
+                seconds_between_requests=None,
+            )
+            install_pooled_connection(_client, etag_store, github_scheduler)
+            _client_token = token
+        except Exception as e:
+            logger.exception("Failed to initialize GitHub client: %s", e)
+            _client, _client_token = None, None
+        return _client
+
+
+def _get_repo(client, owner: str, repo_name: str):
+    """
+    Return a `Repository` handle for owner/repo, cached for GITHUB_REPO_CACHE_TTL.
+
+    Saves the `GET /repos/{owner}/{repo}` round trip on every tool call. Entries
+    are keyed by client as well so a rebuilt client never sees stale handles.
+    """
+    full_name = f"{owner}/{repo_name}"
+    key = (client, full_name.lower())
+    return _repo_cache.get_or_create(key, lambda: inflight.do(("repo", *key), lambda: client.get_repo(full_name)))
+
+
+def resolve_commit_sha(backend, full_name: str, ref: str | None, tool_context: ToolContext | None = None):
+    """
+    Resolve a branch, tag or SHA to a commit SHA, once per session.
+
+    `ref=None` means the repository's default branch. When a `tool_context` is
+    available the result is memoized in session state, so follow-up calls skip
+    the lookup entirely. Returns the SHA or an error dict.
+    """
+    ref = ref or backend.default_branch(full_name)
+    key = f"{full_name}@{ref}"
+    resolved = {}
+    if tool_context is not None:
+        resolved = tool_context.state.get(RESOLVED_REFS_STATE_KEY) or {}
+    if key in resolved:
+        return resolved[key]
+
+    sha = backend.resolve_ref(full_name, ref)
+    if sha is None:
+        return {"error": f"Ref '{ref}' does not exist in repo '{full_name}'."}
+    if isinstance(sha, dict):
+        return sha
+    if tool_context is not None:
+        tool_context.state[RESOLVED_REFS_STATE_KEY] = {**resolved, key: sha}
+    return sha
+
+
+def _missing_path(backend, full_name: str, file_path: str, branch: str | None) -> dict:
+    return {"error": f"Path '{file_path}' does not exist in '{full_name}' on '{branch or backend.default_branch(full_name)}'."}
+
+
+def _read_blob(backend, full_name: str, sha: str, file_path: str, branch: str | None = None):
+    """`backend.read_blob` with the tools' "does not exist" error for missing files."""
+    data = backend.read_blob(full_name, sha, file_path)
+    if data is None:
+        return _missing_path(backend, full_name, file_path, branch)
+    return data
+
+
+def get_etag_stats() -> dict:
+    """Return counters for ETag-revalidated requests (304s are not rate limited)."""
+    return etag_store.stats()
+
+
+def get_content_cache_stats() -> dict:
+    """Return hit/miss counters and sizes of the shared content cache."""
+    return content_cache.stats()
+
+
+def get_coalescing_stats() -> dict:
+    """Return how many fetches ran (`flights`) and how many joined one in flight (`coalesced`)."""
+    return inflight.stats()
 
 
 # -----------------------------
@@ -81,58 +234,175 @@ def extract_owner_and_repo(github_url: str) -> dict:
 
 
             
-def safe_get_contents(repo, path, ref, max_retries=3):
-    """GitHub get_contents() with retries ONLY for rate-limit conditions."""
-    delay = 1
+def safe_get_contents(repo, path, ref):
+    """GitHub get_contents() with structured errors; rate limits are retried by `github_scheduler`."""
+    try:
+        return repo.get_contents(path, ref=ref)
+    except RateLimitExceededException:
+        return listing_rate_limited(path)
+    except GithubException as e:
+        if e.status == 404:
+            return missing_listing(repo.full_name, path, ref)
+        # Non-404 GithubException → raise immediately
+        raise e
 
-    for attempt in range(max_retries):
-        try:
-            return repo.get_contents(path, ref=ref)
 
-        # ------------------------------------
-        # Retry ONLY RateLimitExceededException
-        # ------------------------------------
-        except RateLimitExceededException:
-            if attempt == max_retries - 1:
-                # Final retry failed → return structured error
-                return error_response(f"Rate limited while fetching path: {path}")
-
-            print(f"⚠️ GitHub rate-limited {path}. Retrying in {delay}s...")
-            time.sleep(delay)
-            delay = min(delay * 2, 8)  # exponential backoff
-            continue
-
-        # ------------------------------------
-        # 404 → return clean structured error
-        # ------------------------------------
-        except GithubException as e:
-            if e.status == 404:
-                return {
-                    "error": (
-                        f"Path '{path}' does not exist in repo "
-                        f"'{repo.full_name}' on ref '{ref}'."
-                    )
-                }
-            # Non-404 GithubException → no retry, raise immediately
-            raise e
+def safe_get_tree(repo, sha):
+    """
+    Fetch the full recursive Git tree for commit `sha` in one request.
 
-        # ------------------------------------
-        # Any OTHER exception → no retry
-        # ------------------------------------
-        except Exception:
-            raise
+    Returns a list of `TreeEntry`, None when GitHub reports the tree as
+    truncated (caller should fall back to a directory walk), or an error dict.
+    Complete trees are stored in the content cache under the commit SHA.
+    """
+    cached = cached_tree(repo.full_name, sha)
+    if cached is not None:
+        return cached
+    return inflight.do(tree_key(repo.full_name, sha), lambda: _fetch_tree(repo, sha))
 
-    # We should never reach here, but return a defensive error
-    return error_response(f"Failed to fetch path after retries: {path}")
 
+def _fetch_tree(repo, sha: str):
+    try:
+        tree = repo.get_git_tree(sha, recursive=True)
+    except RateLimitExceededException:
+        return tree_rate_limited(sha)
+    except GithubException as e:
+        if e.status in (404, 422):
+            return missing_commit(repo.full_name, sha)
+        raise e
 
+    if tree.truncated:
+        return tree_truncated(repo.full_name, sha)
+    return store_tree(repo.full_name, sha, [TreeEntry(e.path, e.type, e.size, e.sha) for e in tree.tree])
+
+
+# -----------------------------
+# RestBackend
+# -----------------------------
+class RestBackend(RepoBackend):
+    """
+    `RepoBackend` over the GitHub REST API through the shared PyGithub client.
+
+    Reads go through snapshot mode when it is enabled and through the commit-keyed
+    content cache otherwise; rate limits are handled by `github_scheduler`.
+    Concurrent identical fetches (ref, tree, listing, blob) share one request
+    through `inflight`.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def _repo(self, full_name: str):
+        owner, _, repo_name = full_name.partition("/")
+        return _get_repo(self.client, owner, repo_name)
+
+    def default_branch(self, full_name: str) -> str:
+        return self._repo(full_name).default_branch
+
+    def resolve_ref(self, full_name: str, ref: str):
+        repo = self._repo(full_name)
+        try:
+            return inflight.do(("ref", repo.full_name, ref), lambda: repo.get_commit(ref).sha)
+        except RateLimitExceededException:
+            return error_response(f"Rate limited while resolving ref: {ref}")
+        except GithubException as e:
+            if e.status in (404, 422):
+                return None
+            raise e
+
+    def list_tree(self, full_name: str, sha: str):
+        snapshot = get_snapshot(full_name, sha)
+        if snapshot is not None:
+            with snapshot:
+                return [TreeEntry(*e) for e in snapshot.entries()]
+        return safe_get_tree(self._repo(full_name), sha)
+
+    def snapshot(self, full_name: str, sha: str):
+        # One tarball download instead of a contents request per file.
+        return get_bulk_snapshot(self._repo(full_name).full_name, sha)
+
+    def list_dir(self, full_name: str, sha: str, path: str):
+        repo = self._repo(full_name)
+        return inflight.do(("dir", repo.full_name, sha, path.strip("/")),
+                           lambda: normalize_listing(safe_get_contents(repo, path, sha)))
+
+    def read_blob(self, full_name: str, sha: str, path: str):
+        return self._read(full_name, sha, path)
+
+    def stream_blob(self, full_name: str, sha: str, path: str, sink):
+        return self._read(full_name, sha, path, sink)
+
+    def _read(self, full_name: str, sha: str, path: str, sink=None):
+        """Blob bytes, or with a `sink` the number of bytes passed to it."""
+        snapshot = get_snapshot(full_name, sha)
+        if snapshot is not None:
+            with snapshot:
+                return to_sink(snapshot.read(path), sink)
+
+        repo = self._repo(full_name)
+        key = ("file", repo.full_name, sha, path.strip("/"))
+        data = content_cache.get(key)
+        if data is None:
+            try:
+                data = inflight.do(key, lambda: _fetch_blob(repo, sha, path, key))
+            except RateLimitExceededException:
+                return error_response(f"Rate limited repeatedly while fetching file: {path} from repository {full_name}.")
+            except GithubException as e:
+                if e.status in (404, 422):
+                    return None
+                raise e
+            if data is UNSHARED:
+                # Over the contents API's 1 MB inline limit: stream the raw body instead.
+                return self._read_raw(full_name, sha, path, sink)
+        return to_sink(data, sink)
+
+    def _read_raw(self, full_name: str, sha: str, path: str, sink=None):
+        chunks = []
+        size = stream_raw_content(
+            GITHUB_API_URL, full_name, path.strip("/"), sha, os.getenv("GITHUB_TOKEN"), sink or chunks.append
+        )
+        if size is None or sink is not None:
+            return size
+        return b"".join(chunks)
+
+
+def _fetch_blob(repo, sha: str, path: str, key: tuple):
+    """Inline blob bytes (also stored in the content cache), or UNSHARED past the 1 MB inline limit."""
+    file = repo.get_contents(path, ref=sha)
+    if getattr(file, "encoding", None) == "none":
+        return UNSHARED
+    data = file.decoded_content
+    content_cache.put(key, data)
+    return data
+
+
+def get_backend(owner: str, repo_name: str) -> RepoBackend | None:
+    """
+    Return the backend serving owner/repo: a registered local one (e.g. a bare
+    mirror under REPO_MIRRORS_DIR) if it has the repository, else the REST API.
+    """
+    backend = get_local_backend(f"{owner}/{repo_name}")
+    if backend is not None:
+        return backend
+    client = _get_github_client()
+    return RestBackend(client) if client else None
 
 
 # -----------------------------
 # get_repo_structure
 # -----------------------------
 @tool_safety("get_repo_structure")
-def get_repo_structure(owner: str, repo_name: str, branch: str = "main", max_depth: int = 3, module: str | None = None) -> dict:
+def get_repo_structure(
+    owner: str,
+    repo_name: str,
+    branch: str | None = None,
+    max_depth: int = 3,
+    module: str | None = None,
+    output_format: str = "nested",
+    max_entries: int | None = None,
+    cursor: str | None = None,
+    tool_context: ToolContext | None = None,
+) -> dict:
     """
     Retrieve the directory structure of a GitHub repository.
 
@@ -140,99 +410,372 @@ def get_repo_structure(owner: str, repo_name: str, branch: str = "main", max_dep
     and builds a nested dictionary of folders and files. The depth of recursion is limited
     by `max_depth` to prevent very large outputs.
 
+    The whole tree is fetched with a single recursive Git Trees request and assembled
+    locally. Only when GitHub reports that recursive tree as truncated does the tool
+    fall back to listing directories through the contents API, breadth-first with
+    the directories of each level fetched in parallel (STRUCTURE_WALK_WORKERS).
+    Repositories with a local backend (e.g. a bare mirror) are read from it instead.
+
+    Large structures are paged: at most `max_entries` entries (files and directories,
+    capped at STRUCTURE_MAX_ENTRIES) are returned, with a cursor for the next page.
+    Pages are cut from the commit's cached tree, so paging never walks the repo again.
+
     Args:
         owner (str): GitHub username or organization.
         repo_name (str): Repository name.
-        branch (str, optional): Branch name. Defaults to "main".
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
         max_depth (int, optional): Maximum folder depth to traverse. Defaults to 3.
         module (str | None, optional): Optional subdirectory to start traversal.
+        output_format (str, optional): "nested" (default) for the dict below, or
+            "compact" for an indented listing that costs far fewer tokens.
+        max_entries (int | None, optional): Page size. Defaults to STRUCTURE_MAX_ENTRIES.
+        cursor (str | None, optional): `_next_cursor` of the previous page. It pins
+            the commit, module and max_depth of the first call, which then take
+            precedence over the arguments.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
 
     Returns:
         dict: Nested dictionary representing repository structure:
             - Directories are represented as nested dicts
             - Files are represented as {"type": "file", "path": ..., "size": ...}
             - {"_truncated": True} when max_depth is exceeded
+            - {"_error": ...} for a directory whose listing failed during a walk
+            - "_next_cursor": <cursor> at the top level when more entries remain
             - {"error": {...}} on failure
+          With output_format="compact": {"root": <module or "">, "tree": <listing>}
+          plus "next_cursor" when paged, see `structure.format_compact`.
     """
-    client = _get_github_client()
-    if not client:
+    page = structure_page_args(owner, repo_name, module, max_depth, output_format, max_entries, cursor)
+    if "error" in page:
+        return page
+
+    backend = get_backend(owner, repo_name)
+    if not backend:
         return error_response("GitHub client unavailable.")
 
-    repo = client.get_repo(f"{owner}/{repo_name}")
+    full_name = f"{owner}/{repo_name}"
+    sha = page["sha"] or resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+
+    structure = _repo_structure(backend, full_name, sha, page["max_depth"], page["module"], owner, repo_name)
+    structure = paginate_structure(structure, full_name, sha, page)
+    return format_structure(structure, output_format, page["module"])
+
+
+def _repo_structure(backend, full_name, sha, max_depth, module, owner, repo_name) -> dict:
+    """Nested structure dict (or error dict) of full_name@sha behind `get_repo_structure`."""
     start_path = module.strip("/") if module else ""
 
-    if module:
-        mod = safe_get_contents(repo, start_path, branch)
-        if isinstance(mod, dict) and "error" in mod:
-            return error_response(f"Module '{module}' does not exist.", details={"owner": owner, "repo": repo_name})
-
-    def walk(path: str, depth: int):
-        if depth >= max_depth:
-            return {"_truncated": True}
-
-        contents = safe_get_contents(repo, path, branch)
-        if isinstance(contents, dict) and "error" in contents:
-            return contents
-        if hasattr(contents, "decoded_content") and hasattr(contents, "path"):
-            return {
-                contents.name: {
-                    "type": "file",
-                    "path": contents.path,
-                    "size": getattr(contents, "size", None),
-                }
-            }
-
-        tree = {}
-        for item in contents:
-            if item.type == "dir":
-                tree[item.name] = walk(item.path, depth + 1)
-            else:
-                tree[item.name] = {"type": "file", "path": item.path, "size": item.size}
-        return tree
-
-    return walk(start_path, 0)
+    # Fast path: the whole tree at once (one recursive Git Trees request on REST).
+    entries = backend.list_tree(full_name, sha)
+    if isinstance(entries, dict) and "error" in entries:
+        return entries
+    if entries is not None:
+        return build_structure_from_tree(entries, start_path, max_depth, owner, repo_name)
+
+    # Slow path: GitHub truncated the recursive tree, walk directory by directory.
+    cached = cached_walk(full_name, sha, start_path, max_depth)
+    if cached is not None:
+        return cached
+
+    def list_dir(path: str):
+        return backend.list_dir(full_name, sha, path)
+
+    walk = begin_walk(list_dir(start_path), module, max_depth, owner, repo_name)
+    if isinstance(walk, dict):
+        return walk
+    with ThreadPoolExecutor(max_workers=STRUCTURE_WALK_WORKERS) as pool:
+        while walk.pending:
+            walk.fill(list(pool.map(propagate_context(list_dir), walk.pending)))
+
+    store_walk(full_name, sha, start_path, max_depth, walk.root)
+    return walk.root
 
 
 # -----------------------------
 # read_file_content
 # -----------------------------
 @tool_safety("read_file_content")
-def read_file_content(owner: str, repo_name: str, file_path: str, branch: str = "main"):
+def read_file_content(
+    owner: str,
+    repo_name: str,
+    file_path: str,
+    branch: str | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    max_bytes: int | None = None,
+    compact: str | None = None,
+    tool_context: ToolContext | None = None,
+):
     """
     Read the content of a specific file in a GitHub repository.
 
     This tool fetches the contents of a single file in the repository at the specified
     branch. It automatically retries on GitHub API rate limits and returns an LLM-safe
-    error envelope if the file does not exist or other errors occur.
+    error envelope if the file does not exist or other errors occur. Content is cached
+    by the branch's resolved commit SHA, so repeated reads skip the download.
+
+    Large files are streamed and cut to a line range and byte budget as they arrive,
+    so only the returned window is held in memory. At most READ_FILE_MAX_BYTES are
+    returned per call; page through bigger files with `start_line`/`end_line`.
 
     Args:
         owner (str): GitHub username or organization.
         repo_name (str): Repository name.
         file_path (str): Path to the file inside the repository.
-        branch (str, optional): Branch name. Defaults to "main".
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        start_line (int | None, optional): First line to return (1-based).
+        end_line (int | None, optional): Last line to return (inclusive).
+        max_bytes (int | None, optional): Byte budget for the returned content,
+            capped at READ_FILE_MAX_BYTES.
+        compact (str | None, optional): Shrink the file before returning it:
+            "headers" elides license headers and generated code, "comments" also
+            drops comments and docstrings, "signatures" also collapses function
+            bodies to `...`. Lines refer to the compacted text. Files over
+            COMPACT_MAX_BYTES are returned uncompacted. Defaults to none.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
 
     Returns:
         dict: A dictionary containing the file content or an error:
             - {"content": "<file content>"} on success
+            - plus "start_line", "end_line" (last complete line returned), "total_lines",
+              "total_bytes" and "truncated" when a window was requested, the content
+              was cut at the byte budget or the file was compacted
+            - plus "compaction": {"mode", "original_bytes", "compacted_bytes",
+              "compression_ratio"} when compacted, or {"mode": "none",
+              "original_bytes", "skipped"} when the file was too large to compact
             - {"error": {...}} on failure
     """
-    client = _get_github_client()
-    if not client:
+    window = make_window(start_line, end_line, max_bytes, READ_FILE_MAX_BYTES)
+    if isinstance(window, dict):
+        return window
+    invalid = check_compact(compact)
+    if invalid:
+        return invalid
+
+    backend = get_backend(owner, repo_name)
+    if not backend:
         return error_response("GitHub client unavailable.")
 
-    repo = client.get_repo(f"{owner}/{repo_name}")
-    delay = 1
+    full_name = f"{owner}/{repo_name}"
+    sha = resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
 
-    for _ in range(3):
-        try:
-            file = repo.get_contents(file_path, ref=branch)
-            return {"content": file.decoded_content.decode("utf-8", errors="ignore")}
-        except RateLimitExceededException:
-            time.sleep(delay)
-            delay = min(delay * 2, 8)
-        except GithubException as e:
-            if e.status == 404:
-                return {"error": f"Path '{file_path}' does not exist in '{owner}/{repo_name}' on '{branch}'."}
-            raise e
+    sink = CompactionSink(window) if compact and compact != "none" else window
+    size = backend.stream_blob(full_name, sha, file_path, sink.feed)
+    if size is None:
+        return _missing_path(backend, full_name, file_path, branch)
+    if isinstance(size, dict) and "error" in size:
+        return size
+    if sink is not window:
+        return sink.result(file_path, compact)
+    return window.result(with_metadata=start_line is not None or end_line is not None or max_bytes is not None)
+
+
+# -----------------------------
+# find_symbols
+# -----------------------------
+SYMBOL_KINDS = ("class", "function", "method")
+
+
+def _symbol_view(symbol: dict, with_path: bool) -> dict:
+    view = {k: symbol[k] for k in ("kind", "qualname", "signature", "start_line", "end_line")}
+    return {"path": symbol["path"], **view} if with_path else view
+
+
+@tool_safety("find_symbols")
+def find_symbols(
+    owner: str,
+    repo_name: str,
+    query: str | None = None,
+    path: str | None = None,
+    kind: str | None = None,
+    branch: str | None = None,
+    max_results: int = 50,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Look up classes, functions and methods in a repository without reading files.
+
+    Answers "where is X defined" (`query`) and "what does module Y define / import"
+    (`path`) from a symbol index built once per commit by parsing the repository's
+    Python files. The first call on a commit builds the index; later calls, and
+    other commits sharing unchanged files, reuse it.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        query (str | None, optional): Symbol name or part of a dotted name, e.g.
+            "Runner" or "Client.get". Exact name matches are listed first.
+        path (str | None, optional): File path; returns that module's symbols,
+            imports and `__all__` exports instead of searching.
+        kind (str | None, optional): Only "class", "function" or "method" symbols.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        max_results (int, optional): Most symbols returned for a query. Defaults to 50.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict:
+            - query: {"symbols": [{"path", "kind", "qualname", "signature", "start_line",
+              "end_line"}], "truncated": bool, "indexed_files": int}
+            - path: {"path", "symbols": [...], "imports": [{"module", "names", "level",
+              "line"}], "exports": [...] | None, "main_line": int | None}
+            - plus "failed_reads": int when some files could not be read (e.g. rate
+              limited) and are missing from the index; a later call retries them
+            - {"error": {...}} on failure
+    """
+    invalid = symbol_args_error(query, path, kind)
+    if invalid:
+        return invalid
+
+    backend = get_backend(owner, repo_name)
+    if not backend:
+        return error_response("GitHub client unavailable.")
+
+    full_name = f"{owner}/{repo_name}"
+    sha = resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+    return symbol_lookup(backend, full_name, sha, query, path, kind, max_results)
+
+
+def symbol_args_error(query: str | None, path: str | None, kind: str | None) -> dict | None:
+    if not query and not path:
+        return error_response("Pass a symbol `query` or a file `path`.")
+    if kind is not None and kind not in SYMBOL_KINDS:
+        return error_response(f"Unknown kind '{kind}'; use one of {', '.join(SYMBOL_KINDS)}.")
+    return None
+
+
+def symbol_lookup(backend, full_name, sha, query, path, kind, max_results) -> dict:
+    """`find_symbols` once the ref is resolved; builds (or reuses) the index. Touches no session state."""
+    index = build_symbol_index(backend, full_name, sha, content_cache)
+    if "error" in index:
+        return index
+
+    if path:
+        parsed = index["files"].get(path.strip("/"))
+        if parsed is None and path.strip("/") in index.get("failed", []):
+            return error_response(f"'{path}' could not be read while indexing '{full_name}'; try again later.")
+        if parsed is None:
+            return error_response(f"'{path}' is not an indexed source file in '{full_name}'.")
+        symbols = [s for s in parsed["symbols"] if not kind or s["kind"] == kind]
+        result = {
+            "path": path.strip("/"),
+            "symbols": [_symbol_view(s, with_path=False) for s in symbols],
+            "imports": parsed["imports"],
+            "exports": parsed["exports"],
+            "main_line": parsed["main_line"],
+        }
+        if "error" in parsed:
+            result["parse_error"] = parsed["error"]
+    else:
+        matches, truncated = search_symbols(index, query, kind, max_results)
+        result = {
+            "symbols": [_symbol_view(s, with_path=True) for s in matches],
+            "truncated": truncated,
+            "indexed_files": len(index["files"]),
+        }
+    if index.get("failed"):
+        result["failed_reads"] = len(index["failed"])
+    return result
+
+
+# -----------------------------
+# get_dependency_graph
+# -----------------------------
+@tool_safety("get_dependency_graph")
+def get_dependency_graph(
+    owner: str,
+    repo_name: str,
+    path: str | None = None,
+    depth: int = 1,
+    branch: str | None = None,
+    max_results: int = 20,
+    tool_context: ToolContext | None = None,
+) -> dict:
+    """
+    Entry points and the module import graph of a repository, computed from code.
+
+    Without `path`, returns how the repository is started (`__main__` blocks, console
+    scripts, Makefile/Dockerfile/Procfile commands, framework app objects) and its
+    most imported modules. With `path`, returns what that file imports, which files
+    import it and, for `depth` > 1, the files reachable through its imports. The
+    graph is built once per commit on top of the symbol index and cached.
+
+    Args:
+        owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        path (str | None, optional): File to show the neighbourhood of.
+        depth (int, optional): Import hops followed from `path`. Defaults to 1.
+        branch (str | None, optional): Branch, tag or commit SHA. Defaults to the
+            repository's default branch.
+        max_results (int, optional): Most entries per returned list. Defaults to 20.
+        tool_context (ToolContext | None): Injected by ADK; memoizes resolved refs
+            for the session.
+
+    Returns:
+        dict:
+            - overview: {"entry_points": [{"path", "kind", "line"?, "detail"?, "reaches"?}],
+              "central_modules": [{"path", "imported_by"}], "external_packages":
+              [{"name", "files"}], "stats": {"files", "edges", "entry_points", "seconds",
+              "max_rss_growth_bytes" (approximate), "failed_reads", "graph_bytes", ...}}
+            - path: {"path", "imports": [...], "imported_by": [...], "external": [...],
+              "reachable": [{"path", "depth"}] (depth > 1), "truncated": bool}
+            - {"error": {...}} on failure
+    """
+    if depth < 1:
+        return error_response("depth must be at least 1.")
+
+    backend = get_backend(owner, repo_name)
+    if not backend:
+        return error_response("GitHub client unavailable.")
 
-    return error_response(f"Rate limited repeatedly while fetching file: {file_path} from repository {owner}/{repo_name}.")
+    full_name = f"{owner}/{repo_name}"
+    sha = resolve_commit_sha(backend, full_name, branch, tool_context)
+    if isinstance(sha, dict) and "error" in sha:
+        return sha
+    return dependency_lookup(backend, full_name, sha, path, depth, max_results)
+
+
+def dependency_lookup(backend, full_name, sha, path, depth, max_results) -> dict:
+    """`get_dependency_graph` once the ref is resolved; builds (or reuses) the graph. Touches no session state."""
+    graph = build_dependency_graph(backend, full_name, sha, content_cache)
+    if "error" in graph:
+        return graph
+
+    if not path:
+        # Entry points reaching the most code first: those are the ones worth summarizing.
+        entry_points = sorted(graph["entry_points"], key=lambda e: -e.get("reaches", -1))
+        return {
+            "entry_points": entry_points[:max_results],
+            "central_modules": central_modules(graph, max_results),
+            "external_packages": external_packages(graph, max_results),
+            "stats": graph["stats"],
+        }
+
+    path = path.strip("/")
+    module = graph["modules"].get(path)
+    if module is None:
+        return error_response(f"'{path}' is not an indexed source file in '{full_name}'.")
+    users = imported_by(graph, path)
+    result = {
+        "path": path,
+        "imports": module["imports"][:max_results],
+        "imported_by": users[:max_results],
+        "external": module["external"],
+        "truncated": len(module["imports"]) > max_results or len(users) > max_results,
+    }
+    if depth > 1:
+        closure = reachable(graph, path, depth)
+        result["reachable"] = closure[:max_results]
+        result["truncated"] = result["truncated"] or len(closure) > max_results
+    return result
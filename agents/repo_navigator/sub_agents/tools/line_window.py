@@ -0,0 +1,134 @@
+# line_window.py
+from .utils import error_response
+
+# Chunk size used when slicing in-memory blobs for a `LineWindow`.
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_chunks(data, chunk_size: int = CHUNK_BYTES):
+    """Yield zero-copy slices of a bytes-like object."""
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size]
+
+
+def utf8_boundary(data, limit: int) -> int:
+    """
+    Largest cut offset <= `limit` that does not split a UTF-8 character of `data`.
+
+    Backs up over the continuation bytes of a character straddling `limit`, so a
+    byte budget drops the whole character instead of leaving half of it.
+    """
+    if len(data) <= limit:
+        return len(data)
+    end = limit
+    # A UTF-8 character is at most 4 bytes; anything longer is not text, cut where asked.
+    while end > 0 and limit - end < 3 and data[end] & 0xC0 == 0x80:
+        end -= 1
+    return end if data[end] & 0xC0 != 0x80 else limit
+
+
+# -----------------------------
+# LineWindow
+# -----------------------------
+class LineWindow:
+    """
+    Incrementally cut a line range out of a byte stream under a byte cap.
+
+    Feed the file chunk by chunk; only bytes inside [start_line, end_line] are kept,
+    and at most `max_bytes` of them. The rest of the stream is only counted, so the
+    total size and line count are known without holding the file in memory.
+
+        window = LineWindow(start_line=10, end_line=20, max_bytes=4096)
+        for chunk in chunks:
+            window.feed(chunk)
+        window.result()
+    """
+
+    def __init__(self, start_line: int | None = None, end_line: int | None = None, max_bytes: int = 100_000):
+        self.start_line = max(start_line or 1, 1)
+        self.end_line = end_line
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self.total_bytes = 0
+        self._out = bytearray()
+        self._line = 1  # line number at the current stream position
+        self._ends_with_newline = True
+
+    def feed(self, chunk) -> None:
+        chunk = bytes(chunk)
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        self._ends_with_newline = chunk.endswith(b"\n")
+
+        pos = 0
+        while pos < len(chunk):
+            if self._line < self.start_line:
+                nl = chunk.find(b"\n", pos)
+                if nl == -1:
+                    return
+                self._line += 1
+                pos = nl + 1
+                continue
+
+            if self.truncated or (self.end_line is not None and self._line > self.end_line):
+                # Past the window: just count what is left.
+                self._line += chunk.count(b"\n", pos)
+                return
+
+            if self.end_line is None:
+                stop = len(chunk)
+            else:
+                nl = chunk.find(b"\n", pos)
+                stop = len(chunk) if nl == -1 else nl + 1
+            piece = chunk[pos:stop]
+            room = self.max_bytes - len(self._out)
+            if len(piece) > room:
+                # Keep one byte past the cap so a character straddling it can be dropped whole.
+                self._out += piece[:room + 1]
+                del self._out[utf8_boundary(self._out, self.max_bytes):]
+                self.truncated = True
+            else:
+                self._out += piece
+            self._line += piece.count(b"\n")
+            pos = stop
+
+    @property
+    def total_lines(self) -> int:
+        if not self.total_bytes:
+            return 0
+        return self._line - 1 + (0 if self._ends_with_newline else 1)
+
+    def result(self, with_metadata: bool = True) -> dict:
+        """
+        Tool payload: {"content"} plus, when `with_metadata` or the content was cut
+        by the byte cap, the window bounds and the file's totals for paging.
+
+        `end_line` is the last complete line returned; a page cut by `max_bytes`
+        resumes at `end_line + 1`.
+        """
+        out = bytes(self._out)
+        payload = {"content": str(out, "utf-8", errors="ignore")}
+        if not (with_metadata or self.truncated):
+            return payload
+        complete = out.count(b"\n") + (1 if out and not out.endswith(b"\n") and not self.truncated else 0)
+        payload.update({
+            "start_line": self.start_line,
+            "end_line": self.start_line + complete - 1,
+            "total_lines": self.total_lines,
+            "total_bytes": self.total_bytes,
+            "truncated": self.truncated,
+        })
+        return payload
+
+
+def make_window(start_line, end_line, max_bytes, limit: int):
+    """Validate read_file_content's window arguments; returns a `LineWindow` capped at `limit` or an error dict."""
+    if start_line is not None and start_line < 1:
+        return error_response("start_line must be 1 or greater.")
+    if end_line is not None and end_line < (start_line or 1):
+        return error_response("end_line must not be before start_line.")
+    if max_bytes is not None and max_bytes < 1:
+        return error_response("max_bytes must be positive.")
+    return LineWindow(start_line, end_line, min(max_bytes or limit, limit))
@@ -0,0 +1,287 @@
+# metrics.py
+import contextvars
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("github_tools")
+
+# Record per-tool metrics in `tool_safety` and the GitHub HTTP layer.
+TOOL_METRICS_ENABLED = os.getenv("TOOL_METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+# Serve /metrics (Prometheus text) and /metrics.json on this port when set.
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+API_CALL_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+
+PROMETHEUS_PREFIX = "repo_navigator"
+
+
+# -----------------------------
+# Histogram
+# -----------------------------
+class Histogram:
+    """Fixed-bucket histogram (Prometheus `le` semantics); callers hold the registry lock."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total, out = 0, []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            out.append((str(bound), total))
+        return out
+
+    def snapshot(self) -> dict:
+        return {"buckets": dict(self.cumulative()), "sum": round(self.sum, 6), "count": self.count}
+
+
+# -----------------------------
+# Per-call accounting
+# -----------------------------
+class CallStats:
+    """GitHub traffic of one tool call; reached from the HTTP layer through a ContextVar."""
+
+    __slots__ = ("api_calls", "bytes", "retries")
+
+    def __init__(self):
+        self.api_calls = 0
+        self.bytes = 0
+        self.retries = 0
+
+
+_current_call: contextvars.ContextVar[CallStats | None] = contextvars.ContextVar("tool_call_stats", default=None)
+
+
+def propagate_context(fn):
+    """Wrap `fn` so worker-pool threads run it in a copy of the caller's context (and tool call)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+class _ToolSeries:
+    __slots__ = ("calls", "errors", "retries", "latency", "api_calls", "bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.api_calls = Histogram(API_CALL_BUCKETS)
+        self.bytes = Histogram(BYTES_BUCKETS)
+
+
+class ToolMetrics:
+    """
+    In-process registry of tool and GitHub API metrics.
+
+    `tool_safety` brackets each outermost tool call with `start_call`/`finish_call`;
+    the HTTP layer reports requests, retries and bytes with `record_*`, which are
+    added to the current call (found through a ContextVar, so it follows
+    `asyncio.to_thread`) and to process-wide totals. The latest
+    `X-RateLimit-*` headers are kept as gauges. Every update is a few integer
+    additions under one lock.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._tools: dict[str, _ToolSeries] = {}
+        self._totals = {"api_calls": 0, "bytes": 0, "retries": 0, "coalesced": 0}
+        self._rate_limit: dict[str, float | str] = {}
+
+    # ---- tool calls ----
+    def start_call(self):
+        """Begin accounting a tool call; returns a token for `finish_call`, or None when nested/disabled."""
+        if not self.enabled or _current_call.get() is not None:
+            return None
+        stats = CallStats()
+        return stats, _current_call.set(stats)
+
+    def finish_call(self, tool_name: str, token, seconds: float, error: bool) -> None:
+        if token is None:
+            return
+        stats, reset = token
+        _current_call.reset(reset)
+        with self._lock:
+            series = self._tools.get(tool_name)
+            if series is None:
+                series = self._tools[tool_name] = _ToolSeries()
+            series.calls += 1
+            series.errors += int(error)
+            series.retries += stats.retries
+            series.latency.observe(seconds)
+            series.api_calls.observe(stats.api_calls)
+            series.bytes.observe(stats.bytes)
+
+    # ---- HTTP layer ----
+    def record_api_call(self, nbytes: int = 0, headers=None) -> None:
+        """One GitHub request was answered; `headers` updates the rate-limit gauges."""
+        if not self.enabled:
+            return
+        stats = _current_call.get()
+        if stats is not None:
+            stats.api_calls += 1
+            stats.bytes += nbytes
+        remaining = headers.get("X-RateLimit-Remaining") if headers is not None else None
+        with self._lock:
+            self._totals["api_calls"] += 1
+            self._totals["bytes"] += nbytes
+            if remaining is not None:
+                self._update_rate_limit(headers)
+
+    def record_bytes(self, nbytes: int) -> None:
+        """Body bytes read after the request was counted (streamed downloads)."""
+        if not self.enabled:
+            return
+        stats = _current_call.get()
+        if stats is not None:
+            stats.bytes += nbytes
+        with self._lock:
+            self._totals["bytes"] += nbytes
+
+    def record_retry(self) -> None:
+        if not self.enabled:
+            return
+        stats = _current_call.get()
+        if stats is not None:
+            stats.retries += 1
+        with self._lock:
+            self._totals["retries"] += 1
+
+    def record_coalesced(self) -> None:
+        """A fetch was served by an identical request already in flight (no API call)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._totals["coalesced"] += 1
+
+    def _update_rate_limit(self, headers) -> None:
+        for header, name in (("X-RateLimit-Remaining", "remaining"), ("X-RateLimit-Limit", "limit"),
+                             ("X-RateLimit-Reset", "reset")):
+            value = headers.get(header)
+            if value is not None:
+                try:
+                    self._rate_limit[name] = float(value)
+                except ValueError:
+                    pass
+        resource = headers.get("X-RateLimit-Resource")
+        if resource:
+            self._rate_limit["resource"] = resource
+
+    # ---- export ----
+    def snapshot(self) -> dict:
+        """JSON-serializable view of every series."""
+        with self._lock:
+            return {
+                "tools": {
+                    name: {
+                        "calls": s.calls,
+                        "errors": s.errors,
+                        "retries": s.retries,
+                        "latency_seconds": s.latency.snapshot(),
+                        "api_calls": s.api_calls.snapshot(),
+                        "fetched_bytes": s.bytes.snapshot(),
+                    }
+                    for name, s in sorted(self._tools.items())
+                },
+                "github": {**self._totals, "rate_limit": dict(self._rate_limit)},
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        p = PROMETHEUS_PREFIX
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+
+        with self._lock:
+            tools = sorted(self._tools.items())
+            for name, attr, help_text in (("tool_calls_total", "calls", "Tool calls."),
+                                          ("tool_errors_total", "errors", "Tool calls that returned an error."),
+                                          ("tool_retries_total", "retries", "GitHub rate-limit retries in tool calls.")):
+                family(name, "counter", help_text)
+                lines.extend(f'{p}_{name}{{tool="{tool}"}} {getattr(s, attr)}' for tool, s in tools)
+
+            for name, attr, help_text in (("tool_duration_seconds", "latency", "Tool wall time."),
+                                          ("tool_api_calls", "api_calls", "GitHub requests per tool call."),
+                                          ("tool_fetched_bytes", "bytes", "Bytes fetched from GitHub per tool call.")):
+                family(name, "histogram", help_text)
+                for tool, s in tools:
+                    histogram = getattr(s, attr)
+                    lines.extend(f'{p}_{name}_bucket{{tool="{tool}",le="{le}"}} {n}' for le, n in histogram.cumulative())
+                    lines.append(f'{p}_{name}_sum{{tool="{tool}"}} {histogram.sum:.15g}')
+                    lines.append(f'{p}_{name}_count{{tool="{tool}"}} {histogram.count}')
+
+            for name, key, help_text in (("github_api_calls_total", "api_calls", "GitHub requests."),
+                                         ("github_fetched_bytes_total", "bytes", "Bytes fetched from GitHub."),
+                                         ("github_retries_total", "retries", "GitHub rate-limit retries."),
+                                         ("github_coalesced_requests_total", "coalesced",
+                                          "Fetches served by an identical in-flight request.")):
+                family(name, "counter", help_text)
+                lines.append(f"{p}_{name} {self._totals[key]}")
+
+            for name, key, help_text in (("github_rate_limit_remaining", "remaining", "Last X-RateLimit-Remaining."),
+                                         ("github_rate_limit_limit", "limit", "Last X-RateLimit-Limit."),
+                                         ("github_rate_limit_reset_timestamp_seconds", "reset", "Last X-RateLimit-Reset.")):
+                if key in self._rate_limit:
+                    family(name, "gauge", help_text)
+                    lines.append(f"{p}_{name} {self._rate_limit[key]:.15g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._totals = dict.fromkeys(self._totals, 0)
+            self._rate_limit.clear()
+
+
+tool_metrics = ToolMetrics(enabled=TOOL_METRICS_ENABLED)
+
+
+# -----------------------------
+# HTTP endpoint
+# -----------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = tool_metrics.prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(tool_metrics.snapshot()).encode("utf-8"), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Serve /metrics and /metrics.json from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Serving tool metrics on http://%s:%s/metrics", host, server.server_address[1])
+    return server
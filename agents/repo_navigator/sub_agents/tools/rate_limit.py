@@ -0,0 +1,341 @@
+# rate_limit.py
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Callable
+
+from github import RateLimitExceededException
+
+from .metrics import tool_metrics
+from .utils import logger
+
+# Comma-separated pool of GitHub tokens to rotate across (defaults to GITHUB_TOKEN).
+GITHUB_TOKENS_ENV = "GITHUB_TOKENS"
+# Request pacing per token (token bucket: sustained requests/second and burst size).
+GITHUB_REQUESTS_PER_SECOND = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", "10"))
+GITHUB_REQUEST_BURST = int(os.getenv("GITHUB_REQUEST_BURST", "20"))
+# Longest a request waits for quota before failing, and attempts per request.
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "30"))
+GITHUB_RATE_LIMIT_ATTEMPTS = int(os.getenv("GITHUB_RATE_LIMIT_ATTEMPTS", "3"))
+# Share of each token's hourly quota that background requests leave to interactive ones.
+GITHUB_BACKGROUND_RESERVE = float(os.getenv("GITHUB_BACKGROUND_RESERVE", "0.1"))
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Backoff after a rate-limited response that carries no reset time.
+BACKOFF_SECONDS = (1, 2, 4, 8)
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("github_request_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def background_priority():
+    """Mark GitHub requests made in this context (and pools using `propagate_context`) as background."""
+    reset = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(reset)
+
+
+def github_tokens() -> list[str]:
+    """Configured token pool: GITHUB_TOKENS, or GITHUB_TOKEN alone."""
+    tokens = [t.strip() for t in os.getenv(GITHUB_TOKENS_ENV, "").split(",") if t.strip()]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+    return tokens
+
+
+def is_rate_limited(status: int, headers) -> bool:
+    """Whether a GitHub response is a primary (403, no quota left) or secondary (429/Retry-After) limit."""
+    if status == 429:
+        return True
+    return status == 403 and (headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers)
+
+
+class RateLimitWaitExceeded(RateLimitExceededException):
+    """No token has quota within GITHUB_RATE_LIMIT_MAX_WAIT; raised before any request is sent."""
+
+    def __init__(self, wait: float):
+        super().__init__(429, {"message": f"GitHub quota exhausted; next request possible in {wait:.0f}s."}, {})
+        self.wait = wait
+
+
+# -----------------------------
+# Per-token state
+# -----------------------------
+class TokenBucket:
+    """Classic token bucket: `rate` requests/second sustained, `capacity` at once."""
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, rate: float, capacity: int, now: float):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.level = float(self.capacity)
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return 0.0 if self.level >= 1 or self.rate <= 0 else (1 - self.level) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.level -= 1
+
+
+class _TokenState:
+    __slots__ = ("bucket", "remaining", "limit", "reset", "blocked_until", "failures")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.remaining: int | None = None  # unknown until the first response
+        self.limit: int | None = None
+        self.reset: float | None = None
+        self.blocked_until = 0.0
+        self.failures = 0
+
+    def wait_time(self, now: float, priority: str, reserve: float) -> float:
+        if self.reset is not None and now >= self.reset:
+            self.remaining, self.reset = None, None  # a new quota window started
+        floor = 0
+        if priority == BACKGROUND and self.limit:
+            floor = int(self.limit * reserve)
+        wait = max(0.0, self.blocked_until - now)
+        if self.remaining is not None and self.remaining <= floor:
+            wait = max(wait, (self.reset - now) if self.reset is not None else 0.0)
+        return max(wait, self.bucket.wait_time(now))
+
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+class RateLimitScheduler:
+    """
+    Process-wide gate for GitHub API requests.
+
+    Every request first leases a token from the pool (`acquire`): the token with
+    the most quota left whose bucket has room, else the one free soonest. The
+    quota (`X-RateLimit-Remaining`/`-Reset`) and `Retry-After` of each response
+    are fed back with `observe`, so sessions share one view of the limits instead
+    of each discovering them with a failed request. Interactive requests go
+    first: background ones wait while an interactive request is waiting and never
+    use the last GITHUB_BACKGROUND_RESERVE of a token's quota.
+
+    `send`/`send_async` wrap one request: lease a token, send, and retry a
+    rate-limited response on the next token free (up to `attempts` times).
+    Requests that would wait longer than `max_wait` fail with
+    `RateLimitWaitExceeded` (a `RateLimitExceededException`).
+    """
+
+    def __init__(self, token_source: Callable[[], list[str]] = github_tokens,
+                 rate: float = GITHUB_REQUESTS_PER_SECOND, burst: int = GITHUB_REQUEST_BURST,
+                 max_wait: float = GITHUB_RATE_LIMIT_MAX_WAIT, attempts: int = GITHUB_RATE_LIMIT_ATTEMPTS,
+                 reserve: float = GITHUB_BACKGROUND_RESERVE, clock: Callable[[], float] = time.time):
+        self.token_source = token_source
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.attempts = attempts
+        self.reserve = reserve
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._states: dict[str | None, _TokenState] = {}
+        self._waiting = dict.fromkeys(PRIORITIES, 0)
+        self._counters = {"requests": 0, "rate_limited": 0, "waits": 0, "wait_seconds": 0.0, "rejected": 0}
+
+    # ---- leasing ----
+    def _try_acquire(self, priority: str, now: float) -> tuple[str | None, float]:
+        """Lease a token now (returns (token, 0)) or report how long to wait (returns (None, wait))."""
+        tokens = self.token_source() or [None]  # None: the client's own credentials
+        states = []
+        for token in tokens:
+            state = self._states.get(token)
+            if state is None:
+                state = self._states[token] = _TokenState(TokenBucket(self.rate, self.burst, now))
+            states.append((token, state))
+
+        waits = [(state.wait_time(now, priority, self.reserve), token, state) for token, state in states]
+        if priority == BACKGROUND and self._waiting[INTERACTIVE]:
+            return None, max(min(w for w, _, _ in waits), 1 / self.rate if self.rate > 0 else 0.01)
+        # The tolerance absorbs float drift after waiting exactly the computed time.
+        ready = [(token, state) for wait, token, state in waits if wait < 1e-6]
+        if not ready:
+            return None, min(w for w, _, _ in waits)
+
+        token, state = max(ready, key=lambda item: float("inf") if item[1].remaining is None else item[1].remaining)
+        state.bucket.take(now)
+        if state.remaining is not None:
+            state.remaining -= 1
+        self._counters["requests"] += 1
+        return token, 0.0
+
+    def _start(self, priority: str | None) -> tuple[str, float]:
+        priority = priority or _priority.get()
+        with self._lock:
+            self._waiting[priority] += 1
+        return priority, self.clock()
+
+    def _waited(self, priority: str, started: float, now: float, wait: float) -> None:
+        """Account a wait; raise if it would take the request past `max_wait`."""
+        with self._lock:
+            if now + wait - started > self.max_wait:
+                self._waiting[priority] -= 1
+                self._counters["rejected"] += 1
+                raise RateLimitWaitExceeded(wait)
+            self._counters["waits"] += 1
+            self._counters["wait_seconds"] += wait
+
+    def acquire(self, priority: str | None = None) -> str | None:
+        """Block until a token may send; returns it (None means the client's own credentials)."""
+        priority, started = self._start(priority)
+        now = started
+        while True:
+            with self._lock:
+                token, wait = self._try_acquire(priority, now)
+                if not wait:
+                    self._waiting[priority] -= 1
+                    return token
+            self._waited(priority, started, now, wait)
+            time.sleep(wait)
+            # Never re-check earlier than the time waited for (sleep may return early).
+            now = max(self.clock(), now + wait)
+
+    async def acquire_async(self, priority: str | None = None) -> str | None:
+        """`acquire` for the event loop; waits with `asyncio.sleep` and is cancellable."""
+        priority, started = self._start(priority)
+        now = started
+        try:
+            while True:
+                with self._lock:
+                    token, wait = self._try_acquire(priority, now)
+                    if not wait:
+                        self._waiting[priority] -= 1
+                        return token
+                self._waited(priority, started, now, wait)
+                await asyncio.sleep(wait)
+                now = max(self.clock(), now + wait)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._waiting[priority] -= 1
+            raise
+
+    # ---- feedback ----
+    def observe(self, token: str | None, status: int, headers) -> bool:
+        """Record a response's quota headers for `token`; returns whether it was rate-limited."""
+        limited = is_rate_limited(status, headers)
+        now = self.clock()
+        with self._lock:
+            state = self._states.get(token)
+            if state is None:
+                return limited
+            try:
+                remaining = headers.get("X-RateLimit-Remaining")
+                reset = headers.get("X-RateLimit-Reset")
+                limit = headers.get("X-RateLimit-Limit")
+                if limit is not None:
+                    state.limit = int(limit)
+                if remaining is not None:
+                    # Responses can arrive out of order: within one window keep the lower count.
+                    remaining = int(remaining)
+                    reset = float(reset) if reset is not None else None
+                    same_window = reset is not None and reset == state.reset and state.remaining is not None
+                    state.remaining = min(state.remaining, remaining) if same_window else remaining
+                    state.reset = reset
+            except ValueError:
+                pass
+
+            if not limited:
+                state.failures = 0
+                return False
+            self._counters["rate_limited"] += 1
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None and retry_after.isdigit():
+                state.blocked_until = now + int(retry_after)
+            elif not (state.remaining == 0 and state.reset is not None and state.reset > now):
+                state.blocked_until = now + BACKOFF_SECONDS[min(state.failures, len(BACKOFF_SECONDS) - 1)]
+            state.failures += 1
+            return True
+
+    # ---- request wrappers ----
+    def send(self, send: Callable, priority: str | None = None, attempts: int | None = None):
+        """
+        Send one request through the scheduler.
+
+        `send(token)` performs the request (None: keep the client's credentials)
+        and returns a response with `status_code` and `headers`. A rate-limited
+        response is closed and retried; the last one is returned when attempts
+        run out or no token frees up within `max_wait`.
+        """
+        attempts = attempts or self.attempts
+        response = None
+        for attempt in range(attempts):
+            try:
+                token = self.acquire(priority)
+            except RateLimitWaitExceeded:
+                if response is None:
+                    raise
+                return response
+            response = send(token)
+            if not self.observe(token, response.status_code, response.headers) or attempt == attempts - 1:
+                return response
+            logger.warning("GitHub rate-limited %s; retrying.", getattr(response, "url", "request"))
+            tool_metrics.record_retry()
+            response.close()
+        return response
+
+    async def send_async(self, send: Callable, priority: str | None = None, attempts: int | None = None):
+        """`send` for coroutines: `await send(token)` returns an httpx response."""
+        attempts = attempts or self.attempts
+        response = None
+        for attempt in range(attempts):
+            try:
+                token = await self.acquire_async(priority)
+            except RateLimitWaitExceeded:
+                if response is None:
+                    raise
+                return response
+            response = await send(token)
+            if not self.observe(token, response.status_code, response.headers) or attempt == attempts - 1:
+                return response
+            logger.warning("GitHub rate-limited %s; retrying.", response.request.url.path)
+            tool_metrics.record_retry()
+            await response.aclose()
+        return response
+
+    # ---- introspection ----
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "wait_seconds": round(self._counters["wait_seconds"], 3),
+                "waiting": dict(self._waiting),
+                "tokens": [
+                    {"token": _mask(token), "remaining": s.remaining, "limit": s.limit, "reset": s.reset}
+                    for token, s in self._states.items()
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._waiting = dict.fromkeys(PRIORITIES, 0)
+            self._counters = dict.fromkeys(self._counters, 0)
+            self._counters["wait_seconds"] = 0.0
+
+
+def _mask(token: str | None) -> str | None:
+    return None if token is None else f"...{token[-4:]}"
+
+
+github_scheduler = RateLimitScheduler()
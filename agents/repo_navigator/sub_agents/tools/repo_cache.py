@@ -0,0 +1,121 @@
+# repo_cache.py
+import json
+import os
+import threading
+
+from .backends import TreeEntry
+from .cache import ContentCache
+from .github_http import GITHUB_API_URL, ETagStore
+from .line_window import iter_chunks
+from .single_flight import SingleFlight
+from .snapshot import SnapshotStore, download_tarball
+from .structure import has_error
+from .utils import logger
+
+# Commit-keyed content cache: in-memory LRU plus optional SQLite tier on disk.
+CONTENT_CACHE_MEMORY_BYTES = int(os.getenv("CONTENT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+CONTENT_CACHE_PATH = os.getenv("CONTENT_CACHE_PATH") or None
+CONTENT_CACHE_DISK_BYTES = int(os.getenv("CONTENT_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+# Bytes of 200 responses kept to revalidate with If-None-Match (304s are free).
+GITHUB_ETAG_CACHE_BYTES = int(os.getenv("GITHUB_ETAG_CACHE_BYTES", str(32 * 1024 * 1024)))
+# Snapshot mode: serve structure and file reads from a downloaded tarball per commit.
+REPO_SNAPSHOT_DIR = os.getenv("REPO_SNAPSHOT_DIR") or None
+REPO_SNAPSHOT_MAX_BYTES = int(os.getenv("REPO_SNAPSHOT_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Without snapshot mode, bulk reads (symbol index builds) can still use a tarball kept here; off unless set.
+BULK_SNAPSHOT_DIR = os.getenv("BULK_SNAPSHOT_DIR") or None
+
+# -----------------------------
+# Shared caches
+# -----------------------------
+# One set per process, shared by the sync (`github_tools`) and async (`async_github_tools`) tools.
+etag_store = ETagStore(max_bytes=GITHUB_ETAG_CACHE_BYTES)
+content_cache = ContentCache(
+    max_memory_bytes=CONTENT_CACHE_MEMORY_BYTES,
+    disk_path=CONTENT_CACHE_PATH,
+    max_disk_bytes=CONTENT_CACHE_DISK_BYTES,
+)
+# Concurrent identical fetches (same repo, ref/commit and path) share one request.
+inflight = SingleFlight()
+snapshot_store = SnapshotStore(REPO_SNAPSHOT_DIR, REPO_SNAPSHOT_MAX_BYTES) if REPO_SNAPSHOT_DIR else None
+_bulk_snapshot_lock = threading.Lock()
+_bulk_snapshot_store = None
+
+# Single-flight result for a blob fetched too large to hand to other callers.
+UNSHARED = object()
+
+
+def to_sink(data, sink):
+    """Return `data` as is, or pass it to `sink` in chunks and return its size."""
+    if data is None or sink is None:
+        return data
+    for chunk in iter_chunks(data):
+        sink(chunk)
+    return len(data)
+
+
+# -----------------------------
+# Trees and walks
+# -----------------------------
+def tree_key(full_name: str, sha: str) -> tuple:
+    return ("tree", full_name, sha, "")
+
+
+def cached_tree(full_name: str, sha: str):
+    cached = content_cache.get(tree_key(full_name, sha))
+    return None if cached is None else [TreeEntry(*e) for e in json.loads(cached)]
+
+
+def store_tree(full_name: str, sha: str, entries: list) -> list:
+    content_cache.put(tree_key(full_name, sha), json.dumps(entries).encode("utf-8"))
+    return entries
+
+
+def cached_walk(full_name: str, sha: str, start_path: str, max_depth: int):
+    """Structure of an earlier directory walk of full_name@sha, so later pages reuse it."""
+    cached = content_cache.get(("walk", full_name, sha, f"{max_depth}:{start_path}"))
+    return None if cached is None else json.loads(cached)
+
+
+def store_walk(full_name: str, sha: str, start_path: str, max_depth: int, structure: dict) -> None:
+    # Walks that hit errors (e.g. rate-limited directories) are not worth keeping.
+    if not has_error(structure):
+        content_cache.put(("walk", full_name, sha, f"{max_depth}:{start_path}"), json.dumps(structure).encode("utf-8"))
+
+
+# -----------------------------
+# Snapshots
+# -----------------------------
+def get_snapshot(full_name: str, sha: str, store: SnapshotStore | None = None):
+    """
+    Return a lease on the local archive snapshot of full_name@sha when snapshot
+    mode is on (or from `store`); release it, e.g. with `with snapshot:`.
+
+    The tarball is downloaded once per commit; any failure falls back to the API
+    (returns None) since snapshots are only an optimization.
+    """
+    store = store or snapshot_store
+    if store is None:
+        return None
+    token = os.getenv("GITHUB_TOKEN")
+    try:
+        return store.get_or_create(
+            full_name, sha, lambda out: download_tarball(GITHUB_API_URL, full_name, sha, token, out)
+        )
+    except Exception as e:
+        logger.warning("Snapshot of %s@%s unavailable, using the API: %s", full_name, sha, e)
+        return None
+
+
+def get_bulk_snapshot(full_name: str, sha: str):
+    """
+    Snapshot of full_name@sha for reading many of its files: the snapshot-mode
+    store when it is on, else one under BULK_SNAPSHOT_DIR (created on first use).
+    """
+    global _bulk_snapshot_store
+    store = snapshot_store
+    if store is None and BULK_SNAPSHOT_DIR:
+        with _bulk_snapshot_lock:
+            if _bulk_snapshot_store is None:
+                _bulk_snapshot_store = SnapshotStore(BULK_SNAPSHOT_DIR, REPO_SNAPSHOT_MAX_BYTES)
+            store = _bulk_snapshot_store
+    return get_snapshot(full_name, sha, store) if store is not None else None
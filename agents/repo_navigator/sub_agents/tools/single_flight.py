@@ -0,0 +1,95 @@
+# single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+from .metrics import tool_metrics
+
+
+class _Abandoned(Exception):
+    """The leading call was cancelled before it finished; a follower takes over."""
+
+
+class SingleFlight:
+    """
+    Let concurrent identical fetches share one in-flight call.
+
+    The first caller for a key (the leader) runs the fetch; callers arriving
+    while it is in flight wait for and return the same result, or re-raise the
+    same exception. Sync callers (threads) and async callers (tasks on any event
+    loop) share one registry through a `concurrent.futures.Future`, so a tool
+    running in `asyncio.to_thread` and a natively async tool coalesce too.
+    Nothing is kept once the call lands: later callers go to the caches.
+
+    Results are shared objects, so fetch functions must return values callers
+    do not mutate (bytes, tuples, fresh lists only read downstream).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Future] = {}
+        self._counters = {"flights": 0, "coalesced": 0}
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """Return (future, leader): the in-flight call for `key`, or a new one this caller leads."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is None:
+                future = self._flights[key] = Future()
+                self._counters["flights"] += 1
+                return future, True
+            self._counters["coalesced"] += 1
+        tool_metrics.record_coalesced()
+        return future, False
+
+    def _land(self, key: Hashable, future: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run `fn()` once for all concurrent callers with the same `key`."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                result = fn()
+            except BaseException as e:
+                self._land(key, future, error=e)
+                raise
+            self._land(key, future, result)
+            return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """`do` for coroutines: awaits `fn()` once for all concurrent callers with the same `key`."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: a cancelled follower must not cancel the shared future.
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _Abandoned:
+                    continue
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self._land(key, future, error=_Abandoned())
+                raise
+            except BaseException as e:
+                self._land(key, future, error=e)
+                raise
+            self._land(key, future, result)
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._flights)}
@@ -0,0 +1,333 @@
+# snapshot.py
+import gzip
+import json
+import mmap
+import os
+import shutil
+import tarfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Callable
+
+from .github_http import scheduled_get
+from .metrics import tool_metrics
+from .rate_limit import github_scheduler
+from .utils import logger
+
+ARCHIVE_NAME = "archive.tar"
+INDEX_NAME = "index.json"
+DOWNLOAD_NAME = "download.tar.gz"
+# Builds are made in hidden directories and renamed into place; hidden entries
+# untouched for this long are leftovers of a crashed process and are removed.
+STALE_BUILD_SECONDS = 3600
+
+
+# -----------------------------
+# RepoSnapshot
+# -----------------------------
+class RepoSnapshot:
+    """
+    One repository commit stored as an uncompressed tar on disk plus a member index.
+
+    The index maps each repo-relative path to (type, offset, size) of its data in
+    the tar, so a file read is a slice of the memory-mapped archive: no
+    decompression and no copy until the caller asks for bytes. Symlinks read as
+    their target path, which is how git stores them.
+
+    Snapshots handed out by a `SnapshotStore` are leases: use them in a `with`
+    block (or call `release`) so eviction only unmaps them once nobody reads.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._refs_lock = threading.Lock()
+        self._refs = 0
+        with open(os.path.join(directory, INDEX_NAME), "r", encoding="utf-8") as f:
+            # Insertion order is archive order (parents before children).
+            self.index: dict[str, list] = json.load(f)
+        self._file = open(os.path.join(directory, ARCHIVE_NAME), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    @classmethod
+    def build(cls, directory: str, tarball: BinaryIO) -> "RepoSnapshot":
+        """
+        Decompress a gzipped repo tarball into `directory` and index its members.
+
+        The single top-level folder GitHub puts in archives (owner-repo-sha/) is
+        stripped so index paths match repository paths.
+        """
+        cls.write(directory, tarball)
+        return cls(directory)
+
+    @staticmethod
+    def write(directory: str, tarball: BinaryIO) -> None:
+        """The files of `build` without opening them (the directory may be renamed first)."""
+        os.makedirs(directory, exist_ok=True)
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        with gzip.GzipFile(fileobj=tarball) as src, open(archive_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        index = {}
+        with tarfile.open(archive_path, "r:") as tar:
+            for member in tar:
+                _, _, path = member.name.strip("/").partition("/")
+                if not path:
+                    continue
+                if member.isdir():
+                    index[path] = ["tree", 0, None]
+                elif member.isfile():
+                    index[path] = ["blob", member.offset_data, member.size]
+                elif member.issym():
+                    index[path] = ["blob", -1, len(member.linkname.encode("utf-8")), member.linkname]
+
+        tmp_index = os.path.join(directory, INDEX_NAME + ".tmp")
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_index, os.path.join(directory, INDEX_NAME))
+
+    def entries(self) -> list[tuple]:
+        """Flat (path, type, size) entries in archive order, like a recursive Git tree."""
+        return [(path, type_, size) for path, (type_, _, size, *_) in self.index.items()]
+
+    def read(self, path: str) -> memoryview | None:
+        """Zero-copy view of a file's bytes, or None if `path` is not a file."""
+        entry = self.index.get(path.strip("/"))
+        if entry is None or entry[0] != "blob":
+            return None
+        if entry[1] < 0:
+            # A symlink: its target path (None in indexes written before targets were kept).
+            return memoryview(entry[3].encode("utf-8")) if len(entry) > 3 else None
+        _, offset, size = entry
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def disk_bytes(self) -> int:
+        return _dir_bytes(self.directory)
+
+    def acquire(self) -> "RepoSnapshot":
+        with self._refs_lock:
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """Drop one lease; the last one closes the snapshot."""
+        with self._refs_lock:
+            self._refs -= 1
+            last = self._refs == 0
+        if last:
+            self.close()
+
+    def __enter__(self) -> "RepoSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def close(self) -> None:
+        try:
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # A caller still holds a view; the mapping is released with it.
+            pass
+        self._file.close()
+
+
+def _dir_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def _last_modified(path: str) -> float:
+    """Latest mtime of `path` and, for a directory, of its entries."""
+    mtimes = [os.path.getmtime(path)]
+    if os.path.isdir(path):
+        mtimes += [os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)]
+    return max(mtimes)
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.remove(path)
+
+
+# -----------------------------
+# SnapshotStore
+# -----------------------------
+class SnapshotStore:
+    """
+    Directory of `RepoSnapshot`s keyed by (owner/repo, commit sha).
+
+    Snapshots are built at most once per key in a process (concurrent callers
+    wait for the first download) and evicted least-recently-used once their
+    combined size exceeds `max_bytes`. Existing snapshots are picked up again
+    after a restart.
+
+    Several processes may share `root`: each build goes into its own hidden
+    directory that is renamed into place when complete, a snapshot another
+    process finished first is used as is, and only hidden leftovers older than
+    STALE_BUILD_SECONDS are cleaned up. `get` and `get_or_create` return leases
+    (see `RepoSnapshot`); the store holds one more while a snapshot is cached.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._open: dict[str, RepoSnapshot] = {}
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._counters = {"hits": 0, "builds": 0, "evictions": 0}
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        found, now = [], time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            index_path = os.path.join(path, INDEX_NAME)
+            try:
+                if os.path.isfile(index_path):
+                    found.append((os.path.getmtime(index_path), name, _dir_bytes(path)))
+                elif now - _last_modified(path) > STALE_BUILD_SECONDS:
+                    # A build (possibly of another process) that has not moved for a long time.
+                    _remove(path)
+            except FileNotFoundError:
+                pass  # renamed or evicted by another process meanwhile
+        for _, name, size in sorted(found):
+            self._sizes[name] = size
+
+    @staticmethod
+    def key(full_name: str, sha: str) -> str:
+        return f"{full_name.replace('/', '__')}__{sha}"
+
+    def get(self, full_name: str, sha: str) -> RepoSnapshot | None:
+        key = self.key(full_name, sha)
+        with self._lock:
+            return self._touch(key)
+
+    def _touch(self, key: str, hit: bool = True) -> RepoSnapshot | None:
+        """A lease on the snapshot of `key`, also when another process built it; None on a miss."""
+        directory = os.path.join(self.root, key)
+        if key not in self._sizes:
+            if not os.path.isfile(os.path.join(directory, INDEX_NAME)):
+                return None
+            self._sizes[key] = _dir_bytes(directory)
+        try:
+            os.utime(os.path.join(directory, INDEX_NAME))
+            snapshot = self._open.get(key)
+            if snapshot is None:
+                snapshot = self._open[key] = RepoSnapshot(directory).acquire()
+        except FileNotFoundError:
+            # Evicted by another process sharing the directory.
+            self._forget(key)
+            return None
+        self._sizes.move_to_end(key)
+        self._counters["hits"] += hit
+        return snapshot.acquire()
+
+    def _forget(self, key: str) -> None:
+        self._sizes.pop(key, None)
+        snapshot = self._open.pop(key, None)
+        if snapshot is not None:
+            snapshot.release()
+
+    def get_or_create(self, full_name: str, sha: str, fetch: Callable[[BinaryIO], None]) -> RepoSnapshot:
+        """
+        Return the snapshot for `full_name@sha`, building it on a miss.
+
+        `fetch(fileobj)` must write the gzipped tarball of that commit to `fileobj`.
+        """
+        key = self.key(full_name, sha)
+        with self._lock:
+            snapshot = self._touch(key)
+            if snapshot is not None:
+                return snapshot
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                snapshot = self._touch(key)
+                if snapshot is not None:
+                    return snapshot
+
+            directory = os.path.join(self.root, key)
+            build_dir = os.path.join(self.root, f".{key}.{os.getpid()}.{uuid.uuid4().hex}")
+            started = time.monotonic()
+            try:
+                os.makedirs(build_dir)
+                download_path = os.path.join(build_dir, DOWNLOAD_NAME)
+                with open(download_path, "w+b") as tarball:
+                    fetch(tarball)
+                    tarball.seek(0)
+                    RepoSnapshot.write(build_dir, tarball)
+                os.remove(download_path)
+                try:
+                    os.rename(build_dir, directory)
+                except OSError:
+                    if not os.path.isfile(os.path.join(directory, INDEX_NAME)):
+                        raise
+                    logger.info("Snapshot %s@%s was built by another process", full_name, sha)
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+            with self._lock:
+                self._counters["builds"] += 1
+                snapshot = self._touch(key, hit=False)
+                self._evict(keep=key)
+                self._key_locks.pop(key, None)
+            if snapshot is None:
+                raise FileNotFoundError(f"Snapshot {key} was removed while it was being opened")
+            logger.info("Built snapshot %s@%s (%d entries) in %.2fs", full_name, sha, len(snapshot.index), time.monotonic() - started)
+            return snapshot
+
+    def _evict(self, keep: str) -> None:
+        total = sum(self._sizes.values())
+        for key in list(self._sizes):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._sizes[key]
+            # Readers holding a lease keep the mapping; the files go now (POSIX keeps them mapped).
+            self._forget(key)
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+            self._counters["evictions"] += 1
+
+    def close(self) -> None:
+        """Drop the store's leases on its cached snapshots; they close once their readers are done."""
+        with self._lock:
+            for key in list(self._open):
+                self._open.pop(key).release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "snapshots": len(self._sizes), "disk_bytes": sum(self._sizes.values()), "max_bytes": self.max_bytes}
+
+
+# -----------------------------
+# Tarball download
+# -----------------------------
+def download_tarball(api_url: str, full_name: str, sha: str, token: str, out: BinaryIO, timeout: float = 60) -> None:
+    """Stream the gzipped tarball of `full_name@sha` from the GitHub API into `out`."""
+    with scheduled_get(
+        f"{api_url}/repos/{full_name}/tarball/{sha}",
+        token,
+        github_scheduler,
+        headers={"Accept": "application/vnd.github+json"},
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        response.raise_for_status()
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                size += len(chunk)
+                out.write(chunk)
+        finally:
+            tool_metrics.record_bytes(size)
@@ -0,0 +1,320 @@
+# structure.py
+import base64
+import json
+import os
+
+from .utils import error_response, logger
+
+# get_repo_structure output formats; "compact" is an indented listing with sizes.
+STRUCTURE_OUTPUT_FORMATS = ("nested", "compact")
+# Most entries (files + directories) one get_repo_structure page returns.
+STRUCTURE_MAX_ENTRIES = int(os.getenv("STRUCTURE_MAX_ENTRIES", "1000"))
+
+
+# -----------------------------
+# Building
+# -----------------------------
+def missing_module(module: str, owner: str, repo_name: str) -> dict:
+    return error_response(f"Module '{module}' does not exist.", details={"owner": owner, "repo": repo_name})
+
+
+# Tree and listing errors, worded the same by the sync and async tools.
+def tree_truncated(full_name: str, sha: str) -> None:
+    logger.info("Recursive tree for %s@%s truncated; falling back to walk.", full_name, sha)
+    return None
+
+
+def tree_rate_limited(sha: str) -> dict:
+    return error_response(f"Rate limited while fetching tree for commit: {sha}")
+
+
+def missing_commit(full_name: str, sha: str) -> dict:
+    return {"error": f"Commit '{sha}' does not exist in repo '{full_name}'."}
+
+
+def listing_rate_limited(path: str) -> dict:
+    return error_response(f"Rate limited while fetching path: {path}")
+
+
+def missing_listing(full_name: str, path: str, ref: str) -> dict:
+    return {"error": f"Path '{path}' does not exist in repo '{full_name}' on ref '{ref}'."}
+
+
+def build_structure_from_tree(entries, start_path, max_depth, owner, repo_name):
+    """
+    Build the nested structure dict from flat recursive tree entries.
+
+    Produces exactly what a directory walk (`StructureWalk`) would: directories
+    as nested dicts, files as {"type": "file", "path", "size"} and
+    {"_truncated": True} for directories at or beyond `max_depth`.
+    """
+    prefix = ""
+    if start_path:
+        match = next((e for e in entries if e.path == start_path), None)
+        if match is None:
+            return missing_module(start_path, owner, repo_name)
+        if match.type != "tree":
+            if max_depth <= 0:
+                return {"_truncated": True}
+            name = start_path.rsplit("/", 1)[-1]
+            return {name: {"type": "file", "path": match.path, "size": getattr(match, "size", None)}}
+        prefix = start_path + "/"
+
+    if max_depth <= 0:
+        return {"_truncated": True}
+
+    root = {}
+    dirs = {"": root}
+
+    # Recursive trees are listed parent-first, so each entry's directory is
+    # already registered (or was cut off by max_depth) when we reach it.
+    for entry in entries:
+        if not entry.path.startswith(prefix):
+            continue
+        rel = entry.path[len(prefix):]
+        parent, _, name = rel.rpartition("/")
+        node = dirs.get(parent)
+        if node is None:
+            continue
+
+        depth = rel.count("/") + 1
+        if entry.type == "tree":
+            if depth >= max_depth:
+                node[name] = {"_truncated": True}
+            else:
+                node[name] = dirs[rel] = {}
+        else:
+            node[name] = {"type": "file", "path": entry.path, "size": entry.size}
+
+    return root
+
+
+def _field(item, name: str):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+def normalize_listing(contents):
+    """
+    Normalize a contents API response for `listing_to_node`.
+
+    Accepts PyGithub `ContentFile`s or the raw JSON (dicts). Returns an error dict
+    unchanged, a ("file", name, path, size) tuple when the path is a single file,
+    or a list of (type, name, path, size) tuples.
+    """
+    if isinstance(contents, dict) and "error" in contents:
+        return contents
+    if not isinstance(contents, list):
+        return ("file", _field(contents, "name"), _field(contents, "path"), _field(contents, "size"))
+    return [(_field(i, "type"), _field(i, "name"), _field(i, "path"), _field(i, "size")) for i in contents]
+
+
+def listing_to_node(listing, depth, max_depth):
+    """
+    Turn one normalized directory listing at `depth` into a structure node.
+
+    Returns (node, subdirs): `subdirs` are the (name, path) pairs still to be
+    listed at depth + 1. Their empty placeholders are already in `node`, so
+    filling them in later keeps the key order of the original listing. A failed
+    listing becomes {"_error": <error>}, a reserved key like "_truncated", so it
+    cannot be mistaken for a directory that has an `error` entry.
+    """
+    if isinstance(listing, dict):
+        return {"_error": listing.get("error")}, []
+    if isinstance(listing, tuple):
+        _, name, path, size = listing
+        return {name: {"type": "file", "path": path, "size": size}}, []
+
+    node, subdirs = {}, []
+    for type_, name, path, size in listing:
+        if type_ != "dir":
+            node[name] = {"type": "file", "path": path, "size": size}
+        elif depth + 1 >= max_depth:
+            node[name] = {"_truncated": True}
+        else:
+            node[name] = {}
+            subdirs.append((name, path))
+    return node, subdirs
+
+
+class StructureWalk:
+    """
+    Breadth-first directory walk, independent of how listings are fetched.
+
+    The caller lists the `pending` paths (in any order, concurrently) and hands
+    the listings back to `fill` in the same order until nothing is pending:
+
+        walk = StructureWalk(root_listing, max_depth)
+        while walk.pending:
+            walk.fill([list_dir(path) for path in walk.pending])
+        structure = walk.root
+    """
+
+    def __init__(self, root_listing, max_depth: int):
+        self.max_depth = max_depth
+        self.root, subdirs = listing_to_node(root_listing, 0, max_depth)
+        self._level = [(self.root, name, path) for name, path in subdirs]
+        self._depth = 1
+
+    @property
+    def pending(self) -> list[str]:
+        """Directory paths of the current level still to be listed."""
+        return [path for _, _, path in self._level]
+
+    def fill(self, listings) -> None:
+        """Insert the listings of `pending` and move on to the next level."""
+        next_level = []
+        for (parent, name, _), listing in zip(self._level, listings):
+            node, subdirs = listing_to_node(listing, self._depth, self.max_depth)
+            parent[name] = node
+            next_level.extend((node, child, path) for child, path in subdirs)
+        self._level = next_level
+        self._depth += 1
+
+
+def begin_walk(root_listing, module: str | None, max_depth: int, owner: str, repo_name: str):
+    """
+    Start a walk from the listing of its first directory.
+
+    Returns a `StructureWalk`, or the final result when there is nothing to walk:
+    an error when the first listing failed (or `module` is missing), or
+    {"_truncated": True} for max_depth <= 0.
+    """
+    if isinstance(root_listing, dict):
+        return missing_module(module, owner, repo_name) if module else root_listing
+    if max_depth <= 0:
+        return {"_truncated": True}
+    return StructureWalk(root_listing, max_depth)
+
+
+def has_error(node: dict) -> bool:
+    """Whether a walked structure contains a directory whose listing failed."""
+    return "_error" in node or any(isinstance(child, dict) and has_error(child) for child in node.values())
+
+
+def is_error(result: dict) -> bool:
+    """
+    Whether a structure result is an error envelope rather than a tree whose
+    root has an `error` entry: error values are a message string or carry one,
+    while tree nodes only ever hold dicts.
+    """
+    error = result.get("error")
+    return isinstance(error, str) or (isinstance(error, dict) and isinstance(error.get("message"), str))
+
+
+# -----------------------------
+# Formatting
+# -----------------------------
+def format_compact(structure: dict, indent: str = "") -> str:
+    """
+    Render a nested structure dict as an indented listing, one entry per line:
+
+        README.md 120
+        src/
+         app.py 2048
+         vendor/…
+
+    Children are indented one space under their directory, directories end with
+    "/", files are followed by their size in bytes and "/…" marks a directory cut
+    off by max_depth. Paths are implied by the nesting instead of being repeated
+    for every file, which is where most of the nested format's tokens go.
+    """
+    lines = []
+    for name, node in structure.items():
+        if node.get("type") == "file":
+            size = node.get("size")
+            lines.append(f"{indent}{name}" if size is None else f"{indent}{name} {size}")
+        elif node.get("_truncated"):
+            lines.append(f"{indent}{name}/…")
+        elif "_error" in node:
+            # A directory whose listing failed during a walk (e.g. rate limited).
+            error = node["_error"]
+            lines.append(f"{indent}{name}/ [not listed: {error.get('message') if isinstance(error, dict) else error}]")
+        else:
+            lines.append(f"{indent}{name}/")
+            if node:
+                lines.append(format_compact(node, indent + " "))
+    return "\n".join(lines)
+
+
+def format_structure(structure: dict, output_format: str, module: str | None) -> dict:
+    """Apply `get_repo_structure`'s output_format; errors pass through unchanged."""
+    if output_format == "nested" or is_error(structure):
+        return structure
+    structure = dict(structure)
+    next_cursor = structure.pop("_next_cursor", None)
+    tree = "…" if structure.get("_truncated") else format_compact(structure)
+    result = {"root": module.strip("/") if module else "", "tree": tree}
+    if next_cursor:
+        result["next_cursor"] = next_cursor
+    return result
+
+
+# -----------------------------
+# Paging
+# -----------------------------
+def _encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def structure_page_args(owner, repo_name, module, max_depth, output_format, max_entries, cursor) -> dict:
+    """
+    Validate get_repo_structure's format and paging arguments.
+
+    Returns {"sha", "module", "max_depth", "offset", "limit"} (sha is None unless a
+    cursor pinned it) or an error dict.
+    """
+    if output_format not in STRUCTURE_OUTPUT_FORMATS:
+        return error_response(f"Unknown output_format '{output_format}'; use one of {', '.join(STRUCTURE_OUTPUT_FORMATS)}.")
+    if max_entries is not None and max_entries < 1:
+        return error_response("max_entries must be positive.")
+    limit = min(max_entries or STRUCTURE_MAX_ENTRIES, STRUCTURE_MAX_ENTRIES)
+    if not cursor:
+        return {"sha": None, "module": module, "max_depth": max_depth, "offset": 0, "limit": limit}
+
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if state["repo"].lower() != f"{owner}/{repo_name}".lower():
+            return error_response("Cursor belongs to a different repository.")
+        return {"sha": state["sha"], "module": state["module"], "max_depth": state["max_depth"],
+                "offset": state["offset"], "limit": limit}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return error_response("Invalid cursor; call get_repo_structure again without it.")
+
+
+def _flatten_structure(structure: dict, parents: tuple = ()):
+    """Pre-order (names, node) pairs; directories are yielded as an empty dict before their children."""
+    for name, node in structure.items():
+        names = parents + (name,)
+        if node.get("type") == "file" or node.get("_truncated") or "_error" in node:
+            yield names, node
+        else:
+            yield names, {}
+            yield from _flatten_structure(node, names)
+
+
+def paginate_structure(structure: dict, full_name: str, sha: str, page: dict) -> dict:
+    """
+    Cut `page["limit"]` entries starting at `page["offset"]` out of a structure.
+
+    Each page keeps the directories leading to its first entry, so it reads like
+    a slice of the full tree. Structures that fit in one page are returned as is.
+    """
+    if is_error(structure) or structure.get("_truncated"):
+        return structure
+    items = list(_flatten_structure(structure))
+    offset, limit = page["offset"], page["limit"]
+    if offset == 0 and len(items) <= limit:
+        return structure
+
+    result = {}
+    for names, node in items[offset:offset + limit]:
+        parent = result
+        for name in names[:-1]:
+            parent = parent.setdefault(name, {})
+        parent[names[-1]] = node if node else parent.get(names[-1], {})
+    if offset + limit < len(items):
+        result["_next_cursor"] = _encode_cursor({
+            "repo": full_name, "sha": sha, "module": page["module"],
+            "max_depth": page["max_depth"], "offset": offset + limit,
+        })
+    return result
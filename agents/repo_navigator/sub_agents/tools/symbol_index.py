@@ -0,0 +1,324 @@
+# symbol_index.py
+import ast
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from .metrics import propagate_context
+from .rate_limit import background_priority
+from .utils import logger, error_response
+
+# Bump when parser output changes so cached per-file results are not reused.
+PARSER_VERSION = 2
+# Worker processes parsing files and the batch size below which parsing stays in-process.
+SYMBOL_INDEX_WORKERS = int(os.getenv("SYMBOL_INDEX_WORKERS", str(min(os.cpu_count() or 1, 8))))
+SYMBOL_INDEX_POOL_MIN_FILES = int(os.getenv("SYMBOL_INDEX_POOL_MIN_FILES", "32"))
+# Concurrent blob downloads while indexing (only matters on the REST backend).
+SYMBOL_INDEX_READERS = int(os.getenv("SYMBOL_INDEX_READERS", "8"))
+# Uncached files from which the build reads the backend's commit snapshot (a tarball on REST).
+SYMBOL_INDEX_SNAPSHOT_MIN_FILES = int(os.getenv("SYMBOL_INDEX_SNAPSHOT_MIN_FILES", "50"))
+# Files indexed per commit and largest file parsed.
+SYMBOL_INDEX_MAX_FILES = int(os.getenv("SYMBOL_INDEX_MAX_FILES", "5000"))
+SYMBOL_INDEX_MAX_FILE_BYTES = int(os.getenv("SYMBOL_INDEX_MAX_FILE_BYTES", str(512 * 1024)))
+
+
+# Module-level `name = Factory(...)` assignments recorded as application objects.
+APP_FACTORIES = frozenset({
+    "FastAPI", "Flask", "Quart", "Starlette", "Sanic", "Litestar", "Celery", "Typer",
+    "get_wsgi_application", "get_asgi_application", "Runner", "App",
+})
+APP_OBJECT_NAMES = frozenset({"root_agent"})
+
+
+# -----------------------------
+# Python parser
+# -----------------------------
+def _signature(node) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases] + [ast.unparse(k) for k in node.keywords]
+        return f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _is_main_guard(node) -> bool:
+    """`if __name__ == "__main__":`"""
+    test = node.test if isinstance(node, ast.If) else None
+    return (
+        isinstance(test, ast.Compare)
+        and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+        and len(test.comparators) == 1
+        and isinstance(test.comparators[0], ast.Constant) and test.comparators[0].value == "__main__"
+    )
+
+
+def _app_object(node) -> dict | None:
+    """`app = FastAPI(...)` / `root_agent = Agent(...)` at module level."""
+    if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)):
+        return None
+    names = [t.id for t in node.targets if isinstance(t, ast.Name)]
+    func = node.value.func
+    factory = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+    if not names or not factory or not (factory in APP_FACTORIES or names[0] in APP_OBJECT_NAMES):
+        return None
+    return {"name": names[0], "factory": factory, "line": node.lineno}
+
+
+def parse_python(source: bytes) -> dict:
+    """
+    Symbols and imports of one Python module.
+
+    Returns {"symbols": [...], "imports": [...], "exports": [...] | None, "main_line": int | None,
+    "app_objects": [...]} where each symbol is {"kind", "name", "qualname", "signature",
+    "start_line", "end_line"} (kind is class, function or method; start_line includes
+    decorators), each import is {"module", "names", "level", "line"} and each app object
+    (web/CLI/agent application instances) is {"name", "factory", "line"}.
+    """
+    tree = ast.parse(source)
+    symbols, imports, app_objects = [], [], []
+    exports, main_line = None, None
+
+    def visit(body, prefix: str, in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                is_class = isinstance(node, ast.ClassDef)
+                qualname = prefix + node.name
+                symbols.append({
+                    "kind": "class" if is_class else ("method" if in_class else "function"),
+                    "name": node.name,
+                    "qualname": qualname,
+                    "signature": _signature(node),
+                    "start_line": min([node.lineno] + [d.lineno for d in node.decorator_list]),
+                    "end_line": node.end_lineno,
+                })
+                visit(node.body, qualname + ".", is_class)
+            elif isinstance(node, (ast.If, ast.Try, ast.With, ast.AsyncWith, ast.For, ast.While)):
+                # Conditional definitions (try/except imports, platform checks) still count.
+                for field in ("body", "orelse", "finalbody"):
+                    visit(getattr(node, field, []), prefix, in_class)
+                for handler in getattr(node, "handlers", []):
+                    visit(handler.body, prefix, in_class)
+
+    visit(tree.body, "", False)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append({"module": alias.name, "names": [], "level": 0, "line": node.lineno})
+        elif isinstance(node, ast.ImportFrom):
+            imports.append({
+                "module": node.module or "",
+                "names": [alias.name for alias in node.names],
+                "level": node.level,
+                "line": node.lineno,
+            })
+
+    for node in tree.body:
+        if _is_main_guard(node):
+            main_line = node.lineno
+        elif app_object := _app_object(node):
+            app_objects.append(app_object)
+        elif isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                exports = [e.value for e in node.value.elts if isinstance(e, ast.Constant) and isinstance(e.value, str)]
+
+    return {"symbols": symbols, "imports": imports, "exports": exports, "main_line": main_line, "app_objects": app_objects}
+
+
+# Parsers by file extension; each takes the file bytes and returns `parse_python`'s shape.
+PARSERS: dict[str, Callable[[bytes], dict]] = {".py": parse_python, ".pyi": parse_python}
+
+
+def register_parser(extension: str, parser: Callable[[bytes], dict]) -> None:
+    """
+    Index files with `extension` using `parser`. The parser must be a module-level
+    function (it is pickled to worker processes) returning the same shape as `parse_python`.
+    """
+    PARSERS[extension.lower()] = parser
+
+
+def _install_parsers(parsers: dict) -> None:
+    # Pool initializer: spawn/forkserver workers start from a fresh import without registered parsers.
+    PARSERS.update(parsers)
+
+
+def _parser_pool(workers: int, mp_context=None) -> ProcessPoolExecutor:
+    """Process pool for `parse_file` whose workers know every parser registered here."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                               initializer=_install_parsers, initargs=(dict(PARSERS),))
+
+
+def _parser_for(path: str):
+    return PARSERS.get(os.path.splitext(path)[1].lower())
+
+
+def parse_file(path: str, data: bytes) -> dict:
+    """
+    Parse one file with the parser for its extension. Syntax errors and files nested
+    too deeply to parse (RecursionError, or MemoryError from the parser's own stack)
+    are recorded in "error", not raised, so one file never fails the whole index.
+    """
+    try:
+        return _parser_for(path)(data)
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        line = getattr(e, "lineno", None)
+        return {"symbols": [], "imports": [], "exports": None, "main_line": None, "app_objects": [],
+                "error": f"{type(e).__name__}" + (f" at line {line}" if line else "")}
+
+
+# -----------------------------
+# Index build
+# -----------------------------
+def _file_key(entry, data: bytes | None = None) -> tuple:
+    # Sources without git object ids (snapshots, tarballs) key files by content, so only once read.
+    blob_id = entry.sha or hashlib.sha256(data).hexdigest()
+    return ("symbols-file", PARSER_VERSION, blob_id, os.path.splitext(entry.path)[1].lower())
+
+
+def build_symbol_index(backend, full_name: str, sha: str, cache, max_files: int = SYMBOL_INDEX_MAX_FILES) -> dict:
+    """
+    Build (or load) the symbol index of full_name@sha.
+
+    The whole index is cached in `cache` (a `ContentCache`) under the commit SHA.
+    Per-file results are cached under the blob's git object id, so indexing a new
+    commit only downloads and parses files that changed; entries without one are
+    cached by content hash, so they are read again but not parsed again. With at least
+    SYMBOL_INDEX_SNAPSHOT_MIN_FILES uncached files they are read from the backend's
+    `snapshot` (one tarball download on REST), falling back to per-file reads for
+    anything it cannot serve. Reads use SYMBOL_INDEX_READERS threads at background
+    request priority; files are parsed in a pool of SYMBOL_INDEX_WORKERS processes
+    once there are at least SYMBOL_INDEX_POOL_MIN_FILES of them.
+
+    Files that cannot be read (e.g. rate limited) are left out and listed under
+    "failed"; such a partial index is returned but not cached under the commit,
+    so the next call retries them (successful parses are still cached per file).
+
+    Returns {"files": {path: parsed}, "failed": [path, ...], "truncated": bool,
+    "stats": {...}} or an error dict.
+    """
+    key = ("symbols", full_name, sha, "")
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    started = time.perf_counter()
+    entries = backend.list_tree(full_name, sha)
+    if isinstance(entries, dict) and "error" in entries:
+        return entries
+    if entries is None:
+        return error_response(
+            f"The tree of '{full_name}' is too large to index through the API; enable snapshot mode or a local mirror."
+        )
+
+    candidates = [
+        e for e in entries
+        if e.type == "blob" and _parser_for(e.path) and (e.size or 0) <= SYMBOL_INDEX_MAX_FILE_BYTES
+    ]
+    truncated = len(candidates) > max_files
+    candidates = candidates[:max_files]
+
+    files, todo = {}, []
+    for entry in candidates:
+        hit = cache.get(_file_key(entry)) if entry.sha else None
+        if hit is not None:
+            files[entry.path] = json.loads(hit)
+        else:
+            todo.append(entry)
+    reused = len(files)
+
+    snapshot = None
+    if len(todo) >= SYMBOL_INDEX_SNAPSHOT_MIN_FILES:
+        with background_priority():
+            snapshot = backend.snapshot(full_name, sha)
+
+    def read(entry):
+        data = snapshot.read(entry.path) if snapshot is not None else None
+        if data is None:
+            data = backend.read_blob(full_name, sha, entry.path)
+        return None if data is None or isinstance(data, dict) else bytes(data)
+
+    failed = []
+
+    def readable(blobs):
+        """
+        (entry, data) of the successful reads still to parse, in order; the others are
+        recorded in `failed`, and files without a blob id found by content in `files`.
+        """
+        nonlocal reused
+        for entry, data in zip(todo, blobs):
+            if data is None:
+                failed.append(entry.path)
+                continue
+            hit = None if entry.sha else cache.get(_file_key(entry, data))
+            if hit is not None:
+                files[entry.path] = json.loads(hit)
+                reused += 1
+            else:
+                yield entry, data
+
+    # Bulk downloads yield to interactive reads of other sessions.
+    with background_priority():
+        read = propagate_context(read)
+    try:
+        with ThreadPoolExecutor(max_workers=SYMBOL_INDEX_READERS) as readers:
+            blobs = readers.map(read, todo)
+            if len(todo) >= SYMBOL_INDEX_POOL_MIN_FILES and SYMBOL_INDEX_WORKERS > 1:
+                with _parser_pool(SYMBOL_INDEX_WORKERS) as parsers:
+                    # Submitted as blobs arrive, so downloads and parsing overlap.
+                    jobs = [(entry, data, parsers.submit(parse_file, entry.path, data)) for entry, data in readable(blobs)]
+                    results = [(entry, data, job.result()) for entry, data, job in jobs]
+            else:
+                results = [(entry, data, parse_file(entry.path, data)) for entry, data in readable(blobs)]
+    finally:
+        if snapshot is not None:
+            snapshot.release()
+
+    for entry, data, parsed in results:
+        files[entry.path] = parsed
+        cache.put(_file_key(entry, data), json.dumps(parsed).encode("utf-8"))
+
+    index = {
+        "files": {e.path: files[e.path] for e in candidates if e.path in files},
+        "failed": failed,
+        "truncated": truncated,
+        "stats": {
+            "files": len(files),
+            "parsed": len(results),
+            "reused": reused,
+            "failed_reads": len(failed),
+            "from_snapshot": snapshot is not None,
+            "seconds": round(time.perf_counter() - started, 3),
+        },
+    }
+    if failed:
+        logger.warning("Indexed %s@%s without %d unreadable files: %s", full_name, sha, len(failed), index["stats"])
+        return index
+    logger.info("Indexed %s@%s: %s", full_name, sha, index["stats"])
+    cache.put(key, json.dumps(index).encode("utf-8"))
+    return index
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def search_symbols(index: dict, query: str, kind: str | None = None, limit: int = 50) -> tuple[list[dict], bool]:
+    """
+    Symbols whose name matches `query` exactly (case-insensitive) first, then those
+    whose qualified name contains it. Returns (matches, more_available).
+    """
+    needle = query.strip().lower()
+    exact, partial = [], []
+    for path, parsed in index["files"].items():
+        for symbol in parsed["symbols"]:
+            if kind and symbol["kind"] != kind:
+                continue
+            if symbol["name"].lower() == needle or symbol["qualname"].lower() == needle:
+                exact.append({"path": path, **symbol})
+            elif needle in symbol["qualname"].lower():
+                partial.append({"path": path, **symbol})
+    matches = exact + partial
+    return matches[:limit], len(matches) > limit
@@ -1,5 +1,6 @@
 # utils.py
 import logging
+import time
 import traceback
 import functools
 import inspect
@@ -7,6 +8,8 @@ from typing import Any
 
 from github import GithubException, RateLimitExceededException
 
+from .metrics import tool_metrics
+
 # -----------------------------
 # Logger configuration
 # -----------------------------
@@ -55,16 +58,20 @@ def _format_exc_details(exc: BaseException) -> dict:
 def tool_safety(tool_name: str, *, include_traceback: bool = False):
     """
     Decorator to wrap agent tools and convert exceptions into LLM-safe error envelopes.
+
+    Each outermost call is also timed and its GitHub traffic (requests, bytes,
+    retries) recorded in `tool_metrics`; tools called from another tool count
+    toward the outer one.
     """
     def decorator(func):
         is_coro = inspect.iscoroutinefunction(func)
 
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
+            token, started, failed = tool_metrics.start_call(), time.perf_counter(), True
             try:
                 result = await func(*args, **kwargs)
-                if _is_error_envelope(result):
-                    return result
+                failed = _is_error_envelope(result)
                 return result
             except Exception as e:
                 logger.exception("[%s] Unexpected exception: %s", tool_name, e)
@@ -72,16 +79,18 @@ def tool_safety(tool_name: str, *, include_traceback: bool = False):
                 if not include_traceback:
                     details.pop("traceback_snippet", None)
                 return error_response(f"{tool_name}: unexpected error", details=details)
+            finally:
+                tool_metrics.finish_call(tool_name, token, time.perf_counter() - started, failed)
 
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
+            token, started, failed = tool_metrics.start_call(), time.perf_counter(), True
             try:
                 result = func(*args, **kwargs)
                 if inspect.isawaitable(result):
                     logger.error("[%s] Sync wrapper got awaitable", tool_name)
                     return error_response(f"{tool_name}: internal misconfiguration")
-                if _is_error_envelope(result):
-                    return result
+                failed = _is_error_envelope(result)
                 return result
             except Exception as e:
                 logger.exception("[%s] Unexpected exception: %s", tool_name, e)
@@ -89,6 +98,8 @@ def tool_safety(tool_name: str, *, include_traceback: bool = False):
                 if not include_traceback:
                     details.pop("traceback_snippet", None)
                 return error_response(f"{tool_name}: unexpected error", details=details)
+            finally:
+                tool_metrics.finish_call(tool_name, token, time.perf_counter() - started, failed)
 
         return async_wrapper if is_coro else sync_wrapper
 
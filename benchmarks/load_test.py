@@ -0,0 +1,285 @@
+"""
+End-to-end load test: N concurrent conversations on the real agent runner.
+
+    python benchmarks/load_test.py [--sessions 20] [--turns 3] [--files 20000] [--shape wide]
+                                   [--github-latency 0.02] [--model-latency 0.3] [--rate-limit 5000]
+                                   [--output results.json]
+
+Drives `runner` from `agents/repo_navigator/agent.py` (its plugins, session
+service and tools unchanged) against two local stand-ins:
+
+- a GitHub API on localhost (`FakeGithubServer` serving a `SyntheticRepo`,
+  with rate-limit headers and a per-request latency), reached through
+  GITHUB_API_URL by both GitHub clients;
+- `ScriptedLlm`, a deterministic model that replays the tool-call sequence a
+  real model follows for each agent, after `--model-latency` seconds.
+
+Each session asks about the repository first (extract -> transfer ->
+get_repo_structure), then about one file per turn (code_summarizer ->
+read_file_content). Turns within a session run one after another; sessions run
+concurrently. Reports p50/p95/p99 turn latency, throughput, GitHub and model
+calls, tool calls and errors (including those made inside code_summarizer)
+and resident memory per session, and writes them as JSON
+(default benchmarks/results/load_test-<commit>.json).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import re
+import resource
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "agents"))
+sys.path.insert(0, HERE)
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from synthetic_repo import SHAPES, FakeGithubAPI, FakeGithubServer, SyntheticRepo  # noqa: E402
+
+OWNER = "bench"
+_REPO_URL = re.compile(r"github\.com/([^/\s]+)/([^/\s?#]+)")
+_FILE_URL = re.compile(r"githuburl:\s*https://github\.com/([^/\s]+)/([^/\s]+)/blob/([^/\s]+)/(\S+)")
+_FILE_PATH = re.compile(r"\b([\w./-]+\.py)\b")
+
+
+# -----------------------------
+# Scripted model
+# -----------------------------
+def _call(name: str, **args) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+
+def _text(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _turn_results(contents: list[types.Content]) -> list[str]:
+    """Names of the tool results in the trailing run of tool-call/tool-result contents."""
+    names = []
+    for content in reversed(contents):
+        parts = content.parts or []
+        if not parts or not all(p.function_call or p.function_response for p in parts):
+            break
+        names.extend(p.function_response.name for p in parts if p.function_response)
+    return names[::-1]
+
+
+def _question(contents: list[types.Content]) -> str:
+    """The latest user message (not tool results or other agents' context)."""
+    for content in reversed(contents):
+        texts = [p.text for p in content.parts or [] if p.text and content.role == "user"]
+        if texts and not texts[0].startswith("For context:"):
+            return "\n".join(texts)
+    return ""
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Deterministic stand-in for Gemini that follows each agent's protocol.
+
+    The agent is recognized by the tools in the request; its next step by the
+    tool results already in the current turn. Requests without tools (event
+    compaction) get a fixed summary.
+    """
+
+    model: str = "scripted"
+    latency: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        yield LlmResponse(content=self.respond(llm_request))
+
+    def respond(self, llm_request: LlmRequest) -> types.Content:
+        tools = set(llm_request.tools_dict)
+        done = _turn_results(llm_request.contents)
+        question = _question(llm_request.contents)
+        repo = _REPO_URL.search(question)
+
+        if "extract_owner_and_repo" in tools:
+            if not done and repo:
+                return _call("extract_owner_and_repo", github_url=f"https://github.com/{repo[1]}/{repo[2]}")
+            if done == ["extract_owner_and_repo"]:
+                return _call("transfer_to_agent", agent_name="code_architecture_agent")
+            return _text("I can help you navigate github repositories.")
+
+        if "get_repo_structure" in tools:
+            if done or not repo:
+                return _text(f"Answer from {', '.join(done) or 'history'}.")
+            owner, name = repo[1], repo[2]
+            path = _FILE_PATH.search(question)
+            if path:
+                url = f"https://github.com/{owner}/{name}/blob/main/{path[1]}"
+                return _call("code_summarizer", request=f"what does it do for owner:{owner} repo:{name} githuburl:{url}")
+            return _call("get_repo_structure", owner=owner, repo_name=name, max_depth=2)
+
+        if "read_file_content" in tools:
+            target = _FILE_URL.search(question)
+            if not done and target:
+                return _call("read_file_content", owner=target[1], repo_name=target[2], file_path=target[4],
+                             branch=target[3])
+            return _text(f"File: {target[4] if target else '?'}\n---\nRuns one step of the pipeline.")
+
+        return _text("Summary: the user explored a repository and its files.")
+
+
+def _use_model(model: ScriptedLlm) -> None:
+    from repo_navigator import agent
+    from repo_navigator.sub_agents.file_summarizer_agent import file_architecture_summarizer_agent
+
+    pending = [agent.root_agent, file_architecture_summarizer_agent]
+    while pending:
+        current = pending.pop()
+        current.model = model
+        pending.extend(current.sub_agents)
+
+
+# -----------------------------
+# Load
+# -----------------------------
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)] if ordered else 0.0
+
+
+async def _conversation(runner, session_id: str, user_id: str, questions: list[str], latencies: list, errors: list):
+    for question in questions:
+        message = types.Content(role="user", parts=[types.Part(text=question)])
+        started = time.perf_counter()
+        try:
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+                if event.error_code:
+                    errors.append(event.error_message or event.error_code)
+                for response in event.get_function_responses():
+                    if isinstance(response.response, dict) and "error" in response.response:
+                        errors.append(f"{response.name}: {response.response['error']}")
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        latencies.append(time.perf_counter() - started)
+
+
+async def drive(runner, repo: SyntheticRepo, sessions: int, turns: int) -> dict:
+    url = f"https://github.com/{repo.full_name}"
+    created = [
+        await runner.session_service.create_session(app_name=runner.app_name, user_id=f"load-{i}")
+        for i in range(sessions)
+    ]
+    scripts = [
+        [f"How is {url} organized?"] + [
+            f"What does {repo.paths[(i * turns + t) % len(repo.paths)]} do in {url}?" for t in range(1, turns)
+        ]
+        for i in range(sessions)
+    ]
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _conversation(runner, s.id, s.user_id, script, latencies, errors) for s, script in zip(created, scripts)
+    ))
+    return {"seconds": time.perf_counter() - started, "latencies": latencies, "errors": errors}
+
+
+def run(args) -> dict:
+    repo = SyntheticRepo(f"{OWNER}/load-{args.shape}", args.files, args.shape)
+    api = FakeGithubAPI([repo], rate_limit=args.rate_limit)
+    api.prepare()
+    model = ScriptedLlm(latency=args.model_latency)
+
+    with FakeGithubServer(api, latency=args.github_latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "GITHUB_API_URL": server.url,
+            "GITHUB_TOKEN": "load-token",
+            "SESSION_DB_PATH": os.path.join(tmp, "sessions.sqlite3"),
+        })
+        # Imported only now: the tools read GITHUB_API_URL and SESSION_DB_PATH at import time.
+        from repo_navigator import agent
+        from repo_navigator.sub_agents.tools.metrics import tool_metrics
+        from tool_layer import git_commit
+
+        _use_model(model)
+        baseline = _rss_bytes()
+        # LoggingPlugin prints every event; keep the console readable without dropping the work.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = asyncio.run(drive(agent.runner, repo, args.sessions, args.turns))
+        peak = max(_rss_bytes(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        metrics = tool_metrics.snapshot()
+        commit = git_commit()
+
+    latencies = result["latencies"]
+    return {
+        "benchmark": "load_test",
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "turns": len(latencies),
+        "seconds": round(result["seconds"], 3),
+        "throughput_turns_per_second": round(len(latencies) / result["seconds"], 3),
+        "latency_seconds": {
+            name: round(_percentile(latencies, q), 4) for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        } | {"max": round(max(latencies, default=0), 4)},
+        "model_calls": model.calls,
+        "github_calls": dict(sorted(api.calls.items())),
+        "tool_calls": {name: {"calls": t["calls"], "errors": t["errors"]} for name, t in metrics["tools"].items()},
+        "errors": len(result["errors"]),
+        "error_samples": sorted(set(map(str, result["errors"])))[:10],
+        "memory": {
+            "baseline_rss_bytes": baseline,
+            "peak_rss_bytes": peak,
+            "per_session_bytes": (peak - baseline) // max(1, args.sessions),
+        },
+        "tool_metrics": metrics,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3, help="user messages per conversation")
+    parser.add_argument("--files", type=int, default=20_000, help="files in the synthetic repository")
+    parser.add_argument("--shape", choices=SHAPES, default="wide")
+    parser.add_argument("--github-latency", type=float, default=0.02, help="seconds per GitHub request")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="seconds per model call")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="GitHub requests per token per hour")
+    parser.add_argument("--output", help="results file (default benchmarks/results/load_test-<commit>.json)")
+    args = parser.parse_args()
+
+    results = run(args)
+    output = args.output or os.path.join(HERE, "results", f"load_test-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    latency, memory = results["latency_seconds"], results["memory"]
+    print(f"{args.sessions} sessions x {args.turns} turns: {results['turns']} turns in {results['seconds']}s "
+          f"({results['throughput_turns_per_second']} turns/s)")
+    print(f"turn latency p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s  max {latency['max']}s")
+    print(f"model calls {results['model_calls']}  github calls {sum(results['github_calls'].values())} "
+          f"{results['github_calls']}  turn errors {results['errors']}")
+    print("tool calls/errors " + "  ".join(f"{name} {t['calls']}/{t['errors']}" for name, t in results["tool_calls"].items()))
+    print(f"rss baseline {memory['baseline_rss_bytes'] / 2**20:.1f} MB  peak {memory['peak_rss_bytes'] / 2**20:.1f} MB  "
+          f"per session {memory['per_session_bytes'] / 2**10:.0f} KB")
+    for sample in results["error_samples"]:
+        print(f"  error: {sample}")
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
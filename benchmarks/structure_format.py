@@ -0,0 +1,99 @@
+"""
+Compare get_repo_structure output formats on synthetic trees.
+
+    python benchmarks/structure_format.py [--json]
+
+Reports the size of the tool result as the model sees it (JSON) in bytes and
+tokens. Tokens come from tiktoken's cl100k_base when it is installed, otherwise
+from a word/punctuation split that tracks BPE counts closely enough to compare
+formats.
+"""
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from repo_navigator.sub_agents.tools.backends import TreeEntry  # noqa: E402
+from repo_navigator.sub_agents.tools.structure import build_structure_from_tree, format_structure  # noqa: E402
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "cl100k_base"
+except ImportError:
+    def count_tokens(text: str) -> int:
+        return len(re.findall(r"\w+|[^\w\s]", text))
+
+    TOKENIZER = "approx (word/punctuation split)"
+
+
+def _tree(files: list[str]) -> list[TreeEntry]:
+    """Flat recursive tree entries (parents first) for a list of file paths."""
+    entries, seen = [], set()
+    for i, path in enumerate(sorted(files, key=lambda p: p.split("/"))):
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            directory = "/".join(parts[:depth])
+            if directory not in seen:
+                seen.add(directory)
+                entries.append(TreeEntry(directory, "tree", None))
+        entries.append(TreeEntry(path, "blob", 100 + (i * 37) % 9000))
+    return entries
+
+
+def synthetic_trees() -> dict[str, list[TreeEntry]]:
+    python_package = [
+        f"src/app/{pkg}/{sub}/module_{n}.py"
+        for pkg in ("api", "core", "models", "services", "utils")
+        for sub in ("handlers", "schemas", "internal")
+        for n in range(8)
+    ] + ["README.md", "pyproject.toml", "setup.cfg"] + [f"tests/unit/test_module_{n}.py" for n in range(40)]
+    monorepo = [
+        f"packages/{pkg}/src/{area}/{name}.ts"
+        for pkg in ("web", "admin", "shared", "mobile", "cli", "server")
+        for area in ("components", "hooks", "lib", "routes")
+        for name in ("index", "Button", "Dialog", "useAuth", "client", "router")
+    ] + [f"packages/{pkg}/package.json" for pkg in ("web", "admin", "shared", "mobile", "cli", "server")]
+    flat = [f"data/fixtures/record_{n:05d}.json" for n in range(2000)]
+    return {"python_package": _tree(python_package), "monorepo": _tree(monorepo), "flat_directory": _tree(flat)}
+
+
+def measure(max_depth: int = 5) -> list[dict]:
+    rows = []
+    for name, entries in synthetic_trees().items():
+        nested = build_structure_from_tree(entries, "", max_depth, "owner", "repo")
+        sizes = {}
+        for output_format in ("nested", "compact"):
+            text = json.dumps(format_structure(nested, output_format, None))
+            sizes[output_format] = {"bytes": len(text.encode("utf-8")), "tokens": count_tokens(text)}
+        rows.append({
+            "tree": name,
+            "entries": len(entries),
+            **{f"{fmt}_{unit}": sizes[fmt][unit] for fmt in sizes for unit in ("bytes", "tokens")},
+            "bytes_saved_pct": round(100 * (1 - sizes["compact"]["bytes"] / sizes["nested"]["bytes"]), 1),
+            "tokens_saved_pct": round(100 * (1 - sizes["compact"]["tokens"] / sizes["nested"]["tokens"]), 1),
+        })
+    return rows
+
+
+def main() -> None:
+    rows = measure()
+    if "--json" in sys.argv:
+        print(json.dumps({"tokenizer": TOKENIZER, "results": rows}, indent=2))
+        return
+    print(f"tokenizer: {TOKENIZER}")
+    print(f"{'tree':<16}{'entries':>8}{'nested B':>10}{'compact B':>11}{'saved':>7}{'nested tok':>12}{'compact tok':>13}{'saved':>7}")
+    for r in rows:
+        print(f"{r['tree']:<16}{r['entries']:>8}{r['nested_bytes']:>10}{r['compact_bytes']:>11}{r['bytes_saved_pct']:>6}%"
+              f"{r['nested_tokens']:>12}{r['compact_tokens']:>13}{r['tokens_saved_pct']:>6}%")
+
+
+if __name__ == "__main__":
+    main()
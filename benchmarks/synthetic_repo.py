@@ -0,0 +1,277 @@
+"""
+Synthetic GitHub repositories for benchmarks and load tests.
+
+`SyntheticRepo` generates a deterministic repository of any size (10k-500k
+files) in one of a few shapes; blob contents are derived from the path and
+size, so file bytes are never held for the whole repo. `FakeGithubAPI` serves
+one or more such repos through the handful of REST endpoints the tools use
+(repo metadata, commit SHA, recursive tree, contents listing / raw blob) with
+GitHub's tree truncation and rate-limit headers, counts every request, and
+plugs into httpx as a `MockTransport` with a configurable per-request latency.
+`FakeGithubServer` serves the same API over real HTTP on localhost, for code
+that builds its own clients from GITHUB_API_URL.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httpx
+
+SHAPES = ("wide", "deep", "large_blobs")
+# GitHub stops listing a recursive tree after this many entries and sets "truncated".
+TREE_ENTRY_LIMIT = 100_000
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+
+_SOURCE_LINE = b"    value = compute(value, step)  # keep the pipeline moving\n"
+
+
+class SyntheticRepo:
+    """
+    A deterministic repository of `files` files.
+
+    Shapes:
+        wide: src/package_*/module_*/ directories of 200 files each (200 modules
+            per package).
+        deep: each directory has 4 subdirectories and 4 files, so paths run
+            ~log4(files) levels deep.
+        large_blobs: like wide, with every 500th file `large_blob_bytes` long.
+    """
+
+    def __init__(self, full_name: str, files: int, shape: str = "wide", blob_bytes: int = 2048,
+                 large_blob_bytes: int = 4 * 1024 * 1024):
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown shape '{shape}'; use one of {SHAPES}.")
+        self.full_name = full_name
+        self.files = files
+        self.shape = shape
+        self.blob_bytes = blob_bytes
+        self.large_blob_bytes = large_blob_bytes
+        self.default_branch = "main"
+        self.sha = hashlib.sha1(f"{full_name}:{files}:{shape}".encode()).hexdigest()
+        self.paths = [self._path(n) for n in range(files)]
+        self.sizes = {path: self._size(n) for n, path in enumerate(self.paths)}
+        self.children = self._index()
+
+    def _path(self, n: int) -> str:
+        if self.shape == "deep":
+            dirs, rest = [], n // 4
+            while rest:
+                rest -= 1
+                dirs.append(f"level_{rest % 4}")
+                rest //= 4
+            return "/".join(["src", *reversed(dirs), f"module_{n}.py"])
+        return f"src/package_{n // 40000}/module_{(n // 200) % 200}/file_{n}.py"
+
+    def _size(self, n: int) -> int:
+        if self.shape == "large_blobs" and n % 500 == 0:
+            return self.large_blob_bytes
+        return self.blob_bytes + (n * 37) % self.blob_bytes
+
+    def _index(self) -> dict[str, dict[str, str]]:
+        """directory -> {child name: "dir" | "file"} for contents listings."""
+        children: dict[str, dict[str, str]] = {"": {}}
+        for path in self.paths:
+            parts = path.split("/")
+            for depth in range(len(parts)):
+                parent, name = "/".join(parts[:depth]), parts[depth]
+                children.setdefault(parent, {})[name] = "file" if depth == len(parts) - 1 else "dir"
+        return children
+
+    def tree_entries(self) -> list[dict]:
+        """Recursive tree entries as the git trees API returns them (parents first)."""
+        entries, seen = [], set()
+        for path in self.paths:
+            parts = path.split("/")
+            for depth in range(1, len(parts)):
+                directory = "/".join(parts[:depth])
+                if directory not in seen:
+                    seen.add(directory)
+                    entries.append({"path": directory, "type": "tree", "mode": "040000"})
+            entries.append({"path": path, "type": "blob", "mode": "100644", "size": self.sizes[path]})
+        return entries
+
+    def blob(self, path: str) -> bytes:
+        """Python-looking source of exactly the file's size."""
+        size = self.sizes[path]
+        header = f"# {path}\ndef run(value, step):\n".encode()
+        body = header + _SOURCE_LINE * ((size - len(header)) // len(_SOURCE_LINE) + 1)
+        return body[:size]
+
+    @property
+    def large_file(self) -> str:
+        """The largest file (a large blob for the large_blobs shape)."""
+        return max(self.paths[:1000], key=self.sizes.__getitem__)
+
+
+class FakeGithubAPI:
+    """
+    GitHub REST stand-in for `SyntheticRepo`s.
+
+    Counts requests per endpoint in `calls`, sends a per-token quota as
+    X-RateLimit-* headers (403 once it is spent, like GitHub), and pre-renders
+    tree bodies with `prepare()` so benchmarks can keep that cost out of the
+    measured section.
+    """
+
+    def __init__(self, repos: list[SyntheticRepo], rate_limit: int = 5000, rate_window: float = 3600.0):
+        self.repos = {repo.full_name.lower(): repo for repo in repos}
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.calls: Counter = Counter()
+        self._quotas: dict[str, tuple[int, float]] = {}
+        self._trees: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self) -> None:
+        for repo in self.repos.values():
+            self._tree_body(repo)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self._quotas.clear()
+
+    def _tree_body(self, repo: SyntheticRepo) -> bytes:
+        body = self._trees.get(repo.full_name)
+        if body is None:
+            entries = repo.tree_entries()
+            body = self._trees[repo.full_name] = json.dumps({
+                "sha": repo.sha, "truncated": len(entries) > TREE_ENTRY_LIMIT, "tree": entries[:TREE_ENTRY_LIMIT],
+            }).encode()
+        return body
+
+    def _rate_headers(self, token: str) -> tuple[dict, bool]:
+        now = time.time()
+        with self._lock:
+            remaining, reset = self._quotas.get(token, (self.rate_limit, now + self.rate_window))
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.rate_window
+            limited = remaining <= 0
+            if not limited:
+                remaining -= 1
+            self._quotas[token] = (remaining, reset)
+        headers = {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(reset)),
+        }
+        return headers, limited
+
+    def respond(self, path: str, query: dict, headers: dict) -> tuple[int, dict, bytes]:
+        """(status, headers, body) for a GET of `path`."""
+        token = headers.get("authorization", "").removeprefix("token ")
+        rate_headers, limited = self._rate_headers(token)
+        if limited:
+            self._count("rate_limited")
+            return 403, rate_headers, b'{"message": "API rate limit exceeded"}'
+
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        repo = self.repos.get("/".join(parts[1:3]).lower()) if len(parts) >= 3 and parts[0] == "repos" else None
+        if repo is None:
+            self._count("not_found")
+            return 404, rate_headers, b'{"message": "Not Found"}'
+        rest, accept = parts[3:], headers.get("accept", "")
+        json_headers = {**rate_headers, "Content-Type": "application/json"}
+
+        if not rest:
+            self._count("repo")
+            body = {"full_name": repo.full_name, "default_branch": repo.default_branch, "private": False}
+            return 200, json_headers, json.dumps(body).encode()
+        if rest[0] == "commits" and len(rest) == 2:
+            self._count("commit")
+            if rest[1] not in (repo.default_branch, repo.sha):
+                return 422, json_headers, b'{"message": "No commit found"}'
+            sha_headers = {**rate_headers, "ETag": f'"{repo.sha}"'}
+            return 200, sha_headers, repo.sha.encode() if SHA_MEDIA_TYPE in accept else json.dumps({"sha": repo.sha}).encode()
+        if rest[0] == "git" and rest[1:2] == ["trees"]:
+            self._count("tree")
+            return 200, {**json_headers, "ETag": f'"tree-{repo.sha}"'}, self._tree_body(repo)
+        if rest[0] == "contents":
+            target = "/".join(rest[1:]).strip("/")
+            if target in repo.children:
+                self._count("contents_dir")
+                prefix = f"{target}/" if target else ""
+                listing = [
+                    {"type": kind, "name": name, "path": prefix + name,
+                     "size": repo.sizes.get(prefix + name, 0) if kind == "file" else 0}
+                    for name, kind in sorted(repo.children[target].items())
+                ]
+                return 200, json_headers, json.dumps(listing).encode()
+            if target in repo.sizes:
+                self._count("contents_file")
+                data = repo.blob(target)
+                if RAW_MEDIA_TYPE in accept:
+                    return 200, {**rate_headers, "Content-Type": "application/octet-stream"}, data
+                body = {"type": "file", "name": target.rsplit("/", 1)[-1], "path": target, "size": len(data),
+                        "encoding": "base64", "content": base64.b64encode(data).decode()}
+                return 200, json_headers, json.dumps(body).encode()
+        self._count("not_found")
+        return 404, json_headers, b'{"message": "Not Found"}'
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def transport(self, latency: float = 0.0) -> httpx.MockTransport:
+        """httpx transport answering from this API after `latency` seconds per request."""
+        async def handle(request: httpx.Request) -> httpx.Response:
+            if latency:
+                await asyncio.sleep(latency)
+            status, headers, body = self.respond(
+                request.url.path, parse_qs(request.url.query.decode()), {k.lower(): v for k, v in request.headers.items()}
+            )
+            return httpx.Response(status, headers=headers, content=body)
+        return httpx.MockTransport(handle)
+
+
+class FakeGithubServer:
+    """
+    `FakeGithubAPI` on http://127.0.0.1:<port>, answering each request after
+    `latency` seconds (in its own thread, like a remote server).
+
+        with FakeGithubServer(api, latency=0.02) as server:
+            os.environ["GITHUB_API_URL"] = server.url
+    """
+
+    def __init__(self, api: FakeGithubAPI, latency: float = 0.0):
+        self.api = api
+        self.latency = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+
+            def do_GET(handler):
+                if self.latency:
+                    time.sleep(self.latency)
+                url = urlsplit(handler.path)
+                status, headers, body = self.api.respond(
+                    url.path, parse_qs(url.query), {k.lower(): v for k, v in handler.headers.items()}
+                )
+                handler.send_response(status)
+                for name, value in headers.items():
+                    handler.send_header(name, value)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeGithubServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,210 @@
+"""
+Benchmark the GitHub tool layer on synthetic repositories.
+
+    python benchmarks/tool_layer.py [--files 10000 100000] [--shapes wide deep large_blobs]
+                                    [--latency 0.02] [--requests-per-second 0]
+                                    [--output results.json] [--compare old.json]
+
+Each repository from `synthetic_repo.py` is served by the fake GitHub API
+through httpx with `--latency` seconds per request. Every case runs once cold
+(all caches cleared, new client) and once warm, and records the GitHub API
+calls issued (per endpoint), wall time, peak traced memory (tracemalloc,
+including the response bodies the fake hands to the client) and the size of
+the tool result as the model would see it (JSON bytes). Request pacing is off
+by default (`--requests-per-second 0`) so wall time reflects the tool code and
+the fake latency; pass GITHUB_REQUESTS_PER_SECOND to include production pacing.
+
+Results go to `--output` (default benchmarks/results/tool_layer-<commit>.json);
+`--compare` prints the change against an earlier results file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "agents"))
+sys.path.insert(0, HERE)
+
+from synthetic_repo import SHAPES, FakeGithubAPI, SyntheticRepo  # noqa: E402
+
+from repo_navigator.sub_agents.tools import async_github_tools, github_tools, repo_cache  # noqa: E402
+from repo_navigator.sub_agents.tools.async_github_tools import AsyncGithubClient  # noqa: E402
+from repo_navigator.sub_agents.tools.rate_limit import github_scheduler  # noqa: E402
+
+OWNER = "bench"
+URLS = (
+    "https://github.com/{owner}/{repo}",
+    "https://github.com/{owner}/{repo}/blob/main/src/app.py",
+    "github.com/{owner}/{repo}/tree/main/docs",
+    "{owner}/{repo}",
+    "https://github.com/{owner}",
+)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_caches() -> None:
+    """Forget everything the tools remember between calls (a cold worker)."""
+    repo_cache.content_cache.clear()
+    repo_cache.etag_store.clear()
+    github_scheduler.reset()
+
+
+def cases(repo: SyntheticRepo) -> dict:
+    """name -> coroutine factory running one tool call against `repo`."""
+    name = repo.full_name.split("/")[1]
+    small = repo.paths[1]
+    return {
+        "get_repo_structure.depth2": lambda: async_github_tools.get_repo_structure(
+            OWNER, name, max_depth=2, output_format="compact"),
+        "get_repo_structure.first_page": lambda: async_github_tools.get_repo_structure(
+            OWNER, name, max_depth=64, output_format="compact"),
+        "read_file_content.small": lambda: async_github_tools.read_file_content(OWNER, name, small),
+        "read_file_content.large": lambda: async_github_tools.read_file_content(OWNER, name, repo.large_file),
+        "read_file_content.window": lambda: async_github_tools.read_file_content(
+            OWNER, name, repo.large_file, start_line=1000, end_line=1100),
+    }
+
+
+async def measure(api: FakeGithubAPI, run) -> dict:
+    api.reset_counters()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = await run()
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "api_calls": sum(api.calls.values()),
+        "calls_by_endpoint": dict(sorted(api.calls.items())),
+        "wall_seconds": round(seconds, 4),
+        "peak_memory_bytes": peak,
+        "output_bytes": len(json.dumps(result).encode("utf-8")),
+        "error": result.get("error", {}).get("message") if isinstance(result, dict) and "error" in result else None,
+    }
+
+
+async def bench_repo(repo: SyntheticRepo, latency: float) -> list[dict]:
+    api = FakeGithubAPI([repo], rate_limit=10**9)  # quota exhaustion is the load harness's concern
+    api.prepare()
+    rows = []
+    for case, run in cases(repo).items():
+        reset_caches()
+        client = AsyncGithubClient("bench-token", transport=api.transport(latency))
+        async_github_tools._get_async_client = lambda: client
+        try:
+            for phase in ("cold", "warm"):
+                rows.append({"case": case, "shape": repo.shape, "files": repo.files, "phase": phase,
+                             **await measure(api, run)})
+        finally:
+            await client.aclose()
+    return rows
+
+
+def bench_extract(count: int = 10_000) -> dict:
+    urls = [URLS[i % len(URLS)].format(owner=f"owner{i}", repo=f"repo{i}") for i in range(count)]
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = [github_tools.extract_owner_and_repo(url) for url in urls]
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "case": "extract_owner_and_repo", "shape": None, "files": None, "phase": f"{count} urls",
+        "api_calls": 0, "calls_by_endpoint": {}, "wall_seconds": round(seconds, 4), "peak_memory_bytes": peak,
+        "output_bytes": sum(len(json.dumps(r)) for r in results), "error": None,
+    }
+
+
+def run(files: list[int], shapes: list[str], latency: float, requests_per_second: float) -> dict:
+    os.environ.setdefault("GITHUB_TOKEN", "bench-token")
+    original, original_rate = async_github_tools._get_async_client, github_scheduler.rate
+    github_scheduler.rate = requests_per_second
+    rows = [bench_extract()]
+    try:
+        for shape in shapes:
+            for count in files:
+                repo = SyntheticRepo(f"{OWNER}/{shape}-{count}", count, shape)
+                rows.extend(asyncio.run(bench_repo(repo, latency)))
+                print(f"  {shape} {count} files done", file=sys.stderr)
+    finally:
+        async_github_tools._get_async_client, github_scheduler.rate = original, original_rate
+        github_scheduler.reset()
+    return {
+        "benchmark": "tool_layer",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "latency_seconds": latency,
+        "requests_per_second": requests_per_second,
+        "results": rows,
+    }
+
+
+def _key(row: dict) -> tuple:
+    return row["case"], row["shape"], row["files"], row["phase"]
+
+
+def compare(current: dict, previous: dict) -> None:
+    before = {_key(r): r for r in previous["results"]}
+    print(f"change vs {previous.get('commit') or 'previous run'}:")
+    print(f"{'case':<32}{'shape':<12}{'files':>8} {'phase':<11}{'calls':>9}{'time':>9}{'memory':>9}{'output':>9}")
+    for row in current["results"]:
+        old = before.get(_key(row))
+        if old is None:
+            continue
+        deltas = [
+            f"{row['api_calls'] - old['api_calls']:+d}",
+            *(f"{(row[m] / old[m] - 1) * 100:+.0f}%" if old[m] else "n/a"
+              for m in ("wall_seconds", "peak_memory_bytes", "output_bytes")),
+        ]
+        print(f"{row['case']:<32}{row['shape'] or '-':<12}{row['files'] or '-':>8} {row['phase']:<11}"
+              + "".join(f"{d:>9}" for d in deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, nargs="+", default=[10_000, 100_000],
+                        help="repository sizes in files (up to 500000)")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake GitHub request")
+    parser.add_argument("--requests-per-second", type=float, default=0,
+                        help="GitHub request pacing per token (0 = unpaced)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/tool_layer-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = run(args.files, args.shapes, args.latency, args.requests_per_second)
+    output = args.output or os.path.join(HERE, "results", f"tool_layer-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'case':<32}{'shape':<12}{'files':>8} {'phase':<11}{'calls':>7}{'seconds':>9}{'peak MB':>9}{'out KB':>9}")
+    for r in results["results"]:
+        print(f"{r['case']:<32}{r['shape'] or '-':<12}{r['files'] or '-':>8} {r['phase']:<11}{r['api_calls']:>7}"
+              f"{r['wall_seconds']:>9.3f}{r['peak_memory_bytes'] / 2**20:>9.1f}{r['output_bytes'] / 1024:>9.1f}"
+              + (f"  error: {r['error']}" if r["error"] else ""))
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
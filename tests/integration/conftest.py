@@ -1,4 +1,5 @@
 import pytest
+from github import GithubException
 
 # This conftest provides a deterministic fake GitHub client so integration
 # tests that depend on repository contents become repeatable. It only fakes
@@ -20,9 +21,38 @@ class FakeContent:
         self.size = len(content_bytes)
 
 
+class FakeCommit:
+    def __init__(self, sha):
+        self.sha = sha
+
+
+class FakeTreeElement:
+    def __init__(self, path, type_, size=None):
+        self.path = path
+        self.type = type_
+        self.size = size
+
+
+class FakeTree:
+    def __init__(self, elements, truncated=False):
+        self.tree = elements
+        self.truncated = truncated
+
+
 class FakeRepo:
     def __init__(self, full_name):
         self.full_name = full_name
+        self.default_branch = "main"
+
+    def get_commit(self, ref):
+        return FakeCommit(f"fake-{ref or 'HEAD'}")
+
+    def get_git_tree(self, sha, recursive=False):
+        # The fake repos are flat, so the root listing is the full recursive tree.
+        return FakeTree([
+            FakeTreeElement(item.path, "tree" if item.type == "dir" else "blob", item.size)
+            for item in self.get_contents("")
+        ])
 
     def get_contents(self, path, ref=None):
         # Normalize path
@@ -84,6 +114,54 @@ class FakeGithub:
         return FakeRepo(full_name)
 
 
+class FakeRawResponse:
+    """Streamed raw body as returned by `AsyncGithubClient.open_raw`."""
+
+    def __init__(self, content_bytes, chunk_size=16):
+        self.content = content_bytes
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    async def aiter_bytes(self):
+        for offset in range(0, len(self.content), self.chunk_size):
+            yield self.content[offset:offset + self.chunk_size]
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeAsyncGithub:
+    """Async counterpart used by `async_github_tools`, backed by the same FakeRepo data."""
+
+    async def get_repo(self, full_name):
+        return {"full_name": full_name, "default_branch": "main"}
+
+    async def resolve_ref(self, full_name, ref):
+        return FakeRepo(full_name).get_commit(ref).sha
+
+    async def get_tree(self, full_name, sha):
+        tree = FakeRepo(full_name).get_git_tree(sha, recursive=True)
+        return {
+            "truncated": tree.truncated,
+            "tree": [{"path": e.path, "type": e.type, "size": e.size} for e in tree.tree],
+        }
+
+    async def get_contents(self, full_name, path, ref):
+        result = FakeRepo(full_name).get_contents(path, ref=ref)
+        if isinstance(result, FakeContent):
+            return {"type": "file", "name": result.name, "path": result.path, "size": result.size}
+        return [{"type": i.type, "name": i.name, "path": i.path, "size": i.size} for i in result]
+
+    async def get_raw(self, full_name, path, ref):
+        result = FakeRepo(full_name).get_contents(path, ref=ref)
+        if isinstance(result, FakeContent):
+            return result.decoded_content
+        raise GithubException(404, {"message": "Not Found"}, {})
+
+    async def open_raw(self, full_name, path, ref):
+        return FakeRawResponse(await self.get_raw(full_name, path, ref))
+
+
 @pytest.fixture(autouse=True)
 def patch_github_client(monkeypatch):
     # Patch _get_github_client() to return our fake client for integration tests.
@@ -97,6 +175,11 @@ def patch_github_client(monkeypatch):
         fake = FakeGithub()
         # Patch _get_github_client to return the fake client instead of None or real client
         monkeypatch.setattr(gt, "_get_github_client", lambda: fake)
+
+        import repo_navigator.sub_agents.tools.async_github_tools as agt
+
+        fake_async = FakeAsyncGithub()
+        monkeypatch.setattr(agt, "_get_async_client", lambda: fake_async)
     except Exception:
         # If import fails for some reason, tests will continue without patching;
         # this keeps the fixture safe during partial test runs.
@@ -0,0 +1,29 @@
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools
+
+
+# The async tools against the conftest fake GitHub, without a model in the loop.
+@pytest.mark.asyncio
+async def test_async_read_file_content_streams_without_compaction():
+    result = await async_github_tools.read_file_content("octo", "chatbot-backend", "app.py")
+
+    assert result == {"content": (
+        "# app.py\n"
+        "from flask import Flask\n"
+        "app = Flask(__name__)\n"
+        "@app.route('/')\n"
+        "def home():\n    return 'Hello, World!'\n"
+    )}
+
+
+@pytest.mark.asyncio
+async def test_async_read_file_content_window_and_missing_file():
+    window = await async_github_tools.read_file_content(
+        "octo", "yt-channel-crawler", "batch_transcribe_v3.py", start_line=3, end_line=3
+    )
+    missing = await async_github_tools.read_file_content("octo", "yt-channel-crawler", "nope.py")
+
+    assert window["content"] == "def transcribe():\n"
+    assert (window["start_line"], window["end_line"], window["total_lines"]) == (3, 3, 4)
+    assert missing == {"error": "Path 'nope.py' does not exist in 'octo/yt-channel-crawler' on 'main'."}
@@ -1,7 +1,8 @@
 import pytest
-from repo_navigator.sub_agents.architecture_agent import architecture_summarizer_agent, INSTRUCTION_ARCHITECTURE, DESCRIPTION_ARCHITECTURE
+from unittest.mock import MagicMock
+from repo_navigator.sub_agents.architecture_agent import architecture_summarizer_agent, compact_structure_by_default, INSTRUCTION_ARCHITECTURE, DESCRIPTION_ARCHITECTURE
 from repo_navigator.sub_agents.file_summarizer_agent import file_architecture_summarizer_agent
-from repo_navigator.sub_agents.tools.github_tools import get_repo_structure
+from repo_navigator.sub_agents.tools.async_github_tools import get_repo_structure
 from repo_navigator.sub_agents.constants import repo_navigator_model
 from google.adk.tools import AgentTool
 @pytest.fixture
@@ -22,4 +23,19 @@ def test_agent_initialization(expected_agent_config):
     assert architecture_summarizer_agent.description == expected_agent_config["description"]
     assert architecture_summarizer_agent.tools[0] == expected_agent_config["tools"][0]
     assert architecture_summarizer_agent.tools[1].agent == expected_agent_config["tools"][1].agent
-    assert architecture_summarizer_agent.sub_agents == expected_agent_config["sub_agents"]
\ No newline at end of file
+    assert architecture_summarizer_agent.sub_agents == expected_agent_config["sub_agents"]
+
+def test_structure_tool_defaults_to_compact_format():
+    assert architecture_summarizer_agent.before_tool_callback is compact_structure_by_default
+
+    structure_tool, other_tool = MagicMock(), MagicMock()
+    structure_tool.name, other_tool.name = "get_repo_structure", "code_summarizer"
+    args, chosen, other_args = {"max_depth": 2}, {"output_format": "nested"}, {}
+
+    assert compact_structure_by_default(structure_tool, args, None) is None
+    compact_structure_by_default(structure_tool, chosen, None)
+    compact_structure_by_default(other_tool, other_args, None)
+
+    assert args == {"max_depth": 2, "output_format": "compact"}
+    assert chosen == {"output_format": "nested"}
+    assert other_args == {}
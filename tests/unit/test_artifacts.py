@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.artifacts import FileArtifactService
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import ToolContext
+from google.adk.tools._forwarding_artifact_service import ForwardingArtifactService
+
+from repo_navigator.sub_agents.tools import artifacts
+from repo_navigator.sub_agents.tools.artifacts import read_artifact
+from repo_navigator.sub_agents.tools.async_github_tools import get_repo_structure, read_file_content
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+
+BIG = "".join(f"def handler_{i}(request):\n    return {i}\n" for i in range(600)).encode()
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    monkeypatch.setattr(artifacts, "TOOL_RESULT_ARTIFACTS", True)
+    backend = InMemoryBackend()
+    backend.add_commit("owner/big", {"src/app.py": BIG, "README.md": b"# big\n"})
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+def make_context(artifact_service):
+    async def create():
+        service = InMemorySessionService()
+        session = await service.create_session(app_name="app", user_id="u")
+        return InvocationContext(
+            session_service=service,
+            artifact_service=artifact_service,
+            invocation_id="inv",
+            agent=LlmAgent(name="agent"),
+            session=session,
+        )
+    return ToolContext(asyncio.run(create()))
+
+
+def test_large_reads_are_returned_by_reference_and_read_back_in_slices(repo, tmp_path):
+    context = make_context(FileArtifactService(tmp_path))
+
+    async def main():
+        first = await read_file_content("owner", "big", "src/app.py", tool_context=context)
+        again = await read_file_content("owner", "big", "src/app.py", tool_context=context)
+        small = await read_file_content("owner", "big", "README.md", tool_context=context)
+        window = await read_artifact(first["artifact"], start_line=3, end_line=4, tool_context=context)
+        return first, again, small, window, await context.list_artifacts()
+
+    first, again, small, window, stored = asyncio.run(main())
+
+    assert "content" not in first and first["lines"] == 1200
+    assert first["preview"].splitlines()[0] == "def handler_0(request):"
+    assert again["artifact"] == first["artifact"] and stored == [first["artifact"]]
+    assert small == {"content": "# big\n"}
+    assert window["content"] == "def handler_1(request):\n    return 1" and not window["truncated"]
+
+
+def test_artifacts_cross_the_agent_tool_hop(repo, tmp_path):
+    parent = make_context(FileArtifactService(tmp_path))
+    child = make_context(ForwardingArtifactService(parent))  # what AgentTool gives code_summarizer
+
+    async def main():
+        structure = await get_repo_structure("owner", "big", max_depth=0, max_entries=1, tool_context=parent)
+        stored = await read_file_content("owner", "big", "src/app.py", tool_context=child)
+        return structure, stored, await read_artifact(stored["artifact"], tool_context=parent)
+
+    structure, stored, from_parent = asyncio.run(main())
+
+    assert "artifact" not in structure  # small results stay inline
+    assert from_parent["end_line"] == artifacts.ARTIFACT_READ_MAX_LINES and from_parent["truncated"]
+
+
+def test_results_stay_inline_without_an_artifact_service(repo):
+    result = asyncio.run(read_file_content("owner", "big", "src/app.py", tool_context=make_context(None)))
+    assert result["content"] == BIG.decode()
+    assert "error" in asyncio.run(read_artifact("missing.txt", tool_context=make_context(None)))
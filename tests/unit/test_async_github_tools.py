@@ -0,0 +1,400 @@
+import asyncio
+import os
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+from repo_navigator.sub_agents.tools.rate_limit import github_scheduler
+from repo_navigator.sub_agents.tools.async_github_tools import (
+    AsyncGithubClient,
+    find_symbols,
+    get_dependency_graph,
+    get_repo_structure,
+    read_file_content,
+    read_files,
+)
+
+
+class FakeGithubAPI:
+    """httpx.MockTransport handler emulating the handful of endpoints the tools use."""
+
+    def __init__(self, full_name="user/async-repo", truncated=False):
+        self.full_name = full_name
+        self.truncated = truncated
+        self.calls = []
+        self.rate_limited = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls.append(path)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return httpx.Response(403, headers={"X-RateLimit-Remaining": "0"}, json={"message": "rate limit"})
+        if request.headers.get("If-None-Match") == '"etag"':
+            return httpx.Response(304, headers={"ETag": '"etag"'})
+
+        base = f"/repos/{self.full_name}"
+        if path == base:
+            return httpx.Response(200, json={"full_name": self.full_name, "default_branch": "master"})
+        if path == f"{base}/commits/master":
+            return httpx.Response(200, text="sha-1")
+        if path == f"{base}/git/trees/sha-1":
+            return httpx.Response(200, json={"truncated": self.truncated, "tree": [
+                {"path": "README.md", "type": "blob", "size": 3},
+                {"path": "src", "type": "tree"},
+                {"path": "src/app.py", "type": "blob", "size": 9},
+            ]})
+        if path == f"{base}/contents/" and request.url.params.get("ref") == "sha-1":
+            return httpx.Response(200, json=[
+                {"type": "file", "name": "README.md", "path": "README.md", "size": 3},
+                {"type": "dir", "name": "src", "path": "src"},
+            ])
+        if path == f"{base}/contents/src":
+            return httpx.Response(200, json=[{"type": "file", "name": "app.py", "path": "src/app.py", "size": 9}])
+        if path == f"{base}/contents/src/app.py":
+            assert request.headers["Accept"] == async_github_tools.RAW_MEDIA_TYPE
+            return httpx.Response(200, content=b"print(1)\n", headers={"ETag": '"etag"'})
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+@pytest.fixture(autouse=True)
+def fresh_scheduler():
+    github_scheduler.reset()
+    yield
+    github_scheduler.reset()
+
+
+@pytest.fixture
+def fake_api():
+    api = FakeGithubAPI()
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(api))
+    with patch.object(async_github_tools, "_get_async_client", return_value=client):
+        yield api
+
+
+# --------------------------
+# get_repo_structure (async) tests
+# --------------------------
+@pytest.mark.asyncio
+async def test_async_get_repo_structure_from_tree(fake_api):
+    result = await get_repo_structure("user", "async-repo")
+    assert result == {
+        "README.md": {"type": "file", "path": "README.md", "size": 3},
+        "src": {"app.py": {"type": "file", "path": "src/app.py", "size": 9}},
+    }
+
+@pytest.mark.asyncio
+async def test_async_get_repo_structure_walks_truncated_tree(fake_api):
+    fake_api.full_name = "user/async-walk"
+    fake_api.truncated = True
+    result = await get_repo_structure("user", "async-walk", max_depth=1)
+    assert result == {
+        "README.md": {"type": "file", "path": "README.md", "size": 3},
+        "src": {"_truncated": True},
+    }
+
+@pytest.mark.asyncio
+async def test_async_get_repo_structure_pages_from_cached_walk(fake_api):
+    fake_api.full_name = "user/async-paged"
+    fake_api.truncated = True
+
+    first = await get_repo_structure("user", "async-paged", max_entries=2)
+    second = await get_repo_structure("user", "async-paged", max_entries=2, cursor=first["_next_cursor"])
+
+    assert first == {"README.md": {"type": "file", "path": "README.md", "size": 3}, "src": {}, "_next_cursor": first["_next_cursor"]}
+    assert second == {"src": {"app.py": {"type": "file", "path": "src/app.py", "size": 9}}}
+    assert fake_api.calls.count("/repos/user/async-paged/contents/src") == 1
+
+@pytest.mark.asyncio
+async def test_async_get_repo_structure_unknown_ref(fake_api):
+    result = await get_repo_structure("user", "async-repo", branch="nope")
+    assert result["error"] == "Ref 'nope' does not exist in repo 'user/async-repo'."
+
+@pytest.mark.asyncio
+@patch.dict(os.environ, {}, clear=True)
+async def test_async_tools_without_token():
+    result = await read_file_content("user", "repo", "a.py")
+    assert "GitHub client unavailable" in result["error"]["message"]
+
+# --------------------------
+# read_file_content (async) tests
+# --------------------------
+@pytest.mark.asyncio
+async def test_async_read_file_content_memoizes_ref_and_caches(fake_api):
+    fake_api.full_name = "user/async-read"
+    tool_context = MagicMock()
+    tool_context.state = {}
+
+    first = await read_file_content("user", "async-read", "src/app.py", tool_context=tool_context)
+    second = await read_file_content("user", "async-read", "/src/app.py", tool_context=tool_context)
+
+    assert first == second == {"content": "print(1)\n"}
+    assert tool_context.state["resolved_refs"] == {"user/async-read@master": "sha-1"}
+    assert fake_api.calls.count("/repos/user/async-read/commits/master") == 1
+    assert fake_api.calls.count("/repos/user/async-read/contents/src/app.py") == 1
+
+@pytest.mark.asyncio
+async def test_async_read_file_content_missing_path(fake_api):
+    result = await read_file_content("user", "async-repo", "missing.py")
+    assert result["error"] == "Path 'missing.py' does not exist in 'user/async-repo' on 'master'."
+
+@pytest.mark.asyncio
+async def test_async_read_file_content_window_streams_and_caches(fake_api):
+    fake_api.full_name = "user/async-window"
+
+    first = await read_file_content("user", "async-window", "src/app.py", max_bytes=5)
+    second = await read_file_content("user", "async-window", "src/app.py", start_line=1, end_line=1)
+
+    assert first == {"content": "print", "start_line": 1, "end_line": 0, "total_lines": 1, "total_bytes": 9, "truncated": True}
+    assert second["content"] == "print(1)\n" and second["truncated"] is False
+    assert fake_api.calls.count("/repos/user/async-window/contents/src/app.py") == 1
+
+# --------------------------
+# AsyncGithubClient tests
+# --------------------------
+@pytest.mark.asyncio
+async def test_async_client_backs_off_with_asyncio_sleep():
+    api = FakeGithubAPI()
+    api.rate_limited = 2
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(api))
+
+    with patch.object(async_github_tools.asyncio, "sleep", new=AsyncMock()) as sleep:
+        repo = await client.get_repo("user/async-repo")
+
+    assert repo["default_branch"] == "master"
+    assert [c.args[0] for c in sleep.await_args_list] == pytest.approx([1, 2], abs=0.05)
+
+@pytest.mark.asyncio
+async def test_async_client_gives_up_after_max_retries():
+    api = FakeGithubAPI()
+    api.rate_limited = 5
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(api), max_retries=2)
+
+    with patch.object(async_github_tools.asyncio, "sleep", new=AsyncMock()):
+        with pytest.raises(async_github_tools.RateLimitExceededException):
+            await client.get_repo("user/async-repo")
+
+@pytest.mark.asyncio
+async def test_async_client_revalidates_with_etag():
+    api = FakeGithubAPI(full_name="user/etag-repo")
+    client = AsyncGithubClient("etag-token", transport=httpx.MockTransport(api))
+
+    first = await client.get_raw("user/etag-repo", "src/app.py", "sha-1")
+    second = await client.get_raw("user/etag-repo", "src/app.py", "sha-1")
+
+    assert first == second == b"print(1)\n"
+
+@pytest.mark.asyncio
+async def test_async_client_backoff_is_cancellable():
+    api = FakeGithubAPI()
+    api.rate_limited = 10
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(api))
+
+    task = asyncio.create_task(client.get_repo("user/async-repo"))
+    await asyncio.sleep(0.05)  # task is now parked in its 1s backoff sleep
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert len(api.calls) == 1
+
+@pytest.mark.asyncio
+async def test_async_client_replaced_on_token_change_is_closed(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "token-a")
+    first = async_github_tools._get_async_client()
+    assert async_github_tools._get_async_client() is first
+
+    monkeypatch.setenv("GITHUB_TOKEN", "token-b")
+    second = async_github_tools._get_async_client()
+    await asyncio.sleep(0)  # let the background close run
+
+    assert second is not first
+    assert first._http.is_closed and not second._http.is_closed
+    await async_github_tools.aclose_async_clients()
+    assert second._http.is_closed
+
+# --------------------------
+# read_files tests
+# --------------------------
+@pytest.mark.asyncio
+async def test_read_files_returns_per_path_results_in_order(fake_api):
+    fake_api.full_name = "user/batch"
+    result = await read_files("user", "batch", ["src/app.py", "missing.py", "src/app.py"])
+
+    assert [f["path"] for f in result["files"]] == ["src/app.py", "missing.py"]
+    assert result["files"][0] == {"path": "src/app.py", "content": "print(1)\n", "truncated": False}
+    assert "does not exist" in result["files"][1]["error"]
+    assert result["total_bytes"] == 9 and result["truncated"] is False
+
+@pytest.mark.asyncio
+async def test_read_files_enforces_byte_budget(fake_api, monkeypatch):
+    fake_api.full_name = "user/budget"
+    monkeypatch.setattr(async_github_tools, "READ_FILES_MAX_BYTES", 5)
+    result = await read_files("user", "budget", ["src/app.py"])
+
+    assert result["files"][0] == {"path": "src/app.py", "content": "print", "truncated": True}
+    assert result["truncated"] is True
+
+@pytest.mark.asyncio
+async def test_read_files_budget_does_not_split_a_character(monkeypatch):
+    backend = InMemoryBackend()
+    backend.add_commit("user/utf8", {"a.txt": "x€y".encode()})
+    monkeypatch.setattr(async_github_tools, "READ_FILES_MAX_BYTES", 3)
+    register_backend(backend)
+    try:
+        result = await read_files("user", "utf8", ["a.txt"])
+    finally:
+        unregister_backend(backend)
+
+    assert result["files"][0] == {"path": "a.txt", "content": "x", "truncated": True}
+    assert result["total_bytes"] == 1
+
+@pytest.mark.asyncio
+async def test_read_files_bounded_concurrency(monkeypatch):
+    in_flight, peak = 0, 0
+
+    class SlowClient:
+        async def get_repo(self, full_name):
+            return {"full_name": full_name, "default_branch": "main"}
+
+        async def resolve_ref(self, full_name, ref):
+            return "sha-slow"
+
+        async def open_raw(self, full_name, path, ref):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, content=path.encode())
+
+    monkeypatch.setattr(async_github_tools, "_get_async_client", lambda: SlowClient())
+    monkeypatch.setattr(async_github_tools, "READ_FILES_CONCURRENCY", 2)
+    result = await read_files("user", "slow", [f"f{i}.py" for i in range(6)])
+
+    assert peak == 2
+    assert [f["content"] for f in result["files"]] == [f"f{i}.py" for i in range(6)]
+
+@pytest.mark.asyncio
+async def test_read_files_reports_duplicate_paths(fake_api):
+    fake_api.full_name = "user/dupes"
+    result = await read_files("user", "dupes", ["src/app.py", "README.md", "src/app.py", "src/app.py"])
+
+    assert [f["path"] for f in result["files"]] == ["src/app.py", "README.md"]
+    assert result["duplicates"] == ["src/app.py"]
+    assert fake_api.calls.count("/repos/user/dupes/contents/src/app.py") == 1
+
+@pytest.mark.asyncio
+async def test_read_files_stops_reading_once_budget_is_spent(monkeypatch):
+    backend = InMemoryBackend()
+    backend.add_commit("user/spent", {"a.txt": b"0123456789", "b.txt": b"abc", "c.txt": b"def"})
+    sinks = []
+    stream_blob = backend.stream_blob
+
+    def recording_stream_blob(full_name, sha, path, sink):
+        sinks.append((path, sink.__self__))
+        return stream_blob(full_name, sha, path, sink)
+
+    monkeypatch.setattr(backend, "stream_blob", recording_stream_blob)
+    monkeypatch.setattr(async_github_tools, "READ_FILES_MAX_BYTES", 5)
+    monkeypatch.setattr(async_github_tools, "READ_FILES_CONCURRENCY", 1)
+    register_backend(backend)
+    try:
+        result = await read_files("user", "spent", ["a.txt", "b.txt", "c.txt"])
+    finally:
+        unregister_backend(backend)
+
+    assert result["files"] == [
+        {"path": "a.txt", "content": "01234", "truncated": True},
+        {"path": "b.txt", "content": "", "truncated": True},
+        {"path": "c.txt", "content": "", "truncated": True},
+    ]
+    assert result["total_bytes"] == 5
+    # Only the first file was downloaded, through a window holding at most the budget.
+    assert [path for path, _ in sinks] == ["a.txt"]
+    assert sinks[0][1].max_bytes == 5
+
+@pytest.mark.asyncio
+async def test_read_files_caps_each_read_at_the_budget_left(monkeypatch):
+    backend = InMemoryBackend()
+    backend.add_commit("user/left", {"a.txt": b"0123", "b.txt": b"456789", "c.txt": b"x"})
+    monkeypatch.setattr(async_github_tools, "READ_FILES_MAX_BYTES", 6)
+    register_backend(backend)
+    try:
+        result = await read_files("user", "left", ["a.txt", "b.txt", "c.txt"])
+    finally:
+        unregister_backend(backend)
+
+    assert [f["content"] for f in result["files"]] == ["0123", "45", ""]
+    assert [f["truncated"] for f in result["files"]] == [False, True, True]
+    assert result["total_bytes"] == 6
+
+@pytest.mark.asyncio
+async def test_read_files_rejects_empty_and_oversized_batches(monkeypatch):
+    assert "No file paths" in (await read_files("user", "repo", []))["error"]["message"]
+    monkeypatch.setattr(async_github_tools, "READ_FILES_MAX_FILES", 1)
+    assert "Too many files" in (await read_files("user", "repo", ["a", "b"]))["error"]["message"]
+
+@pytest.mark.asyncio
+async def test_async_walk_is_parallel_and_deterministic(monkeypatch):
+    listings = {
+        "": [{"type": "dir", "name": "b", "path": "b"}, {"type": "dir", "name": "a", "path": "a"}],
+        "b": [{"type": "file", "name": "1.py", "path": "b/1.py", "size": 1}],
+        "a": [{"type": "dir", "name": "deep", "path": "a/deep"}],
+        "a/deep": [],
+    }
+    in_flight, peak = 0, 0
+
+    class WalkClient:
+        async def get_repo(self, full_name):
+            return {"full_name": full_name, "default_branch": "main"}
+
+        async def resolve_ref(self, full_name, ref):
+            return "sha-walk"
+
+        async def get_tree(self, full_name, sha):
+            return {"truncated": True, "tree": []}
+
+        async def get_contents(self, full_name, path, ref):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02 if path == "b" else 0.01)
+            in_flight -= 1
+            return listings[path]
+
+    monkeypatch.setattr(async_github_tools, "_get_async_client", lambda: WalkClient())
+    result = await get_repo_structure("user", "walk")
+
+    assert result == {"b": {"1.py": {"type": "file", "path": "b/1.py", "size": 1}}, "a": {"deep": {}}}
+    assert list(result) == ["b", "a"]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_index_tools_write_session_state_on_the_event_loop():
+    class ThreadCheckedState(dict):
+        writers = set()
+
+        def __setitem__(self, key, value):
+            self.writers.add(threading.get_ident())
+            super().__setitem__(key, value)
+
+    backend = InMemoryBackend()
+    backend.add_commit("user/symbols", {"pkg/core.py": b"class Engine:\n    pass\n"})
+    tool_context = MagicMock()
+    tool_context.state = ThreadCheckedState()
+    register_backend(backend)
+    try:
+        symbols = await find_symbols("user", "symbols", query="Engine", tool_context=tool_context)
+        graph = await get_dependency_graph("user", "symbols", path="pkg/core.py", tool_context=tool_context)
+    finally:
+        unregister_backend(backend)
+
+    assert [s["qualname"] for s in symbols["symbols"]] == ["Engine"]
+    assert graph["path"] == "pkg/core.py"
+    assert list(tool_context.state["resolved_refs"]) == ["user/symbols@main"]
+    assert ThreadCheckedState.writers == {threading.get_ident()}
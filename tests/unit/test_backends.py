@@ -0,0 +1,286 @@
+import asyncio
+import os
+import shutil
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools, github_tools
+from repo_navigator.sub_agents.tools.backends import (
+    GitMirrorBackend,
+    InMemoryBackend,
+    ThreadedBackend,
+    close_backends,
+    get_local_backend,
+    register_backend,
+    unregister_backend,
+)
+from repo_navigator.sub_agents.tools.structure import _encode_cursor
+
+FILES = {
+    "README.md": b"# demo\n",
+    "src/app.py": b"print('hi')\n",
+    "src/pkg/core.py": b"X = 1\n",
+}
+
+EXPECTED_ENTRIES = [
+    ("README.md", "blob", 7),
+    ("src", "tree", None),
+    ("src/app.py", "blob", 12),
+    ("src/pkg", "tree", None),
+    ("src/pkg/core.py", "blob", 6),
+]
+EXPECTED_ROOT_LISTING = [("file", "README.md", "README.md", 7), ("dir", "src", "src", None)]
+EXPECTED_SRC_LISTING = [("file", "app.py", "src/app.py", 12), ("dir", "pkg", "src/pkg", None)]
+
+
+def _git(*args, cwd=None):
+    env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com",
+           "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com"}
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True).stdout.decode().strip()
+
+
+@pytest.fixture
+def git_mirror(tmp_path):
+    """A bare mirror at <tmp>/mirrors/owner/repo.git of a two-commit `git init` repo."""
+    if shutil.which("git") is None:
+        pytest.skip("git not installed")
+    work = tmp_path / "work"
+    work.mkdir()
+    _git("init", "-q", "-b", "main", cwd=work)
+    for path, data in FILES.items():
+        (work / path).parent.mkdir(parents=True, exist_ok=True)
+        (work / path).write_bytes(data)
+    _git("add", ".", cwd=work)
+    _git("commit", "-q", "-m", "first", cwd=work)
+    first = _git("rev-parse", "HEAD", cwd=work)
+    (work / "README.md").write_bytes(b"# changed\n")
+    _git("commit", "-q", "-am", "second", cwd=work)
+    _git("tag", "v1", first, cwd=work)
+
+    mirrors = tmp_path / "mirrors"
+    _git("clone", "-q", "--mirror", str(work), str(mirrors / "owner" / "repo.git"))
+    backend = GitMirrorBackend(str(mirrors))
+    yield backend, first, _git("rev-parse", "HEAD", cwd=work)
+    backend.close()
+
+
+@pytest.fixture
+def registered():
+    backends = []
+
+    def register(backend):
+        register_backend(backend)
+        backends.append(backend)
+        return backend
+
+    yield register
+    for backend in backends:
+        unregister_backend(backend)
+
+
+# ---------- InMemoryBackend ----------
+def test_in_memory_backend_tree_blobs_and_refs():
+    backend = InMemoryBackend()
+    sha = backend.add_commit("Owner/Repo", FILES)
+
+    assert backend.handles("owner/repo")
+    assert backend.default_branch("owner/repo") == "main"
+    assert backend.resolve_ref("owner/repo", "main") == sha
+    assert backend.resolve_ref("owner/repo", sha) == sha
+    assert backend.resolve_ref("owner/repo", "nope") is None
+    assert [e[:3] for e in backend.list_tree("owner/repo", sha)] == EXPECTED_ENTRIES
+    assert backend.read_blob("owner/repo", sha, "/src/app.py") == FILES["src/app.py"]
+    assert backend.read_blob("owner/repo", sha, "missing.py") is None
+    assert "not found" in backend.list_tree("owner/repo", "0" * 40)["error"]["message"]
+
+
+def test_in_memory_backend_lists_directories():
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/repo", FILES)
+
+    assert backend.list_dir("owner/repo", sha, "") == EXPECTED_ROOT_LISTING
+    assert backend.list_dir("owner/repo", sha, "/src/") == EXPECTED_SRC_LISTING
+    assert backend.list_dir("owner/repo", sha, "src/app.py") == ("file", "app.py", "src/app.py", 12)
+    assert "does not exist" in backend.list_dir("owner/repo", sha, "nope")["error"]["message"]
+    assert "not found" in backend.list_dir("owner/repo", "0" * 40, "")["error"]["message"]
+
+
+def test_threaded_backend_awaits_the_wrapped_backend():
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/repo", FILES)
+    threaded = ThreadedBackend(backend)
+    chunks = []
+
+    async def run():
+        return (
+            await threaded.default_branch("owner/repo"),
+            await threaded.resolve_ref("owner/repo", "main"),
+            await threaded.list_tree("owner/repo", sha),
+            await threaded.read_blob("owner/repo", sha, "missing.py"),
+            await threaded.stream_blob("owner/repo", sha, "src/app.py", chunks.append),
+        )
+
+    branch, resolved, entries, missing, size = asyncio.run(run())
+
+    assert (branch, resolved, missing, size) == ("main", sha, None, 12)
+    assert [e[:3] for e in entries] == EXPECTED_ENTRIES
+    assert b"".join(chunks) == FILES["src/app.py"]
+
+
+# ---------- GitMirrorBackend ----------
+def test_git_mirror_backend_resolves_refs(git_mirror):
+    backend, first, head = git_mirror
+
+    assert backend.handles("owner/repo")
+    assert not backend.handles("owner/other")
+    assert backend.default_branch("owner/repo") == "main"
+    assert backend.resolve_ref("owner/repo", "main") == head
+    assert backend.resolve_ref("owner/repo", "v1") == first
+    assert backend.resolve_ref("owner/repo", first[:10]) == first
+    assert backend.resolve_ref("owner/repo", "nope") is None
+    assert backend.resolve_ref("owner/repo", "--all") is None
+
+
+def test_git_mirror_backend_lists_tree_parents_first(git_mirror):
+    backend, first, _ = git_mirror
+    entries = backend.list_tree("owner/repo", first)
+    assert [e[:3] for e in entries] == EXPECTED_ENTRIES
+    # Blob ids are git's, so the in-memory backend computes the same ones.
+    memory = InMemoryBackend()
+    in_memory = memory.list_tree("owner/repo", memory.add_commit("owner/repo", FILES))
+    assert [e.sha for e in entries if e.type == "blob"] == [e.sha for e in in_memory if e.type == "blob"]
+    assert "not found" in backend.list_tree("owner/repo", "0" * 40)["error"]["message"]
+    assert "not found" in backend.list_tree("owner/repo", "--all")["error"]["message"]
+
+
+def test_git_mirror_backend_lists_directories(git_mirror):
+    backend, first, _ = git_mirror
+
+    assert backend.list_dir("owner/repo", first, "") == EXPECTED_ROOT_LISTING
+    assert backend.list_dir("owner/repo", first, "/src/") == EXPECTED_SRC_LISTING
+    assert backend.list_dir("owner/repo", first, "src/app.py") == ("file", "app.py", "src/app.py", 12)
+    assert "does not exist" in backend.list_dir("owner/repo", first, "nope")["error"]["message"]
+    assert "not found" in backend.list_dir("owner/repo", "0" * 40, "")["error"]["message"]
+
+
+def test_git_mirror_backend_rejects_names_outside_its_root(git_mirror, tmp_path):
+    backend, _, _ = git_mirror
+    (tmp_path / "outside.git").mkdir()
+    os.symlink(tmp_path, tmp_path / "mirrors" / "linked")
+
+    for full_name in ("../outside", "owner/../../outside", "/abs/repo", "./repo", "linked/outside", "owner/re po"):
+        assert not backend.handles(full_name), full_name
+        with pytest.raises(ValueError):
+            backend._mirror(full_name)
+    assert backend.handles("owner/repo")
+
+
+def test_git_mirror_backend_reads_blobs_through_one_cat_file(git_mirror):
+    backend, first, head = git_mirror
+
+    assert backend.read_blob("owner/repo", first, "README.md") == b"# demo\n"
+    assert backend.read_blob("owner/repo", head, "README.md") == b"# changed\n"
+    assert backend.read_blob("owner/repo", head, "src/pkg/core.py") == b"X = 1\n"
+    assert backend.read_blob("owner/repo", head, "missing.py") is None
+    # Directories are not blobs; the stream must stay in sync afterwards.
+    assert backend.read_blob("owner/repo", head, "src") is None
+    assert backend.read_blob("owner/repo", head, "src/app.py") == b"print('hi')\n"
+    assert len(backend._cat_files) == 1
+
+
+def test_git_mirror_backend_streams_blobs_in_chunks(git_mirror):
+    backend, first, _ = git_mirror
+    chunks = []
+
+    size = backend.stream_blob("owner/repo", first, "src/app.py", chunks.append, chunk_size=4)
+
+    assert size == 12
+    assert chunks == [b"prin", b"t('h", b"i')\n"]
+    assert backend.read_blob("owner/repo", first, "README.md") == b"# demo\n"
+
+
+def test_git_mirror_backend_missing_path_with_spaces(git_mirror):
+    backend, _, head = git_mirror
+
+    assert backend.read_blob("owner/repo", head, "no such.py") is None
+    assert backend.read_blob("owner/repo", head, "src/app.py") == b"print('hi')\n"
+
+
+def test_close_backends_stops_cat_file(git_mirror, registered):
+    backend, _, head = git_mirror
+    registered(backend)
+    backend.read_blob("owner/repo", head, "README.md")
+    (proc, _), = backend._cat_files.values()
+
+    close_backends()
+
+    assert proc.poll() is not None and not backend._cat_files
+    # Closed backends start a new helper on the next read.
+    assert backend.read_blob("owner/repo", head, "README.md") == b"# changed\n"
+
+
+# ---------- tool routing ----------
+def test_structure_cursor_for_unknown_commit_is_an_error(registered):
+    backend = registered(InMemoryBackend())
+    backend.add_commit("owner/repo", FILES)
+    cursor = _encode_cursor({"repo": "owner/repo", "sha": "0" * 40, "module": None, "max_depth": 3, "offset": 10})
+
+    result = github_tools.get_repo_structure("owner", "repo", cursor=cursor)
+
+    assert result["error"]["message"] == f"Commit '{'0' * 40}' not found in 'owner/repo'."
+
+
+def test_registry_prefers_latest_backend_that_handles_repo(registered):
+    older = registered(InMemoryBackend())
+    newer = registered(InMemoryBackend())
+    older.add_commit("owner/repo", FILES)
+
+    assert get_local_backend("owner/repo") is older
+    newer.add_commit("owner/repo", FILES)
+    assert get_local_backend("owner/repo") is newer
+    assert get_local_backend("owner/unknown") is None
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_sync_tools_use_local_backend_without_github(mock_client, registered, git_mirror):
+    backend, first, head = git_mirror
+    registered(backend)
+    tool_context = MagicMock()
+    tool_context.state = {}
+
+    structure = github_tools.get_repo_structure("owner", "repo", max_depth=1, tool_context=tool_context)
+    old = github_tools.read_file_content("owner", "repo", "README.md", branch="v1")
+    window = github_tools.read_file_content("owner", "repo", "src/app.py", start_line=1, max_bytes=5)
+    missing = github_tools.read_file_content("owner", "repo", "nope.md")
+
+    assert structure == {
+        "README.md": {"type": "file", "path": "README.md", "size": 10},
+        "src": {"_truncated": True},
+    }
+    assert tool_context.state["resolved_refs"] == {"owner/repo@main": head}
+    assert old == {"content": "# demo\n"}
+    assert (window["content"], window["truncated"], window["total_bytes"]) == ("print", True, 12)
+    assert missing == {"error": "Path 'nope.md' does not exist in 'owner/repo' on 'main'."}
+    mock_client.assert_not_called()
+
+
+@patch("repo_navigator.sub_agents.tools.async_github_tools._get_async_client")
+def test_async_tools_use_local_backend(mock_client, registered):
+    backend = registered(InMemoryBackend())
+    backend.add_commit("owner/repo", FILES)
+
+    async def run():
+        structure = await async_github_tools.get_repo_structure("owner", "repo", module="src")
+        content = await async_github_tools.read_file_content("owner", "repo", "src/app.py")
+        batch = await async_github_tools.read_files("owner", "repo", ["README.md", "gone.py"])
+        return structure, content, batch
+
+    structure, content, batch = asyncio.run(run())
+
+    assert structure["pkg"] == {"core.py": {"type": "file", "path": "src/pkg/core.py", "size": 6}}
+    assert content == {"content": "print('hi')\n"}
+    assert batch["files"][0] == {"path": "README.md", "content": "# demo\n", "truncated": False}
+    assert "does not exist" in batch["files"][1]["error"]
+    mock_client.assert_not_called()
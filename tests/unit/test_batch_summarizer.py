@@ -0,0 +1,72 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from repo_navigator.sub_agents import batch_summarizer
+from repo_navigator.sub_agents.batch_summarizer import summarize_files
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+
+
+@pytest.fixture
+def repo():
+    backend = InMemoryBackend()
+    backend.add_commit("owner/repo", {"a.py": b"", "b.py": b"", "c.py": b""}, ref="trunk")
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+def fake_summarizer(delays: dict, active: list):
+    """run_async stand-in: sleeps per file and records how many run at once."""
+    async def run_async(*, args, tool_context):
+        path = args["request"].rsplit("/", 1)[-1]
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        try:
+            await asyncio.sleep(delays.get(path, 0))
+        finally:
+            active[0] -= 1
+        if path == "boom.py":
+            raise RuntimeError("model error")
+        return f"File: {path}"
+    return run_async
+
+
+def test_summarize_files_runs_concurrently_in_input_order(repo, monkeypatch):
+    monkeypatch.setattr(batch_summarizer, "SUMMARIZE_FILES_CONCURRENCY", 2)
+    active = [0, 0]
+    with patch.object(batch_summarizer.code_summarizer_tool, "run_async",
+                      side_effect=fake_summarizer({"a.py": 0.05, "b.py": 0.01, "c.py": 0.0}, active)) as run:
+        result = asyncio.run(summarize_files("owner", "repo", "what is the flow", ["/a.py", "b.py", "c.py", "a.py"],
+                                             tool_context=MagicMock()))
+
+    assert result["summaries"] == [
+        {"path": "a.py", "summary": "File: a.py"},
+        {"path": "b.py", "summary": "File: b.py"},
+        {"path": "c.py", "summary": "File: c.py"},
+    ]
+    assert active[1] == 2
+    assert run.call_args_list[0].kwargs["args"] == {
+        "request": "what is the flow for owner:owner repo:repo githuburl:https://github.com/owner/repo/blob/trunk/a.py"
+    }
+
+
+def test_summarize_files_isolates_slow_and_failing_files(repo, monkeypatch):
+    monkeypatch.setattr(batch_summarizer, "SUMMARIZE_FILE_TIMEOUT", 0.05)
+    with patch.object(batch_summarizer.code_summarizer_tool, "run_async",
+                      side_effect=fake_summarizer({"slow.py": 5}, [0, 0])):
+        result = asyncio.run(summarize_files("owner", "repo", "q", ["slow.py", "boom.py", "a.py"], branch="dev"))
+
+    assert result["summaries"] == [
+        {"path": "slow.py", "error": "Summary timed out after 0.05s."},
+        {"path": "boom.py", "error": "Summary failed."},
+        {"path": "a.py", "summary": "File: a.py"},
+    ]
+    assert result["seconds"] < 1
+
+
+def test_summarize_files_validates_paths(repo):
+    assert "at least one" in asyncio.run(summarize_files("owner", "repo", "q", ["/"]))["error"]["message"]
+    too_many = [f"f{i}.py" for i in range(batch_summarizer.SUMMARIZE_FILES_MAX + 1)]
+    assert "narrow the scope" in asyncio.run(summarize_files("owner", "repo", "q", too_many))["error"]["message"]
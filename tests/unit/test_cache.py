@@ -0,0 +1,102 @@
+import threading
+from repo_navigator.sub_agents.tools.cache import ContentCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# --------------------------
+# TTLCache tests
+# --------------------------
+def test_ttl_cache_get_set_and_expiry():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_ttl_cache_get_or_create_calls_factory_once():
+    cache = TTLCache(ttl=10)
+    calls = []
+    factory = lambda: calls.append(1) or "handle"
+
+    assert cache.get_or_create("k", factory) == "handle"
+    assert cache.get_or_create("k", factory) == "handle"
+    assert len(calls) == 1
+
+def test_ttl_cache_bounded_entries():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, max_entries=2, clock=clock)
+    cache.set("a", 1)
+    clock.now = 1
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
+
+def test_ttl_cache_concurrent_access():
+    cache = TTLCache(ttl=10, max_entries=50)
+
+    def worker(n):
+        for i in range(200):
+            cache.set((n, i % 60), i)
+            cache.get((n, i % 60))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache) <= 50
+
+# --------------------------
+# ContentCache tests
+# --------------------------
+def test_content_cache_memory_lru_evicts_by_bytes():
+    cache = ContentCache(max_memory_bytes=10)
+    cache.put(("file", "o/r", "sha", "a"), b"12345")
+    cache.put(("file", "o/r", "sha", "b"), b"12345")
+    assert cache.get(("file", "o/r", "sha", "a")) == b"12345"  # a is now most recent
+
+    cache.put(("file", "o/r", "sha", "c"), b"123")
+    assert cache.get(("file", "o/r", "sha", "b")) is None
+    stats = cache.stats()
+    assert stats["memory_bytes"] == 8
+    assert stats["evictions"] == 1
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+
+def test_content_cache_skips_values_larger_than_tier():
+    cache = ContentCache(max_memory_bytes=4)
+    cache.put(("k",), b"too large")
+    assert cache.get(("k",)) is None
+    assert cache.stats()["memory_bytes"] == 0
+
+def test_content_cache_disk_tier_persists(tmp_path):
+    db = tmp_path / "content.sqlite3"
+    first = ContentCache(max_memory_bytes=100, disk_path=str(db), max_disk_bytes=100)
+    first.put(("file", "o/r", "sha", "a.py"), b"print(1)")
+
+    second = ContentCache(max_memory_bytes=100, disk_path=str(db), max_disk_bytes=100)
+    assert second.get(("file", "o/r", "sha", "a.py")) == b"print(1)"
+    assert second.get(("file", "o/r", "sha", "a.py")) == b"print(1)"
+    stats = second.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["disk_bytes"] == len(b"print(1)")
+
+def test_content_cache_disk_tier_evicts_by_bytes(tmp_path):
+    cache = ContentCache(max_memory_bytes=0, disk_path=str(tmp_path / "c.db"), max_disk_bytes=10)
+    cache.put(("a",), b"123456")
+    cache.put(("b",), b"123456")
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) == b"123456"
+    assert cache.stats()["disk_evictions"] == 1
+    assert cache.stats()["disk_bytes"] == 6
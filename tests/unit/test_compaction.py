@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools, compaction, github_tools
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+from repo_navigator.sub_agents.tools.compaction import compact_source
+
+PYTHON = b'''#!/usr/bin/env python
+# Copyright 2024 Example Corp.
+# Licensed under the Apache License, Version 2.0
+
+"""Module docstring."""
+import os  # needed
+
+
+class Service:
+    """Doc."""
+
+    # a comment
+    def handle(self, request):
+        """Handle a request."""
+        data = request.read()  # body
+
+
+        return data
+
+    def ping(self): return "pong"
+
+
+def hook():
+    """Only a docstring."""
+
+
+# BEGIN GENERATED
+TABLE = [1, 2, 3]
+# END GENERATED
+URL = "https://example.com/#anchor"
+'''
+
+
+def compact(mode, data=PYTHON, path="service.py"):
+    out, stats = compact_source(path, data, mode)
+    return out.decode(), stats
+
+
+def test_headers_mode_elides_license_and_generated_code_only():
+    text, stats = compact("headers")
+
+    assert text.startswith("#!/usr/bin/env python\n[2 lines elided: license header]\n")
+    assert "[3 lines elided: generated code]" in text
+    assert "# a comment" in text and '"""Doc."""' in text
+    assert "\n\n\n" not in text  # blank runs collapsed
+    assert stats["mode"] == "headers"
+
+
+def test_comments_mode_drops_comments_and_docstrings_with_tokenizer_and_ast():
+    text, stats = compact("comments")
+
+    assert text == (
+        "#!/usr/bin/env python\n"
+        "[2 lines elided: license header]\n"
+        "\n"
+        "import os\n"
+        "\n"
+        "class Service:\n"
+        "\n"
+        "    def handle(self, request):\n"
+        "        data = request.read()\n"
+        "\n"
+        "        return data\n"
+        "\n"
+        '    def ping(self): return "pong"\n'
+        "\n"
+        "def hook():\n"
+        "    ...\n"
+        "\n"
+        "[3 lines elided: generated code]\n"
+        'URL = "https://example.com/#anchor"\n'
+    )
+    assert stats == {
+        "mode": "comments",
+        "original_bytes": len(PYTHON),
+        "compacted_bytes": len(text),
+        "compression_ratio": round(len(PYTHON) / len(text), 2),
+    }
+
+
+def test_signatures_mode_collapses_function_bodies():
+    text, stats = compact("signatures")
+
+    assert "    def handle(self, request):\n        ...\n" in text
+    assert 'def ping(self): return "pong"' in text  # one-liners stay
+    assert "request.read" not in text
+    assert stats["mode"] == "signatures" and stats["compression_ratio"] > 1.5
+
+
+def test_c_style_comments_respect_strings_and_fall_back_from_signatures():
+    source = b'/* SPDX-License-Identifier: MIT */\nconst url = "http://x.com"; // trailing\n/* block\n   comment */\nrun(url);\n'
+    text, stats = compact("signatures", source, "app.ts")
+
+    assert text == '[1 line elided: license header]\nconst url = "http://x.com";\nrun(url);\n'
+    assert stats["mode"] == "comments"
+
+
+def test_generated_files_and_unparsable_python():
+    text, _ = compact("headers", b"// Code generated by protoc. DO NOT EDIT.\n" + b"x\n" * 100, "api.pb.go")
+    assert text == "// Code generated by protoc. DO NOT EDIT.\n[100 lines elided: generated file]\n"
+
+    text, stats = compact("comments", b"# note\ndef broken(:\n", "bad.py")
+    assert text == "def broken(:\n" and stats["mode"] == "comments"
+
+
+# ---------- tools ----------
+@pytest.fixture
+def repo():
+    backend = InMemoryBackend()
+    backend.add_commit("owner/compact", {"service.py": PYTHON, "README.md": b"# Title\n"})
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+def test_read_file_content_compacts_then_windows(repo):
+    result = github_tools.read_file_content("owner", "compact", "service.py", compact="signatures", end_line=6)
+
+    assert result["content"] == "#!/usr/bin/env python\n[2 lines elided: license header]\n\nimport os\n\nclass Service:\n"
+    assert result["compaction"]["mode"] == "signatures"
+    assert result["total_bytes"] == result["compaction"]["compacted_bytes"]
+    assert "Unknown compact mode" in github_tools.read_file_content("owner", "compact", "a.py", compact="x")["error"]["message"]
+    assert github_tools.read_file_content("owner", "compact", "README.md", compact="none") == {"content": "# Title\n"}
+
+
+def test_read_file_content_streams_files_too_large_to_compact(repo, monkeypatch):
+    monkeypatch.setattr(compaction, "COMPACT_MAX_BYTES", 64)
+    expected = {
+        "content": PYTHON[:40].decode(), "start_line": 1, "end_line": 1, "total_lines": PYTHON.count(b"\n"),
+        "total_bytes": len(PYTHON), "truncated": True,
+        "compaction": {"mode": "none", "original_bytes": len(PYTHON), "skipped": "larger than 64 bytes"},
+    }
+
+    assert github_tools.read_file_content("owner", "compact", "service.py", compact="comments", max_bytes=40) == expected
+    assert asyncio.run(async_github_tools.read_file_content(
+        "owner", "compact", "service.py", compact="comments", max_bytes=40)) == expected
+
+
+def test_read_files_compacts_before_spending_budget(repo):
+    result = asyncio.run(async_github_tools.read_files("owner", "compact", ["service.py", "gone.py"], compact="comments"))
+
+    assert result["files"][0]["content"] == compact("comments")[0]
+    assert result["files"][0]["compaction"]["original_bytes"] == len(PYTHON)
+    assert "does not exist" in result["files"][1]["error"]
@@ -0,0 +1,146 @@
+import tracemalloc
+
+import pytest
+
+from repo_navigator.sub_agents.tools import dependency_graph, github_tools
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+from repo_navigator.sub_agents.tools.cache import ContentCache
+from repo_navigator.sub_agents.tools.dependency_graph import build_dependency_graph, reachable
+
+FILES = {
+    "src/shop/__init__.py": b"",
+    "src/shop/__main__.py": b"from .cli import main\nmain()\n",
+    "src/shop/cli.py": b"import argparse\nimport click\nfrom shop.api import app\n\ndef main():\n    pass\n",
+    "src/shop/api.py": b"from fastapi import FastAPI\nfrom . import db\n\napp = FastAPI()\n",
+    "src/shop/db.py": b"import sqlalchemy.orm\nfrom .models import Order\n",
+    "src/shop/models.py": b"class Order:\n    pass\n",
+    "scripts/seed.py": b"from shop.db import *\n\nif __name__ == '__main__':\n    pass\n",
+    "pyproject.toml": b'[project]\nname = "shop"\n\n[project.scripts]\nshop = "shop.cli:main"\n',
+    "Makefile": b".PHONY: run\nVAR := 1\n\nrun:\n\t@python -m shop\n\ntest:\n\tpytest\n",
+    "docker/Dockerfile": b"FROM python:3.13\nCMD [\"uvicorn\", \"shop.api:app\"]\n",
+}
+
+
+@pytest.fixture
+def cache():
+    return ContentCache(max_memory_bytes=10 * 1024 * 1024)
+
+
+@pytest.fixture
+def graph(cache):
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/shop", FILES)
+    return build_dependency_graph(backend, "owner/shop", sha, cache)
+
+
+def test_graph_resolves_absolute_relative_and_src_layout_imports(graph):
+    modules = graph["modules"]
+
+    assert modules["src/shop/cli.py"] == {"imports": ["src/shop/api.py"], "external": ["click"]}
+    assert modules["src/shop/api.py"] == {
+        "imports": ["src/shop/__init__.py", "src/shop/db.py"], "external": ["fastapi"],
+    }
+    assert modules["src/shop/db.py"] == {"imports": ["src/shop/models.py"], "external": ["sqlalchemy"]}
+    assert modules["scripts/seed.py"]["imports"] == ["src/shop/db.py"]
+    assert [r["path"] for r in reachable(graph, "src/shop/cli.py", 3)] == [
+        "src/shop/api.py", "src/shop/__init__.py", "src/shop/db.py", "src/shop/models.py",
+    ]
+
+
+def test_graph_detects_entry_points(graph):
+    found = {(e["kind"], e["path"]): e for e in graph["entry_points"]}
+
+    assert set(found) == {
+        ("main_module", "src/shop/__main__.py"),
+        ("main_guard", "scripts/seed.py"),
+        ("app_object", "src/shop/api.py"),
+        ("console_script", "src/shop/cli.py"),
+        ("make_target", "Makefile"),
+        ("docker", "docker/Dockerfile"),
+    }
+    assert found[("app_object", "src/shop/api.py")]["detail"] == "app = FastAPI(...)"
+    assert found[("console_script", "src/shop/cli.py")]["reaches"] == 4
+    assert [e["detail"] for e in graph["entry_points"] if e["kind"] == "make_target"] == [
+        "run: python -m shop", "test: pytest",
+    ]
+    assert graph["stats"]["files"] == 7 and graph["stats"]["edges"] == 6
+    assert graph["stats"]["graph_bytes"] > 0
+
+
+def test_graph_is_cached_per_commit(cache):
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/shop", FILES)
+
+    built = build_dependency_graph(backend, "owner/shop", sha, cache)
+    backend.read_blob = None  # a cached graph reads nothing
+    assert build_dependency_graph(backend, "owner/shop", sha, cache) == built
+    assert built["stats"]["max_rss_growth_bytes"] >= 0 and built["stats"]["failed_reads"] == 0
+    assert "peak_memory_bytes" not in built["stats"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_graph_build_traces_memory_only_when_enabled(cache, monkeypatch):
+    monkeypatch.setattr(dependency_graph, "DEPENDENCY_GRAPH_TRACE_MEMORY", True)
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/shop", FILES)
+
+    graph = build_dependency_graph(backend, "owner/shop", sha, cache)
+    assert graph["stats"]["peak_memory_bytes"] > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_graph_from_partial_index_is_not_cached(cache):
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/shop", FILES)
+    read_blob = backend.read_blob
+    backend.read_blob = lambda full_name, sha, path: (
+        {"error": {"message": "Rate limited"}} if path == "Makefile" else read_blob(full_name, sha, path)
+    )
+
+    partial = build_dependency_graph(backend, "owner/shop", sha, cache)
+    backend.read_blob = read_blob
+    rebuilt = build_dependency_graph(backend, "owner/shop", sha, cache)
+
+    assert partial["stats"]["failed_reads"] == 1
+    assert not any(e["kind"] == "make_target" for e in partial["entry_points"])
+    assert rebuilt["stats"]["failed_reads"] == 0
+    assert any(e["kind"] == "make_target" for e in rebuilt["entry_points"])
+
+
+# ---------- get_dependency_graph tool ----------
+@pytest.fixture
+def shop_repo():
+    backend = InMemoryBackend()
+    backend.add_commit("owner/shop", FILES)
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+def test_tool_overview_ranks_entry_points_by_reach(shop_repo):
+    overview = github_tools.get_dependency_graph("owner", "shop", max_results=3)
+
+    assert [(e["kind"], e["path"]) for e in overview["entry_points"]] == [
+        ("main_module", "src/shop/__main__.py"),
+        ("console_script", "src/shop/cli.py"),
+        ("app_object", "src/shop/api.py"),
+    ]
+    assert overview["central_modules"][0] == {"path": "src/shop/db.py", "imported_by": 2}
+    assert {"name": "fastapi", "files": 1} in overview["external_packages"]
+
+
+def test_tool_path_neighbourhood(shop_repo):
+    direct = github_tools.get_dependency_graph("owner", "shop", path="/src/shop/db.py")
+    deep = github_tools.get_dependency_graph("owner", "shop", path="src/shop/cli.py", depth=2, max_results=2)
+
+    assert direct == {
+        "path": "src/shop/db.py",
+        "imports": ["src/shop/models.py"],
+        "imported_by": ["scripts/seed.py", "src/shop/api.py"],
+        "external": ["sqlalchemy"],
+        "truncated": False,
+    }
+    assert deep["reachable"] == [{"path": "src/shop/api.py", "depth": 1}, {"path": "src/shop/__init__.py", "depth": 2}]
+    assert deep["truncated"] is True
+    assert "not an indexed source file" in github_tools.get_dependency_graph("owner", "shop", path="Makefile")["error"]["message"]
+    assert "depth" in github_tools.get_dependency_graph("owner", "shop", depth=0)["error"]["message"]
@@ -1,6 +1,8 @@
 import pytest
-from repo_navigator.sub_agents.file_summarizer_agent import file_architecture_summarizer_agent, INSTRUCTION_FILE_SUMMARIZER, DESCRIPTION_FILE_SUMMARIZER
-from repo_navigator.sub_agents.tools.github_tools import read_file_content
+from unittest.mock import MagicMock
+from repo_navigator.sub_agents.file_summarizer_agent import file_architecture_summarizer_agent, compact_reads_by_default, INSTRUCTION_FILE_SUMMARIZER, DESCRIPTION_FILE_SUMMARIZER
+from repo_navigator.sub_agents.tools.artifacts import read_artifact
+from repo_navigator.sub_agents.tools.async_github_tools import read_file_content, read_files
 from repo_navigator.sub_agents.constants import repo_navigator_model
 
 @pytest.fixture
@@ -10,7 +12,7 @@ def expected_agent_config():
         "model": repo_navigator_model,
         "instruction": INSTRUCTION_FILE_SUMMARIZER,
         "description": DESCRIPTION_FILE_SUMMARIZER,
-        "tools": [read_file_content],
+        "tools": [read_file_content, read_files, read_artifact],
         "sub_agents": []
     }
 
@@ -20,4 +22,18 @@ def test_agent_initialization(expected_agent_config):
     assert file_architecture_summarizer_agent.instruction == expected_agent_config["instruction"]
     assert file_architecture_summarizer_agent.description == expected_agent_config["description"]
     assert file_architecture_summarizer_agent.tools == expected_agent_config["tools"]
-    assert file_architecture_summarizer_agent.sub_agents == expected_agent_config["sub_agents"]
\ No newline at end of file
+    assert file_architecture_summarizer_agent.sub_agents == expected_agent_config["sub_agents"]
+
+def test_file_reads_default_to_comment_compaction():
+    assert file_architecture_summarizer_agent.before_tool_callback is compact_reads_by_default
+    read_tool, other_tool = MagicMock(), MagicMock()
+    read_tool.name, other_tool.name = "read_files", "other"
+    args, chosen, other_args = {"paths": ["a.py"]}, {"compact": "none"}, {}
+
+    compact_reads_by_default(read_tool, args, None)
+    compact_reads_by_default(read_tool, chosen, None)
+    compact_reads_by_default(other_tool, other_args, None)
+
+    assert args == {"paths": ["a.py"], "compact": "comments"}
+    assert chosen == {"compact": "none"}
+    assert other_args == {}
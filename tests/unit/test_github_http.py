@@ -0,0 +1,111 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from github import Github
+
+from repo_navigator.sub_agents.tools.github_http import (
+    ConditionalRequestAdapter,
+    ETagStore,
+    PooledHTTPSConnection,
+    install_pooled_connection,
+)
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        ETagHandler.hits.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("X-RateLimit-Remaining", "41")
+            self.end_headers()
+            return
+        body = b'{"name": "README.md"}'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("X-RateLimit-Remaining", "42")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    ETagHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+# --------------------------
+# ConditionalRequestAdapter tests
+# --------------------------
+def test_conditional_adapter_replays_body_on_304(etag_server):
+    store = ETagStore(max_bytes=1024)
+    session = requests.Session()
+    session.mount("http://", ConditionalRequestAdapter(store))
+
+    first = session.get(f"{etag_server}/repos/o/r/contents/README.md")
+    second = session.get(f"{etag_server}/repos/o/r/contents/README.md")
+
+    assert ETagHandler.hits == [None, '"v1"']
+    assert first.status_code == second.status_code == 200
+    assert second.json() == {"name": "README.md"}
+    # Fresh rate-limit headers from the 304 win over the cached ones.
+    assert second.headers["X-RateLimit-Remaining"] == "41"
+    assert store.stats()["not_modified"] == 1
+
+def test_conditional_adapter_keys_on_credentials(etag_server):
+    store = ETagStore(max_bytes=1024)
+    session = requests.Session()
+    session.mount("http://", ConditionalRequestAdapter(store))
+
+    session.get(f"{etag_server}/x", headers={"Authorization": "token a"})
+    session.get(f"{etag_server}/x", headers={"Authorization": "token b"})
+
+    assert ETagHandler.hits == [None, None]
+
+def test_etag_store_evicts_by_bytes():
+    store = ETagStore(max_bytes=10)
+    store.put(("a",), '"1"', {}, b"123456")
+    store.put(("b",), '"2"', {}, b"123456")
+    assert store.get(("a",)) is None
+    assert store.get(("b",))[0] == '"2"'
+    assert store.stats()["bytes"] == 6
+
+# --------------------------
+# PooledHTTPSConnection tests
+# --------------------------
+def test_install_pooled_connection_swaps_connection_class():
+    client = Github("dummy-token", pool_size=4)
+    store = ETagStore(max_bytes=1024)
+    install_pooled_connection(client, store)
+
+    connection_class = client.requester._Requester__connectionClass
+    assert issubclass(connection_class, PooledHTTPSConnection)
+
+    cnx = connection_class("api.github.com", pool_size=4)
+    assert isinstance(cnx.adapter, ConditionalRequestAdapter)
+    assert cnx.adapter.etag_store is store
+    assert cnx.session.get_adapter("https://api.github.com/") is cnx.adapter
+
+def test_pooled_connection_keeps_request_args_thread_local():
+    cnx = PooledHTTPSConnection("api.github.com")
+    cnx.request("GET", "/main-thread", None, {})
+
+    other = threading.Thread(target=cnx.request, args=("GET", "/other-thread", None, {}))
+    other.start()
+    other.join()
+
+    assert cnx._local.args[1] == "/main-thread"
@@ -1,4 +1,7 @@
+import json
 import os
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock, patch
 from github import GithubException
@@ -7,8 +10,11 @@ from repo_navigator.sub_agents.tools.github_tools import (
     extract_owner_and_repo,
     get_repo_structure,
     read_file_content, 
-    _get_github_client
+    _get_github_client,
+    _get_repo,
 )
+import repo_navigator.sub_agents.tools.github_tools as github_tools
+from repo_navigator.sub_agents.tools.structure import format_compact
 
 # --------------------------
 # extract_owner_and_repo tests
@@ -46,6 +52,7 @@ def test_extract_owner_and_repo_exception():
 @patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
 def test_get_repo_structure_mocked(client_mock):
     mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
     mock_repo.get_contents.return_value = []
     client_mock.return_value.get_repo.return_value = mock_repo
 
@@ -55,6 +62,7 @@ def test_get_repo_structure_mocked(client_mock):
 @patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
 def test_get_repo_structure_module_missing(client_mock):
     mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
     mock_repo.get_contents.return_value = {"error": "not found"}
     client_mock.return_value.get_repo.return_value = mock_repo
 
@@ -64,6 +72,7 @@ def test_get_repo_structure_module_missing(client_mock):
 @patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
 def test_get_repo_structure_safe_get_contents_error(client_mock):
     mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
     mock_repo.get_contents.side_effect = [{"error": "failed"}]
     client_mock.return_value.get_repo.return_value = mock_repo
 
@@ -85,6 +94,7 @@ def test_get_repo_structure_duck_typing_file(client_mock):
     mock_file.size = 123
 
     mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
     mock_repo.get_contents.return_value = mock_file
     client_mock.return_value.get_repo.return_value = mock_repo
 
@@ -119,8 +129,9 @@ def test_get_repo_structure_handles_files_and_dirs(mock_safe_get, mock_client):
         []                      # second call (inside src)
     ]
 
-    # Mock GitHub repo client
+    # Mock GitHub repo client (recursive tree truncated → directory walk)
     mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
     mock_client.return_value.get_repo.return_value = mock_repo
 
     result = get_repo_structure("user", "repo")
@@ -135,6 +146,247 @@ def test_get_repo_structure_handles_files_and_dirs(mock_safe_get, mock_client):
     assert "src" in result
     assert result["src"] == {}  # inside src is empty
 
+# --------------------------
+# recursive tree (Git Trees API) tests
+# --------------------------
+def _tree_entry(path, type_="blob", size=10):
+    entry = MagicMock()
+    entry.path = path
+    entry.type = type_
+    entry.size = size if type_ == "blob" else None
+    entry.sha = f"sha-{path}"
+    return entry
+
+
+def _tree_repo(entries, truncated=False):
+    mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = truncated
+    mock_repo.get_git_tree.return_value.tree = entries
+    return mock_repo
+
+
+TREE_ENTRIES = [
+    _tree_entry("README.md", size=5),
+    _tree_entry("src", "tree"),
+    _tree_entry("src/app.py", size=42),
+    _tree_entry("src/pkg", "tree"),
+    _tree_entry("src/pkg/core.py", size=7),
+    _tree_entry("src/pkg/deep", "tree"),
+    _tree_entry("src/pkg/deep/x.py", size=1),
+]
+
+
+TREE_ENTRIES_README = {"type": "file", "path": "README.md", "size": 5}
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_from_recursive_tree(client_mock):
+    mock_repo = _tree_repo(TREE_ENTRIES)
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = get_repo_structure("user", "repo", max_depth=2)
+
+    assert result == {
+        "README.md": {"type": "file", "path": "README.md", "size": 5},
+        "src": {
+            "app.py": {"type": "file", "path": "src/app.py", "size": 42},
+            "pkg": {"_truncated": True},
+        },
+    }
+    mock_repo.get_git_tree.assert_called_once_with(mock_repo.get_commit.return_value.sha, recursive=True)
+    mock_repo.get_contents.assert_not_called()
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_tree_module_subtree(client_mock):
+    client_mock.return_value.get_repo.return_value = _tree_repo(TREE_ENTRIES)
+
+    result = get_repo_structure("user", "repo", module="src/pkg/")
+
+    assert result == {
+        "core.py": {"type": "file", "path": "src/pkg/core.py", "size": 7},
+        "deep": {"x.py": {"type": "file", "path": "src/pkg/deep/x.py", "size": 1}},
+    }
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_tree_module_file_and_missing(client_mock):
+    client_mock.return_value.get_repo.return_value = _tree_repo(TREE_ENTRIES)
+
+    result = get_repo_structure("user", "repo", module="src/app.py")
+    assert result == {"app.py": {"type": "file", "path": "src/app.py", "size": 42}}
+
+    missing = get_repo_structure("user", "repo", module="nope")
+    assert "does not exist" in missing["error"]["message"]
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_tree_truncated_falls_back_to_walk(client_mock):
+    mock_repo = _tree_repo([], truncated=True)
+    mock_repo.get_contents.return_value = []
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    assert get_repo_structure("user", "repo") == {}
+    # The walk is pinned to the resolved commit rather than the moving branch.
+    mock_repo.get_contents.assert_called_once_with("", ref=mock_repo.get_commit.return_value.sha)
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_tree_unknown_ref(client_mock):
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/repo"
+    mock_repo.get_commit.side_effect = GithubException(404, "Not Found", None)
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = get_repo_structure("user", "repo", branch="nope")
+    assert "Ref 'nope' does not exist" in result["error"]
+
+# --------------------------
+# ref resolution tests
+# --------------------------
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_ref_resolved_once_per_session_with_default_branch(client_mock):
+    mock_file = MagicMock()
+    mock_file.decoded_content = b"x"
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/memo"
+    mock_repo.default_branch = "master"
+    mock_repo.get_commit.return_value.sha = "sha-master"
+    mock_repo.get_contents.return_value = mock_file
+    client_mock.return_value.get_repo.return_value = mock_repo
+    tool_context = MagicMock()
+    tool_context.state = {}
+
+    read_file_content("user", "memo", "a.py", tool_context=tool_context)
+    read_file_content("user", "memo", "b.py", tool_context=tool_context)
+
+    mock_repo.get_commit.assert_called_once_with("master")
+    assert tool_context.state["resolved_refs"] == {"user/memo@master": "sha-master"}
+    mock_repo.get_contents.assert_called_with("b.py", ref="sha-master")
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_read_file_content_unknown_ref(client_mock):
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/repo"
+    mock_repo.get_commit.side_effect = GithubException(404, "Not Found", None)
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = read_file_content("user", "repo", "a.py", branch="gone")
+    assert result["error"] == "Ref 'gone' does not exist in repo 'user/repo'."
+    mock_repo.get_contents.assert_not_called()
+
+# --------------------------
+# parallel directory walk tests
+# --------------------------
+def _item(type_, path, size=1):
+    item = MagicMock()
+    item.type = type_
+    item.name = path.rsplit("/", 1)[-1]
+    item.path = path
+    item.size = size
+    return item
+
+
+WALK_LISTINGS = {
+    "": [_item("dir", "b"), _item("dir", "a"), _item("file", "z.txt")],
+    "b": [_item("file", "b/1.py"), _item("dir", "b/inner")],
+    "a": [_item("dir", "a/deep"), _item("file", "a/2.py")],
+    "b/inner": [_item("file", "b/inner/x.py")],
+    "a/deep": [_item("dir", "a/deep/deeper")],
+}
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_parallel_walk_is_deterministic(client_mock):
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def get_contents(path, ref=None):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        # Earlier siblings answer last, so completion order differs from listing order.
+        time.sleep(0.05 if path == "b" else 0.01)
+        with lock:
+            in_flight -= 1
+        return WALK_LISTINGS[path]
+
+    mock_repo = MagicMock()
+    mock_repo.get_git_tree.return_value.truncated = True
+    mock_repo.get_contents.side_effect = get_contents
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = get_repo_structure("user", "repo", max_depth=3)
+
+    assert result == {
+        "b": {
+            "1.py": {"type": "file", "path": "b/1.py", "size": 1},
+            "inner": {"x.py": {"type": "file", "path": "b/inner/x.py", "size": 1}},
+        },
+        "a": {
+            "deep": {"deeper": {"_truncated": True}},
+            "2.py": {"type": "file", "path": "a/2.py", "size": 1},
+        },
+        "z.txt": {"type": "file", "path": "z.txt", "size": 1},
+    }
+    assert list(result) == ["b", "a", "z.txt"]
+    assert list(result["a"]) == ["deep", "2.py"]
+    assert peak >= 2
+    assert mock_repo.get_contents.call_count == 5
+
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_parallel_walk_keeps_subdir_errors(client_mock):
+    def get_contents(path, ref=None):
+        if path == "a":
+            raise GithubException(404, "Not Found", None)
+        return WALK_LISTINGS[path]
+
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/repo"
+    mock_repo.get_git_tree.return_value.truncated = True
+    mock_repo.get_contents.side_effect = get_contents
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = get_repo_structure("user", "repo", max_depth=2)
+
+    assert "does not exist" in result["a"]["_error"]
+    assert result["b"]["inner"] == {"_truncated": True}
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_walk_with_error_directory_pages_and_caches(client_mock):
+    listings = {
+        "": [_item("dir", "error"), _item("file", "a.py"), _item("file", "b.py")],
+        "error": [_item("file", "error/handlers.py"), _item("file", "error/codes.py")],
+    }
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/error-dir"
+    mock_repo.get_commit.return_value.sha = "sha-error-dir"
+    mock_repo.get_git_tree.return_value.truncated = True
+    mock_repo.get_contents.side_effect = lambda path, ref=None: listings[path]
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    first = get_repo_structure("user", "error-dir", max_entries=3)
+    second = get_repo_structure("user", "error-dir", max_entries=3, cursor=first["_next_cursor"])
+    compact = get_repo_structure("user", "error-dir", output_format="compact")
+
+    # A directory named "error" is an ordinary directory, not a failed listing.
+    assert first == {
+        "error": {
+            "handlers.py": {"type": "file", "path": "error/handlers.py", "size": 1},
+            "codes.py": {"type": "file", "path": "error/codes.py", "size": 1},
+        },
+        "_next_cursor": first["_next_cursor"],
+    }
+    assert second == {
+        "a.py": {"type": "file", "path": "a.py", "size": 1},
+        "b.py": {"type": "file", "path": "b.py", "size": 1},
+    }
+    assert compact["tree"] == "error/\n handlers.py 1\n codes.py 1\na.py 1\nb.py 1"
+    # The walk was cached, so the later pages listed nothing again.
+    assert mock_repo.get_contents.call_count == 2
+
 # --------------------------
 # read_file_content tests
 # --------------------------
@@ -163,6 +415,141 @@ def test_read_file_content_rate_limit(client_mock):
     assert "error" in result
     assert result["error"]["details"]["message"]=="Rate limit"
 
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_read_file_content_served_from_commit_cache(client_mock):
+    mock_file = MagicMock()
+    mock_file.decoded_content = b"cached"
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/cached-repo"
+    mock_repo.get_commit.return_value.sha = "abc123"
+    mock_repo.get_contents.return_value = mock_file
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    before = github_tools.get_content_cache_stats()["hits"]
+    assert read_file_content("user", "cached-repo", "a.py")["content"] == "cached"
+    assert read_file_content("user", "cached-repo", "/a.py")["content"] == "cached"
+
+    mock_repo.get_contents.assert_called_once_with("a.py", ref="abc123")
+    assert github_tools.get_content_cache_stats()["hits"] == before + 1
+
+    # A new commit on the branch is a different key → fetched again.
+    mock_repo.get_commit.return_value.sha = "def456"
+    read_file_content("user", "cached-repo", "a.py")
+    assert mock_repo.get_contents.call_count == 2
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_read_file_content_line_window(client_mock):
+    mock_file = MagicMock()
+    mock_file.decoded_content = b"a\nb\nc\nd\n"
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/window-repo"
+    mock_repo.get_contents.return_value = mock_file
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    result = read_file_content("user", "window-repo", "f.txt", start_line=2, end_line=3)
+
+    assert result == {
+        "content": "b\nc\n", "start_line": 2, "end_line": 3,
+        "total_lines": 4, "total_bytes": 8, "truncated": False,
+    }
+    assert "error" in read_file_content("user", "window-repo", "f.txt", start_line=3, end_line=2)
+
+@patch("repo_navigator.sub_agents.tools.github_tools.stream_raw_content")
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_read_file_content_streams_large_files_under_byte_cap(client_mock, stream_mock):
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/big-repo"
+    mock_repo.get_contents.return_value.encoding = "none"  # > 1 MB: no inline content
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    def stream(api_url, full_name, path, ref, token, sink):
+        for _ in range(100):
+            sink(b"x" * 99 + b"\n")
+        return 10_000
+    stream_mock.side_effect = stream
+
+    with patch.object(github_tools, "READ_FILE_MAX_BYTES", 250):
+        result = read_file_content("user", "big-repo", "big.txt", max_bytes=10_000)
+
+    assert len(result["content"]) == 250
+    assert (result["truncated"], result["end_line"], result["total_lines"], result["total_bytes"]) == (True, 2, 100, 10_000)
+    mock_repo.get_contents.return_value.decoded_content.assert_not_called()
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_compact_format(client_mock):
+    mock_repo = _tree_repo(TREE_ENTRIES)
+    mock_repo.full_name = "user/compact"
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    nested = get_repo_structure("user", "compact", max_depth=2)
+    compact = get_repo_structure("user", "compact", max_depth=2, output_format="compact")
+    module = get_repo_structure("user", "compact", max_depth=1, module="src", output_format="compact")
+
+    assert compact["root"] == ""
+    assert compact["tree"] == format_compact(nested)
+    assert compact["tree"].splitlines()[0] == f"README.md {TREE_ENTRIES_README['size']}"
+    assert module["root"] == "src"
+    assert len(json.dumps(compact)) < len(json.dumps(nested))
+    assert "error" in get_repo_structure("user", "compact", output_format="yaml")
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_pages_with_cursor(client_mock):
+    mock_repo = _tree_repo(TREE_ENTRIES)
+    mock_repo.full_name = "user/paged"
+    mock_repo.get_commit.return_value.sha = "sha-paged"
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    full = get_repo_structure("user", "paged", max_depth=5)
+    pages = [get_repo_structure("user", "paged", max_depth=5, max_entries=3)]
+    while "_next_cursor" in pages[-1]:
+        # The cursor pins max_depth; later arguments are ignored.
+        pages.append(get_repo_structure("user", "paged", max_depth=1, max_entries=3, cursor=pages[-1]["_next_cursor"]))
+
+    assert "_next_cursor" not in full
+    assert len(pages) == 3
+    assert pages[0] == {
+        "README.md": TREE_ENTRIES_README,
+        "src": {"app.py": {"type": "file", "path": "src/app.py", "size": 42}},
+        "_next_cursor": pages[0]["_next_cursor"],
+    }
+    # Later pages repeat the directories leading to their first entry.
+    assert pages[1]["src"]["pkg"]["core.py"]["size"] == 7
+    assert pages[2] == {"src": {"pkg": {"deep": {"x.py": {"type": "file", "path": "src/pkg/deep/x.py", "size": 1}}}}}
+    mock_repo.get_git_tree.assert_called_once()
+    # Only the two first-page calls resolve the branch; cursors carry the SHA.
+    assert mock_repo.get_commit.call_count == 2
+
+    compact = get_repo_structure("user", "paged", max_depth=5, max_entries=3, output_format="compact")
+    assert compact["next_cursor"] == pages[0]["_next_cursor"]
+    assert compact["tree"] == "README.md 5\nsrc/\n app.py 42"
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_rejects_bad_cursors(client_mock):
+    mock_repo = _tree_repo(TREE_ENTRIES)
+    mock_repo.full_name = "user/paged"
+    mock_repo.get_commit.return_value.sha = "sha-paged"
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    cursor = get_repo_structure("user", "paged", max_entries=1)["_next_cursor"]
+
+    assert "Invalid cursor" in get_repo_structure("user", "paged", cursor="not-a-cursor")["error"]["message"]
+    assert "different repository" in get_repo_structure("user", "other", cursor=cursor)["error"]["message"]
+    assert "error" in get_repo_structure("user", "paged", max_entries=0)
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_get_repo_structure_tree_served_from_commit_cache(client_mock):
+    mock_repo = _tree_repo(TREE_ENTRIES)
+    mock_repo.full_name = "user/tree-cache"
+    mock_repo.get_commit.return_value.sha = "abc123"
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    first = get_repo_structure("user", "tree-cache", max_depth=1)
+    second = get_repo_structure("user", "tree-cache", max_depth=5)
+
+    mock_repo.get_git_tree.assert_called_once()
+    assert first == {"README.md": TREE_ENTRIES_README, "src": {"_truncated": True}}
+    assert second["src"]["pkg"]["deep"]["x.py"]["size"] == 1
+
 @patch.dict(os.environ, {}, clear=True)
 def test_read_file_content_no_token():
     result = read_file_content("user", "repo", "file.txt")
@@ -188,3 +575,38 @@ def test_get_github_client_initialization_failure():
                side_effect=Exception("boom")):
         client = _get_github_client()
         assert client is None  # Should return None when exception is thrown
+
+
+@patch.dict(os.environ, {"GITHUB_TOKEN": "token-a"})
+def test_get_github_client_is_shared_and_pooled(monkeypatch):
+    monkeypatch.setattr(github_tools, "_client", None)
+    with patch("repo_navigator.sub_agents.tools.github_tools.Github") as github_cls:
+        first = _get_github_client()
+        second = _get_github_client()
+
+        assert first is second
+        github_cls.assert_called_once_with(
+            "token-a",
+            base_url=github_tools.GITHUB_API_URL,
+            timeout=15,
+            pool_size=github_tools.GITHUB_POOL_SIZE,
+            retry=github_tools.TRANSPORT_RETRY,
+            seconds_between_requests=None,
+        )
+
+        os.environ["GITHUB_TOKEN"] = "token-b"
+        _get_github_client()
+        assert github_cls.call_count == 2
+    monkeypatch.setattr(github_tools, "_client", None)
+
+def test_get_repo_caches_handles_per_client():
+    client = MagicMock()
+    first = _get_repo(client, "User", "Repo")
+    second = _get_repo(client, "user", "repo")
+
+    assert first is second
+    client.get_repo.assert_called_once_with("User/Repo")
+
+    other_client = MagicMock()
+    _get_repo(other_client, "user", "repo")
+    other_client.get_repo.assert_called_once_with("user/repo")
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.models import LlmRequest
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from repo_navigator.session_store import SqliteSessionService
+from repo_navigator.sub_agents.history_budget import HistoryBudgetPlugin, recall_tool_result, result_handle
+
+STRUCTURE = {"structure": "src/\n" + "".join(f" module_{i}.py {i * 10}\n" for i in range(400))}
+
+
+def user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def tool_turn(name, response):
+    return [
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args={}))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(name=name, response=response))]),
+    ]
+
+
+def invocation(service, session, artifact_service=None, question=None):
+    return InvocationContext(
+        session_service=service,
+        artifact_service=artifact_service,
+        invocation_id="inv",
+        agent=LlmAgent(name="agent"),
+        session=session,
+        user_content=question,
+    )
+
+
+def conversation():
+    return [
+        user("what is in o/r?"), *tool_turn("get_repo_structure", STRUCTURE),
+        types.Content(role="model", parts=[types.Part(text="It is a Python package.")]),
+        user("For context:"),
+        types.Content(role="user", parts=[types.Part(text=f"[code_summarizer] `read_file_content` tool returned result: {STRUCTURE}")]),
+        user("how does module_1 work?"), *tool_turn("get_repo_structure", STRUCTURE),
+    ]
+
+
+def test_prompt_under_budget_is_left_alone():
+    contents = conversation()
+    assert HistoryBudgetPlugin(budget_tokens=100_000).compact(contents, user("how does module_1 work?")) == 0
+    assert contents == conversation()
+
+
+def test_old_tool_results_are_offloaded_oldest_first_until_the_prompt_fits():
+    plugin = HistoryBudgetPlugin(budget_tokens=4500, min_chars=1000)
+    contents = conversation()
+
+    saved = plugin.compact(contents, user("how does module_1 work?"))
+
+    old, foreign, current = contents[2].parts[0], contents[5].parts[0], contents[-1].parts[0]
+    assert old.function_response.response["offloaded"] == result_handle(STRUCTURE)
+    assert old.function_response.response["preview"].startswith("{'structure': 'src/")
+    assert "offloaded" not in foreign.text  # the first offload already fits the budget
+    assert current.function_response.response == STRUCTURE  # this turn's result stays
+    assert plugin.stats() == {"requests_compacted": 1, "results_offloaded": 1, "chars_saved": saved}
+
+    tighter = HistoryBudgetPlugin(budget_tokens=2500, min_chars=1000)
+    tighter.compact(contents, user("how does module_1 work?"))
+    stub = json.loads(foreign.text.split("returned result: ", 1)[1])
+    assert stub["offloaded"] == result_handle(STRUCTURE)
+
+
+def test_recall_returns_slices_of_the_offloaded_result():
+    async def main():
+        service = InMemorySessionService()
+        session = await service.create_session(app_name="app", user_id="u")
+        await service.append_event(session, Event(author="code_architecture_agent", content=tool_turn("get_repo_structure", STRUCTURE)[1]))
+        context = ToolContext(invocation(service, session))
+        handle = result_handle(STRUCTURE)
+
+        first = await recall_tool_result(handle, max_chars=100, tool_context=context)
+        rest = await recall_tool_result(handle, start=first["end"], max_chars=100_000, tool_context=context)
+        return first, rest, await recall_tool_result("missing", tool_context=context)
+
+    first, rest, missing = asyncio.run(main())
+
+    assert first["tool"] == "get_repo_structure" and first["truncated"]
+    assert json.loads(first["content"] + rest["content"]) == STRUCTURE and not rest["truncated"]
+    assert "error" in missing
+
+
+def test_offloaded_results_are_recalled_after_leaving_the_session(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.sqlite3"), max_events=8, load_events=4)
+    artifacts = InMemoryArtifactService()
+    plugin = HistoryBudgetPlugin(budget_tokens=500, min_chars=1000)
+    question = user("how does module_1 work?")
+
+    async def main():
+        session = await service.create_session(app_name="app", user_id="u")
+        await service.append_event(session, Event(author="user", content=user("what is in o/r?")))
+        for content in tool_turn("get_repo_structure", STRUCTURE):
+            await service.append_event(session, Event(author="code_architecture_agent", content=content))
+        await service.append_event(session, Event(author="user", content=question))
+
+        # The next turn's model call offloads the old result from its prompt.
+        request = LlmRequest(contents=[event.content for event in session.events])
+        context = CallbackContext(invocation(service, session, artifacts, question))
+        await plugin.before_model_callback(callback_context=context, llm_request=request)
+        assert request.contents[2].parts[0].function_response.response["offloaded"] == result_handle(STRUCTURE)
+
+        # Later turns first push it out of the loaded window, then out of the session.
+        recalled = []
+        for i in range(8):
+            await service.append_event(session, Event(author="user", content=user(f"question {i}")))
+            loaded = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+            tool_context = ToolContext(invocation(service, loaded, artifacts))
+            recalled.append(await recall_tool_result(result_handle(STRUCTURE), max_chars=100_000, tool_context=tool_context))
+        return loaded, recalled
+
+    loaded, recalled = asyncio.run(main())
+
+    assert not any(event.get_function_responses() for event in loaded.events)
+    assert service.stats()["events_trimmed"] > 0
+    assert all(json.loads(r["content"]) == STRUCTURE and r["tool"] == "get_repo_structure" for r in recalled)
+    service.close()
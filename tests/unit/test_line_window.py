@@ -0,0 +1,65 @@
+import pytest
+
+from repo_navigator.sub_agents.tools.line_window import LineWindow, iter_chunks, utf8_boundary
+
+TEXT = b"".join(f"line {i}\n".encode() for i in range(1, 101))
+
+
+def run(data, chunk_size=7, **kwargs):
+    window = LineWindow(**kwargs)
+    for chunk in iter_chunks(data, chunk_size):
+        window.feed(chunk)
+    return window.result()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_line_range_is_independent_of_chunking(chunk_size):
+    result = run(TEXT, chunk_size, start_line=10, end_line=12)
+    assert result == {
+        "content": "line 10\nline 11\nline 12\n",
+        "start_line": 10,
+        "end_line": 12,
+        "total_lines": 100,
+        "total_bytes": len(TEXT),
+        "truncated": False,
+    }
+
+
+def test_byte_cap_truncates_and_reports_last_complete_line():
+    result = run(TEXT, start_line=1, max_bytes=20)
+    assert result["content"] == "line 1\nline 2\nline 3"[:20]
+    assert result["truncated"] is True
+    assert result["end_line"] == 2
+    assert result["total_lines"] == 100
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_byte_cap_does_not_split_a_character(chunk_size):
+    result = run("naïve → ok\n".encode(), chunk_size, max_bytes=9)
+    assert result["content"] == "naïve "
+    assert result["truncated"] is True
+
+
+def test_utf8_boundary():
+    data = "a€b".encode()  # € is 3 bytes
+    assert [utf8_boundary(data, n) for n in range(6)] == [0, 1, 1, 1, 4, 5]
+    assert utf8_boundary(b"\x80\x80\x80\x80\x80", 4) == 4
+
+
+def test_plain_read_omits_metadata_unless_truncated():
+    window = LineWindow(max_bytes=1000)
+    window.feed(b"a\nb")
+    assert window.result(with_metadata=False) == {"content": "a\nb"}
+
+    window = LineWindow(max_bytes=2)
+    window.feed(b"a\nb")
+    assert window.result(with_metadata=False)["truncated"] is True
+
+
+def test_counts_last_line_without_newline_and_empty_files():
+    assert run(b"a\nb", start_line=2)["end_line"] == 2
+    assert run(b"a\nb")["total_lines"] == 2
+    assert run(b"")["total_lines"] == 0
+
+    past_end = run(b"a\n", start_line=5)
+    assert (past_end["content"], past_end["end_line"], past_end["total_lines"]) == ("", 4, 1)
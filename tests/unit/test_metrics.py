@@ -0,0 +1,115 @@
+import asyncio
+import json
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from repo_navigator.sub_agents.tools.metrics import Histogram, propagate_context, start_metrics_server, tool_metrics
+from repo_navigator.sub_agents.tools.utils import error_response, tool_safety
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    tool_metrics.reset()
+    yield
+    tool_metrics.reset()
+
+
+def test_histogram_uses_inclusive_upper_bounds():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 3, 9):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {"buckets": {"1": 2, "5": 3, "+Inf": 4}, "sum": 13, "count": 4}
+
+
+def test_tool_safety_records_latency_errors_and_traffic():
+    @tool_safety("fetch")
+    def fetch(fail=False):
+        tool_metrics.record_api_call(100, {"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"})
+        tool_metrics.record_retry()
+        tool_metrics.record_bytes(50)
+        return error_response("nope") if fail else {"ok": True}
+
+    @tool_safety("crash")
+    def crash():
+        raise RuntimeError("boom")
+
+    fetch()
+    fetch(fail=True)
+    crash()
+    snapshot = tool_metrics.snapshot()
+
+    assert snapshot["tools"]["fetch"]["calls"] == 2
+    assert snapshot["tools"]["fetch"]["errors"] == 1
+    assert snapshot["tools"]["fetch"]["retries"] == 2
+    assert snapshot["tools"]["fetch"]["api_calls"]["sum"] == 2
+    assert snapshot["tools"]["fetch"]["fetched_bytes"]["sum"] == 300
+    assert snapshot["tools"]["crash"]["errors"] == 1
+    assert snapshot["github"] == {"api_calls": 2, "bytes": 300, "retries": 2, "coalesced": 0,
+                                  "rate_limit": {"remaining": 4999.0, "limit": 5000.0}}
+
+
+def test_nested_and_threaded_calls_count_toward_the_outer_tool():
+    @tool_safety("inner")
+    def inner():
+        tool_metrics.record_api_call(10)
+        return {}
+
+    @tool_safety("outer")
+    async def outer():
+        await asyncio.to_thread(inner)
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(propagate_context(lambda _: tool_metrics.record_api_call(1)), range(3)))
+        return {}
+
+    asyncio.run(outer())
+    snapshot = tool_metrics.snapshot()
+
+    assert list(snapshot["tools"]) == ["outer"]
+    assert snapshot["tools"]["outer"]["api_calls"]["sum"] == 4
+    assert snapshot["tools"]["outer"]["fetched_bytes"]["sum"] == 13
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(tool_metrics, "enabled", False)
+
+    @tool_safety("quiet")
+    def quiet():
+        tool_metrics.record_api_call(1)
+        return {}
+
+    quiet()
+    assert tool_metrics.snapshot() == {
+        "tools": {},
+        "github": {"api_calls": 0, "bytes": 0, "retries": 0, "coalesced": 0, "rate_limit": {}},
+    }
+
+
+def test_prometheus_exposition_and_http_endpoint():
+    @tool_safety("read_file_content")
+    def read():
+        tool_metrics.record_api_call(2048, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1700000000"})
+        return {}
+
+    read()
+    text = tool_metrics.prometheus()
+
+    assert '# TYPE repo_navigator_tool_duration_seconds histogram' in text
+    assert 'repo_navigator_tool_calls_total{tool="read_file_content"} 1' in text
+    assert 'repo_navigator_tool_fetched_bytes_bucket{tool="read_file_content",le="10240"} 1' in text
+    assert "repo_navigator_github_rate_limit_remaining 10" in text
+    assert "repo_navigator_github_rate_limit_reset_timestamp_seconds 1700000000" in text
+    assert "rate_limit_limit" not in text
+
+    server = start_metrics_server(0, "127.0.0.1")
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            assert json.load(response)["tools"]["read_file_content"]["calls"] == 1
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert response.read().decode() == tool_metrics.prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
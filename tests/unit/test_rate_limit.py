@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from repo_navigator.sub_agents.tools.async_github_tools import AsyncGithubClient
+from repo_navigator.sub_agents.tools.github_http import ConditionalRequestAdapter, ETagStore, scheduled_get
+from repo_navigator.sub_agents.tools.rate_limit import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitScheduler,
+    RateLimitWaitExceeded,
+    background_priority,
+)
+
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    """Fake GitHub API that enforces a per-token quota which resets every `window` seconds."""
+
+    limit = 3
+    window = 60.0
+    quotas: dict = {}
+    log: list = []
+
+    def do_GET(self):
+        token = self.headers.get("Authorization", "").removeprefix("token ")
+        now = time.time()
+        remaining, reset = self.quotas.get(token, (self.limit, now + self.window))
+        if now >= reset:
+            remaining, reset = self.limit, now + self.window
+        limited = remaining <= 0
+        if not limited:
+            remaining -= 1
+        self.quotas[token] = (remaining, reset)
+        self.log.append((token, 403 if limited else 200))
+
+        body = json.dumps({"message": "API rate limit exceeded"} if limited else {"token": token}).encode()
+        self.send_response(403 if limited else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Limit", str(self.limit))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", f"{reset:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def quota_server():
+    QuotaHandler.limit, QuotaHandler.window = 3, 60.0
+    QuotaHandler.quotas, QuotaHandler.log = {}, []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuotaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_scheduler(*tokens, **kwargs):
+    kwargs.setdefault("max_wait", 1)
+    return RateLimitScheduler(lambda: list(tokens), **kwargs)
+
+
+# --------------------------
+# Quota tracking and rotation
+# --------------------------
+def test_rotates_tokens_and_stops_before_the_server_refuses(quota_server):
+    scheduler = make_scheduler("a", "b")
+    session = requests.Session()
+    session.mount("http://", ConditionalRequestAdapter(ETagStore(1024), scheduler))
+
+    tokens = [session.get(f"{quota_server}/repos/o/r", headers={"Authorization": "token own"}).json()["token"]
+              for _ in range(6)]
+
+    assert sorted(tokens) == ["a", "a", "a", "b", "b", "b"]
+    with pytest.raises(RateLimitWaitExceeded):
+        session.get(f"{quota_server}/repos/o/r")
+    assert all(status == 200 for _, status in QuotaHandler.log) and len(QuotaHandler.log) == 6
+    assert [t["remaining"] for t in scheduler.stats()["tokens"]] == [0, 0]
+
+
+def test_rate_limited_response_is_retried_on_another_token(quota_server):
+    QuotaHandler.quotas["a"] = (0, time.time() + 60)  # exhausted by someone else
+    scheduler = make_scheduler("a", "b")
+
+    with scheduled_get(f"{quota_server}/x", "own", scheduler) as response:
+        assert response.json() == {"token": "b"}
+
+    assert QuotaHandler.log == [("a", 403), ("b", 200)]
+    assert scheduler.stats()["rate_limited"] == 1
+
+
+def test_waits_for_the_quota_window_to_reset(quota_server):
+    QuotaHandler.limit, QuotaHandler.window = 1, 0.3
+    scheduler = make_scheduler("a")
+
+    started = time.perf_counter()
+    for _ in range(2):
+        with scheduled_get(f"{quota_server}/x", "own", scheduler) as response:
+            assert response.status_code == 200
+
+    assert time.perf_counter() - started >= 0.2
+    assert [status for _, status in QuotaHandler.log] == [200, 200]
+    assert scheduler.stats()["waits"] == 1
+
+
+def test_async_client_shares_the_scheduler(quota_server):
+    scheduler = make_scheduler("a", "b")
+
+    async def main():
+        client = AsyncGithubClient("own", base_url=quota_server, scheduler=scheduler)
+        try:
+            return await asyncio.gather(*(client.request_json(f"/r{i}") for i in range(6)))
+        finally:
+            await client.aclose()
+
+    assert sorted(body["token"] for body in asyncio.run(main())) == ["a", "a", "a", "b", "b", "b"]
+
+
+# --------------------------
+# Pacing and priorities
+# --------------------------
+def test_token_bucket_paces_requests():
+    scheduler = make_scheduler("a", rate=20, burst=2)
+
+    started = time.perf_counter()
+    for _ in range(4):
+        scheduler.acquire()
+
+    assert 0.08 <= time.perf_counter() - started < 0.5  # 2 in the burst, then 1 every 50 ms
+
+
+def test_background_requests_leave_a_reserve_for_interactive_ones():
+    scheduler = make_scheduler("a", reserve=0.5)
+    scheduler.acquire()
+    scheduler.observe("a", 200, {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "4",
+                                 "X-RateLimit-Reset": str(time.time() + 60)})
+
+    with background_priority(), pytest.raises(RateLimitWaitExceeded):
+        scheduler.acquire()
+    assert scheduler.acquire(INTERACTIVE) == "a"
+
+
+def test_interactive_requests_go_before_waiting_background_ones():
+    scheduler = make_scheduler("a", rate=10, burst=1)
+    scheduler.acquire()
+    order = []
+
+    async def request(priority):
+        await scheduler.acquire_async(priority)
+        order.append(priority)
+
+    async def main():
+        background = asyncio.create_task(request(BACKGROUND))
+        await asyncio.sleep(0)
+        await asyncio.gather(background, request(INTERACTIVE))
+
+    asyncio.run(main())
+    assert order == [INTERACTIVE, BACKGROUND]
+    assert scheduler.stats()["waiting"] == {INTERACTIVE: 0, BACKGROUND: 0}
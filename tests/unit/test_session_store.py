@@ -0,0 +1,243 @@
+import asyncio
+import threading
+
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from repo_navigator import session_store
+from repo_navigator.session_store import SqliteSessionService, session_service_from_env
+
+APP = "repo_analysis_app"
+
+
+def make_event(text, timestamp, **state):
+    return Event(
+        author="user",
+        invocation_id="inv",
+        timestamp=timestamp,
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state),
+    )
+
+
+def make_tool_events(name, timestamp):
+    """A model function call and its response, as the runner appends them."""
+    call = Event(author="agent", invocation_id="inv", timestamp=timestamp, content=types.Content(
+        role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args={}))]))
+    response = Event(author="agent", invocation_id="inv", timestamp=timestamp + 0.5, content=types.Content(
+        role="user", parts=[types.Part(function_response=types.FunctionResponse(name=name, response={}))]))
+    return call, response
+
+
+def make_reply(text, timestamp):
+    return Event(author="agent", invocation_id="inv", timestamp=timestamp,
+                 content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def describe(session):
+    return [
+        p.text or f"call:{p.function_call.name}" if not p.function_response else f"response:{p.function_response.name}"
+        for e in session.events for p in e.content.parts[:1]
+    ]
+
+
+async def append_turn(service, session, question, tool, timestamp):
+    """A user message, one tool call and its response."""
+    await service.append_event(session, make_event(question, timestamp))
+    for event in make_tool_events(tool, timestamp + 1):
+        await service.append_event(session, event)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.sqlite3"))
+    yield service
+    service.close()
+
+
+def texts(session):
+    return [e.content.parts[0].text for e in session.events]
+
+
+# --------------------------
+# BaseSessionService contract
+# --------------------------
+def test_create_append_get_list_delete(service):
+    async def main():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s",
+                                               state={"repo": "o/r", "app:model": "m", "temp:x": 1})
+        with pytest.raises(AlreadyExistsError):
+            await service.create_session(app_name=APP, user_id="u", session_id="s")
+        for i in range(3):
+            await service.append_event(session, make_event(f"q{i}", session.last_update_time + 1, turn=i))
+        await service.append_event(session, make_event("scratch", session.last_update_time + 1, **{"temp:t": 1}))
+        loaded = await service.get_session(app_name=APP, user_id="u", session_id="s")
+        listed = await service.list_sessions(app_name=APP, user_id="u")
+        await service.delete_session(app_name=APP, user_id="u", session_id="s")
+        return session, loaded, listed, await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+    session, loaded, listed, deleted = asyncio.run(main())
+
+    assert texts(loaded) == ["q0", "q1", "q2", "scratch"]
+    assert loaded.state == {"repo": "o/r", "turn": 2, "app:model": "m"}
+    assert "temp:t" not in loaded.events[-1].actions.state_delta
+    assert loaded.last_update_time == session.last_update_time
+    assert [s.id for s in listed.sessions] == ["s"] and listed.sessions[0].events == []
+    assert deleted is None
+
+
+def test_get_session_loads_only_the_requested_events(service):
+    async def main():
+        session = await service.create_session(app_name=APP, user_id="u")
+        for i in range(5):
+            await service.append_event(session, make_event(f"q{i}", 100.0 + i))
+        recent = await service.get_session(app_name=APP, user_id="u", session_id=session.id,
+                                           config=GetSessionConfig(num_recent_events=2))
+        after = await service.get_session(app_name=APP, user_id="u", session_id=session.id,
+                                          config=GetSessionConfig(after_timestamp=103.0))
+        return recent, after
+
+    recent, after = asyncio.run(main())
+    assert texts(recent) == ["q3", "q4"]
+    assert texts(after) == ["q3", "q4"]
+
+
+def test_sessions_persist_across_service_instances(tmp_path):
+    path = str(tmp_path / "s.sqlite3")
+
+    async def write():
+        service = SqliteSessionService(path)
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s", state={"user:lang": "py"})
+        await service.append_event(session, make_event("hello", session.last_update_time + 1))
+        service.close()
+
+    async def read():
+        service = SqliteSessionService(path)
+        other = await service.create_session(app_name=APP, user_id="u", session_id="t")
+        return await service.get_session(app_name=APP, user_id="u", session_id="s"), other
+
+    asyncio.run(write())
+    session, other = asyncio.run(read())
+    assert texts(session) == ["hello"]
+    assert session.state == {"user:lang": "py"} and other.state == {"user:lang": "py"}
+
+
+# --------------------------
+# Bounds
+# --------------------------
+def test_oldest_events_are_trimmed_past_the_caps(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "s.sqlite3"), max_events=3)
+
+    async def main():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s")
+        for i in range(5):
+            await service.append_event(session, make_event(f"q{i}", 100.0 + i))
+        by_count = await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+        service.max_events, service.max_bytes = 100, len(by_count.events[-1].model_dump_json(exclude_none=True)) * 2
+        await service.append_event(session, make_event("q5", 106.0))
+        return by_count, await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+    by_count, by_bytes = asyncio.run(main())
+    assert texts(by_count) == ["q2", "q3", "q4"]
+    assert texts(by_bytes) == ["q4", "q5"]
+    assert service.stats()["events_trimmed"] == 4 and service.stats()["events"] == 2
+
+
+def test_trimming_never_separates_a_call_from_its_response(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "s.sqlite3"), max_events=4)
+
+    async def main():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s")
+        await append_turn(service, session, "q0", "t0", 100.0)
+        await service.append_event(session, make_reply("a0", 103.0))
+        await append_turn(service, session, "q1", "t1", 104.0)
+        at_turns = await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+        # A turn that alone exceeds the cap is cut before a call, not between a call and its response.
+        service.max_events = 3
+        for event in make_tool_events("t2", 107.0):
+            await service.append_event(session, event)
+        return at_turns, await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+    at_turns, within_turn = asyncio.run(main())
+    assert describe(at_turns) == ["q1", "call:t1", "response:t1"]
+    assert describe(within_turn) == ["call:t2", "response:t2"]
+    assert service.stats()["events"] == 2
+
+
+def test_get_session_without_a_limit_loads_a_window_starting_at_a_turn(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "s.sqlite3"), load_events=4)
+
+    async def main():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s")
+        await append_turn(service, session, "q0", "t0", 100.0)
+        await service.append_event(session, make_reply("a0", 103.0))
+        await append_turn(service, session, "q1", "t1", 104.0)
+        window = await service.get_session(app_name=APP, user_id="u", session_id="s")
+        recent = await service.get_session(app_name=APP, user_id="u", session_id="s",
+                                           config=GetSessionConfig(num_recent_events=4))
+        service.load_events = 0
+        return window, recent, await service.get_session(app_name=APP, user_id="u", session_id="s")
+
+    window, recent, everything = asyncio.run(main())
+    service.close()
+    assert describe(window) == ["q1", "call:t1", "response:t1"]
+    assert describe(recent) == ["a0", "q1", "call:t1", "response:t1"]
+    assert len(everything.events) == 7
+
+
+def test_idle_sessions_are_evicted(service):
+    async def main():
+        idle = await service.create_session(app_name=APP, user_id="u", session_id="idle")
+        await service.append_event(idle, make_event("old", 1000.0))
+        active = await service.create_session(app_name=APP, user_id="u", session_id="active")
+        await service.append_event(active, make_event("new", 1000.0 + service.idle_ttl))
+        return service.evict_idle(now=1001.0 + service.idle_ttl)
+
+    assert asyncio.run(main()) == 1
+    assert service.stats()["sessions"] == 1 and service.stats()["events"] == 1
+
+
+# --------------------------
+# Multiple runner processes
+# --------------------------
+def test_stale_session_is_rejected_and_concurrent_writers_do_not_lose_events(tmp_path):
+    path = str(tmp_path / "s.sqlite3")
+    first, second = SqliteSessionService(path), SqliteSessionService(path)
+
+    async def stale():
+        session = await first.create_session(app_name=APP, user_id="u", session_id="s")
+        copy = await second.get_session(app_name=APP, user_id="u", session_id="s")
+        await first.append_event(session, make_event("a", session.last_update_time + 1))
+        with pytest.raises(ValueError, match="stale"):
+            await second.append_event(copy, make_event("b", copy.last_update_time + 1))
+
+    asyncio.run(stale())
+
+    def writer(service, user):
+        async def run():
+            session = await service.create_session(app_name=APP, user_id=user, session_id="s")
+            for i in range(20):
+                await service.append_event(session, make_event(f"{user}{i}", session.last_update_time + 1))
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=writer, args=(svc, user)) for svc, user in ((first, "x"), (second, "y"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert first.stats()["events"] == 41
+
+
+def test_session_store_is_selected_from_env(monkeypatch):
+    monkeypatch.setattr(session_store, "SESSION_STORE", "memory")
+    assert isinstance(session_service_from_env(), InMemorySessionService)
+    monkeypatch.setattr(session_store, "SESSION_STORE", "redis")
+    with pytest.raises(ValueError):
+        session_service_from_env()
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools, github_tools
+from repo_navigator.sub_agents.tools.metrics import tool_metrics
+from repo_navigator.sub_agents.tools.single_flight import SingleFlight
+
+
+def slow(value, calls, delay=0.05):
+    def fn():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return fn
+
+
+# --------------------------
+# SingleFlight
+# --------------------------
+def test_concurrent_sync_calls_share_one_flight():
+    flight, calls = SingleFlight(), []
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: flight.do("k", slow(b"data", calls)), range(5)))
+
+    assert results == [b"data"] * 5 and len(calls) == 1
+    assert flight.stats() == {"flights": 1, "coalesced": 4, "in_flight": 0}
+
+    flight.do("k", slow(b"again", calls, 0))  # landed flights are not reused
+    assert len(calls) == 2
+
+
+def test_errors_are_shared_with_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "k", boom)
+        started.wait()
+        follower = pool.submit(flight.do, "k", lambda: "unused")
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_async_callers_coalesce_and_survive_a_cancelled_leader():
+    flight, calls = SingleFlight(), []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        first = await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(3)))
+
+        leader = asyncio.create_task(flight.do_async("j", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("j", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return first, await follower
+
+    first, second = asyncio.run(main())
+    assert first == [1, 1, 1]
+    assert second == 3  # the follower ran the fetch itself after the leader was cancelled
+
+
+def test_async_follower_joins_a_sync_leader():
+    flight, calls = SingleFlight(), []
+
+    async def main():
+        leader = asyncio.create_task(asyncio.to_thread(flight.do, "k", slow("sync", calls, 0.1)))
+        await asyncio.sleep(0.02)
+        follower = await flight.do_async("k", lambda: pytest.fail("follower must not fetch"))
+        return await leader, follower
+
+    assert asyncio.run(main()) == ("sync", "sync")
+    assert len(calls) == 1
+
+
+# --------------------------
+# Tools
+# --------------------------
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_concurrent_sync_reads_issue_one_request(client_mock):
+    tool_metrics.reset()
+    mock_file = MagicMock(encoding="base64", decoded_content=b"shared")
+    mock_repo = MagicMock()
+    mock_repo.full_name = "user/coalesced-sync"
+    mock_repo.get_commit.return_value.sha = "c0ffee"
+    mock_repo.get_contents.side_effect = lambda *a, **k: time.sleep(0.05) or mock_file
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: github_tools.read_file_content("user", "coalesced-sync", "a.py"), range(4)))
+
+    assert [r["content"] for r in results] == ["shared"] * 4
+    assert mock_repo.get_contents.call_count == 1
+    assert tool_metrics.snapshot()["github"]["coalesced"] >= 3
+
+
+def test_concurrent_async_structure_and_reads_share_requests(monkeypatch):
+    calls = []
+
+    async def api(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(0.02)
+        base = "/repos/user/coalesced-async"
+        if request.url.path == base:
+            return httpx.Response(200, json={"full_name": "user/coalesced-async", "default_branch": "main"})
+        if request.url.path == f"{base}/commits/main":
+            return httpx.Response(200, text="sha-9")
+        if request.url.path == f"{base}/git/trees/sha-9":
+            return httpx.Response(200, json={"truncated": False, "tree": [{"path": "a.py", "type": "blob", "size": 6}]})
+        return httpx.Response(200, content=b"print\n")
+
+    monkeypatch.setenv("GITHUB_TOKEN", "coalesce-token")
+
+    async def main():
+        client = async_github_tools.AsyncGithubClient("coalesce-token", transport=httpx.MockTransport(api))
+        monkeypatch.setattr(async_github_tools, "_get_async_client", lambda: client)
+        structures = await asyncio.gather(*(
+            async_github_tools.get_repo_structure("user", "coalesced-async") for _ in range(3)
+        ))
+        reads = await asyncio.gather(*(
+            async_github_tools.read_file_content("user", "coalesced-async", "a.py") for _ in range(3)
+        ))
+        return structures, reads
+
+    structures, reads = asyncio.run(main())
+
+    assert all(s == structures[0] for s in structures) and "a.py" in structures[0]
+    assert [r["content"] for r in reads] == ["print\n"] * 3
+    assert calls.count("/repos/user/coalesced-async") == 1
+    assert calls.count("/repos/user/coalesced-async/commits/main") == 2  # once per batch (no session memo)
+    assert calls.count("/repos/user/coalesced-async/git/trees/sha-9") == 1
+    assert calls.count("/repos/user/coalesced-async/contents/a.py") == 1
@@ -0,0 +1,227 @@
+import io
+import os
+import tarfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from repo_navigator.sub_agents.tools import async_github_tools, github_tools, repo_cache, symbol_index
+from repo_navigator.sub_agents.tools.cache import ContentCache
+from repo_navigator.sub_agents.tools.snapshot import STALE_BUILD_SECONDS, RepoSnapshot, SnapshotStore
+from repo_navigator.sub_agents.tools.symbol_index import build_symbol_index
+
+FILES = {
+    "README.md": b"# demo\n",
+    "src/app.py": b"print('hi')\n",
+    "src/pkg/core.py": b"X = 1\n",
+}
+
+
+def make_tarball(files=FILES, prefix="owner-repo-abc123", links=None):
+    """Build a gzipped tarball shaped like GitHub's archive endpoint output."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for path, target in (links or {}).items():
+            link = tarfile.TarInfo(f"{prefix}/{path}")
+            link.type, link.linkname = tarfile.SYMTYPE, target
+            tar.addfile(link)
+        dirs = sorted({p.rsplit("/", 1)[0] for p in files if "/" in p} | {"src"})
+        for d in [""] + dirs:
+            info = tarfile.TarInfo(f"{prefix}/{d}".rstrip("/"))
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+            for path, data in files.items():
+                if path.rpartition("/")[0] == d:
+                    member = tarfile.TarInfo(f"{prefix}/{path}")
+                    member.size = len(data)
+                    tar.addfile(member, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def writer(payload, calls=None):
+    def fetch(out):
+        if calls is not None:
+            calls.append(1)
+        out.write(payload)
+    return fetch
+
+
+# --------------------------
+# RepoSnapshot / SnapshotStore tests
+# --------------------------
+def test_snapshot_indexes_members_and_reads_zero_copy(tmp_path):
+    snapshot = RepoSnapshot.build(str(tmp_path / "snap"), io.BytesIO(make_tarball()))
+
+    assert ("src/pkg", "tree", None) in snapshot.entries()
+    assert ("src/app.py", "blob", len(FILES["src/app.py"])) in snapshot.entries()
+    view = snapshot.read("/src/app.py")
+    assert isinstance(view, memoryview)
+    assert bytes(view) == FILES["src/app.py"]
+    assert snapshot.read("src") is None
+    assert snapshot.read("missing.py") is None
+    del view
+    snapshot.close()
+
+def test_snapshot_reads_symlinks_as_their_target(tmp_path):
+    tarball = make_tarball(links={"docs": "README.md"})
+    snapshot = RepoSnapshot.build(str(tmp_path / "snap"), io.BytesIO(tarball))
+
+    assert ("docs", "blob", len(b"README.md")) in snapshot.entries()
+    assert bytes(snapshot.read("docs")) == b"README.md"
+    snapshot.close()
+
+def test_snapshot_store_builds_once_and_survives_restart(tmp_path):
+    calls = []
+    store = SnapshotStore(str(tmp_path), max_bytes=10**7)
+    threads = [
+        threading.Thread(target=lambda: store.get_or_create("owner/repo", "abc123", writer(make_tarball(), calls)).release())
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.close()
+    assert len(calls) == 1
+
+    reopened = SnapshotStore(str(tmp_path), max_bytes=10**7)
+    with reopened.get("owner/repo", "abc123") as snapshot:
+        assert bytes(snapshot.read("README.md")) == FILES["README.md"]
+    assert reopened.stats()["snapshots"] == 1
+    reopened.close()
+
+def test_snapshot_store_uses_a_snapshot_built_by_another_process(tmp_path):
+    calls = []
+    first, second = SnapshotStore(str(tmp_path), max_bytes=10**7), SnapshotStore(str(tmp_path), max_bytes=10**7)
+    first.get_or_create("owner/repo", "abc123", writer(make_tarball(), calls)).release()
+
+    with second.get_or_create("owner/repo", "abc123", writer(make_tarball(), calls)) as snapshot:
+        assert bytes(snapshot.read("README.md")) == FILES["README.md"]
+    assert len(calls) == 1
+    first.close()
+    second.close()
+
+def test_snapshot_store_only_cleans_up_stale_builds(tmp_path):
+    stale, running = tmp_path / ".owner__repo__old.1.a", tmp_path / ".owner__repo__new.2.b"
+    for build in (stale, running):
+        build.mkdir()
+        (build / "download.tar.gz").write_bytes(b"partial")
+    past = time.time() - STALE_BUILD_SECONDS - 60
+    for path in (stale / "download.tar.gz", stale):
+        os.utime(path, (past, past))
+
+    SnapshotStore(str(tmp_path), max_bytes=10**7).close()
+
+    assert not stale.exists() and running.exists()
+
+def test_snapshot_store_evicts_lru_over_quota(tmp_path):
+    payload = make_tarball()
+    store = SnapshotStore(str(tmp_path), max_bytes=1)
+    one = store.get_or_create("owner/repo", "one", writer(payload))
+    store.get_or_create("owner/repo", "two", writer(payload)).release()
+
+    assert store.get("owner/repo", "one") is None
+    with store.get("owner/repo", "two") as two:
+        assert two is not None
+    assert store.stats()["evictions"] == 1
+    assert not (tmp_path / SnapshotStore.key("owner/repo", "one")).exists()
+    # A reader's lease outlives eviction; the last release closes the snapshot.
+    assert bytes(one.read("README.md")) == FILES["README.md"]
+    one.release()
+    assert one._file.closed
+    store.close()
+
+def test_snapshot_store_cleans_up_failed_build(tmp_path):
+    store = SnapshotStore(str(tmp_path), max_bytes=10**7)
+    with pytest.raises(Exception):
+        store.get_or_create("owner/repo", "bad", writer(b"not a tarball"))
+    assert list(tmp_path.iterdir()) == []
+
+# --------------------------
+# Snapshot mode in the tools
+# --------------------------
+@pytest.fixture
+def snapshot_mode(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), max_bytes=10**7)
+    monkeypatch.setattr(repo_cache, "snapshot_store", store)
+    monkeypatch.setattr(repo_cache, "download_tarball", lambda api, full, sha, token, out: out.write(make_tarball()))
+    yield store
+    store.close()
+
+@patch("repo_navigator.sub_agents.tools.github_tools._get_github_client")
+def test_sync_tools_served_from_snapshot(client_mock, snapshot_mode):
+    mock_repo = MagicMock()
+    mock_repo.full_name = "owner/repo"
+    mock_repo.get_commit.return_value.sha = "abc123"
+    client_mock.return_value.get_repo.return_value = mock_repo
+
+    structure = github_tools.get_repo_structure("owner", "repo", max_depth=2)
+    content = github_tools.read_file_content("owner", "repo", "src/pkg/core.py")
+    missing = github_tools.read_file_content("owner", "repo", "nope.py", branch="main")
+
+    assert structure["src"]["app.py"] == {"type": "file", "path": "src/app.py", "size": 12}
+    assert structure["src"]["pkg"] == {"_truncated": True}
+    assert content == {"content": "X = 1\n"}
+    assert "does not exist" in missing["error"]
+    mock_repo.get_git_tree.assert_not_called()
+    mock_repo.get_contents.assert_not_called()
+    assert snapshot_mode.stats()["builds"] == 1
+
+@pytest.mark.asyncio
+async def test_async_tools_served_from_snapshot(snapshot_mode, monkeypatch):
+    client = MagicMock()
+
+    async def get_repo(full_name):
+        return {"full_name": full_name, "default_branch": "main"}
+
+    async def resolve_ref(full_name, ref):
+        return "abc123"
+
+    client.get_repo = get_repo
+    client.resolve_ref = resolve_ref
+    monkeypatch.setattr(async_github_tools, "_get_async_client", lambda: client)
+
+    structure = await async_github_tools.get_repo_structure("owner", "repo", module="src")
+    batch = await async_github_tools.read_files("owner", "repo", ["README.md", "src/app.py"])
+
+    assert list(structure) == ["app.py", "pkg"]
+    assert [f["content"] for f in batch["files"]] == ["# demo\n", "print('hi')\n"]
+
+def test_symbol_index_reads_rest_repos_from_a_bulk_snapshot(tmp_path, monkeypatch):
+    tarball = make_tarball({"README.md": FILES["README.md"], "src/app.py": FILES["src/app.py"]})
+    monkeypatch.setattr(repo_cache, "snapshot_store", None)
+    monkeypatch.setattr(repo_cache, "_bulk_snapshot_store", None)
+    monkeypatch.setattr(repo_cache, "BULK_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(repo_cache, "download_tarball", lambda api, full, sha, token, out: out.write(tarball))
+    monkeypatch.setattr(symbol_index, "SYMBOL_INDEX_SNAPSHOT_MIN_FILES", 1)
+
+    mock_repo = MagicMock()
+    mock_repo.full_name = "owner/bulk"
+    mock_repo.get_git_tree.return_value.truncated = False
+    mock_repo.get_git_tree.return_value.tree = [
+        MagicMock(path=path, type="blob", size=len(data), sha=None) for path, data in FILES.items()
+    ]
+    # Not in the tarball: read through the contents API instead.
+    mock_repo.get_contents.return_value = MagicMock(encoding="base64", decoded_content=FILES["src/pkg/core.py"])
+    client = MagicMock()
+    client.get_repo.return_value = mock_repo
+
+    index = build_symbol_index(github_tools.RestBackend(client), "owner/bulk", "sha-bulk", ContentCache(10**6))
+
+    assert sorted(index["files"]) == ["src/app.py", "src/pkg/core.py"]
+    assert index["stats"]["from_snapshot"] is True and index["failed"] == []
+    mock_repo.get_contents.assert_called_once_with("src/pkg/core.py", ref="sha-bulk")
+    repo_cache._bulk_snapshot_store.close()
+
+
+@pytest.mark.skipif(os.getenv("BULK_SNAPSHOT_DIR"), reason="BULK_SNAPSHOT_DIR is set")
+def test_bulk_snapshots_are_off_unless_configured(monkeypatch):
+    monkeypatch.setattr(repo_cache, "snapshot_store", None)
+    monkeypatch.setattr(repo_cache, "_bulk_snapshot_store", None)
+    monkeypatch.setattr(repo_cache, "download_tarball", MagicMock())
+
+    assert repo_cache.BULK_SNAPSHOT_DIR is None
+    assert repo_cache.get_bulk_snapshot("owner/repo", "sha") is None
+    repo_cache.download_tarball.assert_not_called()
@@ -0,0 +1,74 @@
+from repo_navigator.sub_agents.tools.backends import TreeEntry
+from repo_navigator.sub_agents.tools.structure import (
+    StructureWalk,
+    begin_walk,
+    build_structure_from_tree,
+    format_compact,
+    has_error,
+    is_error,
+    normalize_listing,
+)
+
+LISTINGS = {
+    "": [("file", "README.md", "README.md", 7), ("dir", "src", "src", 0)],
+    "src": [("dir", "pkg", "src/pkg", 0), ("file", "app.py", "src/app.py", 12)],
+    "src/pkg": [("dir", "deep", "src/pkg/deep", 0)],
+}
+
+
+def test_format_compact_listing():
+    structure = {
+        "README.md": {"type": "file", "path": "README.md", "size": 7},
+        "src": {"app.py": {"type": "file", "path": "src/app.py", "size": 12}, "pkg": {"_truncated": True}, "empty": {}},
+    }
+    assert format_compact(structure) == "README.md 7\nsrc/\n app.py 12\n pkg/…\n empty/"
+
+
+def test_format_compact_marks_directories_whose_listing_failed():
+    structure = {"src": {"a": {"_error": "Rate limited"}, "b": {"_error": {"message": "Not found"}}}}
+    assert format_compact(structure) == "src/\n a/ [not listed: Rate limited]\n b/ [not listed: Not found]"
+
+
+def test_error_directory_is_not_a_failed_listing():
+    error_dir = {"error": {"codes.py": {"type": "file", "path": "error/codes.py", "size": 2}}}
+    walk = begin_walk([("dir", "error", "error", 0)], None, 3, "user", "repo")
+    walk.fill([{"error": "Rate limited"}])
+
+    assert not has_error(error_dir) and not is_error(error_dir)
+    assert format_compact(error_dir) == "error/\n codes.py 2"
+    assert walk.root == {"error": {"_error": "Rate limited"}} and has_error(walk.root)
+    assert is_error({"error": "Ref 'x' does not exist."}) and is_error({"error": {"message": "Rate limited"}})
+
+
+def test_walk_matches_structure_built_from_tree():
+    entries = [
+        TreeEntry("README.md", "blob", 7), TreeEntry("src", "tree", None), TreeEntry("src/pkg", "tree", None),
+        TreeEntry("src/pkg/deep", "tree", None), TreeEntry("src/app.py", "blob", 12),
+    ]
+    walk = begin_walk(LISTINGS[""], None, 3, "user", "repo")
+    levels = []
+    while walk.pending:
+        levels.append(walk.pending)
+        walk.fill([LISTINGS[path] for path in walk.pending])
+
+    assert levels == [["src"], ["src/pkg"]]
+    assert walk.root == build_structure_from_tree(entries, "", 3, "user", "repo")
+    assert walk.root["src"]["pkg"] == {"deep": {"_truncated": True}}
+    assert list(walk.root["src"]) == ["pkg", "app.py"]
+
+
+def test_begin_walk_without_anything_to_walk():
+    assert begin_walk({"error": "missing"}, "lib", 3, "user", "repo")["error"]["message"] == "Module 'lib' does not exist."
+    assert begin_walk({"error": "Rate limited"}, None, 3, "user", "repo") == {"error": "Rate limited"}
+    assert begin_walk(LISTINGS[""], None, 0, "user", "repo") == {"_truncated": True}
+    assert isinstance(begin_walk(LISTINGS[""], None, 1, "user", "repo"), StructureWalk)
+
+
+def test_normalize_listing_accepts_json_and_objects():
+    class Item:
+        type, name, path, size = "file", "a.py", "src/a.py", 3
+
+    assert normalize_listing([{"type": "dir", "name": "src", "path": "src"}]) == [("dir", "src", "src", None)]
+    assert normalize_listing([Item()]) == [("file", "a.py", "src/a.py", 3)]
+    assert normalize_listing({"type": "file", "name": "a.py", "path": "src/a.py", "size": 3}) == ("file", "a.py", "src/a.py", 3)
+    assert normalize_listing({"error": "nope"}) == {"error": "nope"}
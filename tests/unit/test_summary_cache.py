@@ -0,0 +1,130 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.adk.tools import AgentTool
+
+from repo_navigator.sub_agents.file_summarizer_agent import file_architecture_summarizer_agent
+from repo_navigator.sub_agents.summary_cache import (
+    CachedAgentTool,
+    SummaryCache,
+    parse_summary_request,
+    question_intent,
+)
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+
+URL = "https://github.com/owner/repo/blob/main/src/app.py"
+
+
+def request(question, url=URL):
+    return {"request": f"{question} for owner:owner repo:repo githuburl:{url}"}
+
+
+@pytest.fixture
+def repo():
+    backend = InMemoryBackend()
+    backend.add_commit("owner/repo", {"src/app.py": b"print('hi')\n"})
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+@pytest.fixture
+def tool_context():
+    context = MagicMock()
+    context.state = {}
+    return context
+
+
+# ---------- request parsing ----------
+def test_parse_summary_request():
+    assert parse_summary_request(request("what is the flow")["request"]) == {
+        "question": "what is the flow", "owner": "owner", "repo": "repo", "ref": "main", "path": "src/app.py",
+    }
+    assert parse_summary_request(request("flow", url="https://github.com/owner/repo")["request"]) is None
+    assert parse_summary_request("summarize app.py") is None
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("what is the flow of batch transcription", "flow"),
+    ("How does the pipeline work?", "flow"),
+    ("which functions does it define", "api"),
+    ("what libraries does it import", "dependencies"),
+    ("which environment settings are read", "config"),
+    ("what is this file about", "overview"),
+    ("is it a rapid prototype", "overview"),
+    # Narrow intents win over the generic "how does ..." of a flow question.
+    ("how does it read its configuration", "config"),
+    ("how do the imports work", "dependencies"),
+    ("how does the client call the api", "api"),
+    # Words that merely contain "work", "run" or "call" are not flow questions.
+    ("what methods does the worker class expose", "api"),
+    ("what does the runtime check do", "overview"),
+    ("is the callback retried", "overview"),
+    ("what happens when a request arrives", "flow"),
+    ("walk me through the steps of a run", "flow"),
+])
+def test_question_intent(question, intent):
+    assert question_intent(question) == intent
+
+
+# ---------- SummaryCache ----------
+def test_summary_cache_expires_and_counts_saved_seconds(tmp_path):
+    now = [1000.0]
+    cache = SummaryCache(ttl=60, max_memory_bytes=1024 * 1024, disk_path=str(tmp_path / "s.sqlite3"),
+                         max_disk_bytes=1024 * 1024, clock=lambda: now[0])
+    key = ("summary", "v", "owner/repo", "sha", "a.py", "flow")
+
+    assert cache.get(key) is None
+    cache.put(key, "File: a.py", llm_seconds=4.5)
+    assert cache.get(key) == "File: a.py"
+
+    # Persisted: a fresh cache on the same file (another worker, a restart) hits too.
+    other = SummaryCache(ttl=60, max_memory_bytes=1024 * 1024, disk_path=str(tmp_path / "s.sqlite3"),
+                         max_disk_bytes=1024 * 1024, clock=lambda: now[0])
+    assert other.get(key) == "File: a.py"
+
+    now[0] += 61
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+    assert stats["llm_seconds_saved"] == 4.5
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+# ---------- CachedAgentTool ----------
+def test_cached_agent_tool_reuses_summary_for_same_commit_path_and_intent(repo, tool_context):
+    cache = SummaryCache(ttl=60, max_memory_bytes=1024 * 1024)
+    tool = CachedAgentTool(file_architecture_summarizer_agent, cache)
+    assert tool.name == "code_summarizer"
+
+    async def run():
+        with patch.object(AgentTool, "run_async", new=AsyncMock(side_effect=["flow summary", "api summary"])) as agent:
+            results = [
+                await tool.run_async(args=request("what is the flow"), tool_context=tool_context),
+                await tool.run_async(args=request("explain the pipeline steps"), tool_context=tool_context),
+                await tool.run_async(args=request("which classes are defined"), tool_context=tool_context),
+            ]
+            return results, agent.await_count
+
+    results, calls = asyncio.run(run())
+
+    assert results == ["flow summary", "flow summary", "api summary"]
+    assert calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_agent_tool_runs_agent_when_key_is_unavailable(repo, tool_context):
+    cache = SummaryCache(ttl=60, max_memory_bytes=1024 * 1024)
+    tool = CachedAgentTool(file_architecture_summarizer_agent, cache)
+
+    async def run():
+        with patch.object(AgentTool, "run_async", new=AsyncMock(return_value="summary")) as agent:
+            for args in (request("flow", url="https://github.com/owner/repo/blob/nope/src/app.py"),
+                         {"request": "summarize app.py"}):
+                await tool.run_async(args=args, tool_context=tool_context)
+                await tool.run_async(args=args, tool_context=tool_context)
+            return agent.await_count
+
+    assert asyncio.run(run()) == 4
+    assert cache.stats()["stores"] == 0
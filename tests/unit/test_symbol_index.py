@@ -0,0 +1,243 @@
+import multiprocessing
+from unittest.mock import MagicMock
+
+import pytest
+
+from repo_navigator.sub_agents.tools import github_tools, symbol_index
+from repo_navigator.sub_agents.tools.backends import InMemoryBackend, register_backend, unregister_backend
+from repo_navigator.sub_agents.tools.cache import ContentCache
+from repo_navigator.sub_agents.tools.symbol_index import build_symbol_index, parse_file, parse_python, search_symbols
+
+APP = b'''"""App module."""
+import os
+from .core import Engine, run as start
+
+__all__ = ["App", "main"]
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+@register
+class App(Base, metaclass=Meta):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def serve(self, port=8080):
+        def handler():
+            pass
+
+
+def main(argv=None) -> int:
+    return 0
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+FILES = {
+    "app/__init__.py": b"",
+    "app/main.py": APP,
+    "app/core.py": b"class Engine:\n    pass\n\ndef run():\n    pass\n",
+    "README.md": b"# not indexed\n",
+}
+
+
+class FlakyBackend(InMemoryBackend):
+    """Rate limited on app/core.py until `rate_limited` is cleared."""
+
+    rate_limited = True
+
+    def read_blob(self, full_name, sha, path):
+        if self.rate_limited and path == "app/core.py":
+            return {"error": {"message": "Rate limited"}}
+        return super().read_blob(full_name, sha, path)
+
+
+class ShalessBackend(InMemoryBackend):
+    """Tree entries without git object ids, like a snapshot or tarball listing."""
+
+    def list_tree(self, full_name, sha):
+        return [e._replace(sha=None) for e in super().list_tree(full_name, sha)]
+
+
+def parse_toy(data: bytes) -> dict:
+    """Parser for ".toy" files: one function symbol per line."""
+    symbols = [{"kind": "function", "qualname": name, "signature": f"def {name}()", "start_line": n, "end_line": n}
+               for n, name in enumerate(data.decode().split(), 1)]
+    return {"symbols": symbols, "imports": [], "exports": None, "main_line": None, "app_objects": []}
+
+
+@pytest.fixture
+def cache():
+    return ContentCache(max_memory_bytes=10 * 1024 * 1024)
+
+
+# ---------- parser ----------
+def test_parse_python_symbols_imports_and_exports():
+    parsed = parse_python(APP)
+    by_name = {s["qualname"]: s for s in parsed["symbols"]}
+
+    assert list(by_name) == ["App", "App.__init__", "App.serve", "App.serve.handler", "main"]
+    assert by_name["App"]["signature"] == "class App(Base, metaclass=Meta)"
+    assert (by_name["App"]["start_line"], by_name["App"]["end_line"]) == (13, 20)  # includes decorator
+    assert by_name["App.__init__"]["kind"] == "method"
+    assert by_name["App.__init__"]["signature"] == "def __init__(self, name: str) -> None"
+    assert by_name["App.serve"]["signature"] == "async def serve(self, port=8080)"
+    assert by_name["App.serve.handler"]["kind"] == "function"
+    assert by_name["main"]["signature"] == "def main(argv=None) -> int"
+
+    assert {"module": "core", "names": ["Engine", "run"], "level": 1, "line": 3} in parsed["imports"]
+    assert {i["module"] for i in parsed["imports"]} == {"os", "core", "ujson", "json"}
+    assert parsed["exports"] == ["App", "main"]
+    assert parsed["main_line"] == 27
+
+
+def test_parse_file_records_syntax_errors():
+    parsed = parse_file("bad.py", b"def broken(:\n")
+    assert parsed["symbols"] == []
+    assert parsed["error"].startswith("SyntaxError")
+
+
+def test_parse_file_records_files_nested_too_deeply():
+    parsed = parse_file("deep.py", b"x = " + b" + ".join([b"1"] * 200_000) + b"\n")
+    assert parsed["symbols"] == []
+    assert parsed["error"] == "RecursionError"
+
+
+def test_registered_parsers_reach_spawned_workers(monkeypatch):
+    monkeypatch.setitem(symbol_index.PARSERS, ".toy", parse_toy)
+    with symbol_index._parser_pool(1, multiprocessing.get_context("spawn")) as pool:
+        parsed = pool.submit(parse_file, "funcs.toy", b"alpha beta").result()
+
+    assert [s["qualname"] for s in parsed["symbols"]] == ["alpha", "beta"]
+
+
+# ---------- index build ----------
+def test_build_index_reuses_unchanged_files_across_commits(cache):
+    backend = InMemoryBackend()
+    first = backend.add_commit("owner/repo", FILES)
+    index = build_symbol_index(backend, "owner/repo", first, cache)
+
+    assert sorted(index["files"]) == ["app/__init__.py", "app/core.py", "app/main.py"]
+    assert index["stats"]["parsed"] == 3 and index["stats"]["reused"] == 0
+
+    second = backend.add_commit("owner/repo", {**FILES, "app/core.py": b"def run(fast=True):\n    pass\n"})
+    updated = build_symbol_index(backend, "owner/repo", second, cache)
+
+    assert updated["stats"]["parsed"] == 1 and updated["stats"]["reused"] == 2
+    assert [s["signature"] for s in updated["files"]["app/core.py"]["symbols"]] == ["def run(fast=True)"]
+    # The whole index is cached per commit.
+    assert build_symbol_index(backend, "owner/repo", first, cache) == index
+
+
+def test_build_index_reuses_files_without_blob_ids_by_content(cache):
+    backend = ShalessBackend()
+    first = backend.add_commit("owner/shaless", FILES)
+    build_symbol_index(backend, "owner/shaless", first, cache)
+
+    second = backend.add_commit("owner/shaless", {**FILES, "app/core.py": b"def run(fast=True):\n    pass\n"})
+    updated = build_symbol_index(backend, "owner/shaless", second, cache)
+
+    assert updated["stats"]["parsed"] == 1 and updated["stats"]["reused"] == 2
+    assert [s["signature"] for s in updated["files"]["app/core.py"]["symbols"]] == ["def run(fast=True)"]
+
+
+def test_build_index_parses_in_process_pool(cache, monkeypatch):
+    monkeypatch.setattr(symbol_index, "SYMBOL_INDEX_POOL_MIN_FILES", 1)
+    monkeypatch.setattr(symbol_index, "SYMBOL_INDEX_WORKERS", 2)
+    backend = InMemoryBackend()
+    files = {f"pkg/mod_{i}.py": f"def f{i}():\n    pass\n".encode() for i in range(6)}
+    sha = backend.add_commit("owner/pool", files)
+
+    index = build_symbol_index(backend, "owner/pool", sha, cache)
+
+    assert index["stats"]["parsed"] == 6
+    assert index["files"]["pkg/mod_4.py"]["symbols"][0]["qualname"] == "f4"
+
+
+def test_build_index_respects_file_limit_and_truncated_trees(cache):
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/repo", FILES)
+    limited = build_symbol_index(backend, "owner/repo", sha, cache, max_files=2)
+    assert limited["truncated"] is True and len(limited["files"]) == 2
+
+    walker = MagicMock()
+    walker.list_tree.return_value = None
+    assert "too large to index" in build_symbol_index(walker, "owner/big", "sha", cache)["error"]["message"]
+
+
+def test_build_index_with_failed_reads_is_not_cached_per_commit(cache):
+    backend = FlakyBackend()
+    sha = backend.add_commit("owner/flaky", FILES)
+    partial = build_symbol_index(backend, "owner/flaky", sha, cache)
+
+    assert partial["failed"] == ["app/core.py"] and partial["stats"]["failed_reads"] == 1
+    assert sorted(partial["files"]) == ["app/__init__.py", "app/main.py"]
+
+    backend.rate_limited = False
+    retried = build_symbol_index(backend, "owner/flaky", sha, cache)
+
+    # Only the failed file is read again; the others come from the per-file cache.
+    assert retried["failed"] == [] and retried["stats"]["parsed"] == 1 and retried["stats"]["reused"] == 2
+    assert sorted(retried["files"]) == ["app/__init__.py", "app/core.py", "app/main.py"]
+
+
+def test_search_ranks_exact_names_first(cache):
+    backend = InMemoryBackend()
+    sha = backend.add_commit("owner/repo", FILES)
+    index = build_symbol_index(backend, "owner/repo", sha, cache)
+
+    matches, more = search_symbols(index, "app")
+    assert [m["qualname"] for m in matches][:1] == ["App"]
+    assert not more
+    assert [m["qualname"] for m in search_symbols(index, "run", kind="function")[0]] == ["run"]
+    assert search_symbols(index, "App", limit=1) == ([{"path": "app/main.py", **index["files"]["app/main.py"]["symbols"][0]}], True)
+
+
+# ---------- find_symbols tool ----------
+@pytest.fixture
+def indexed_repo():
+    backend = InMemoryBackend()
+    backend.add_commit("owner/symbols", FILES)
+    register_backend(backend)
+    yield backend
+    unregister_backend(backend)
+
+
+def test_find_symbols_by_query_and_path(indexed_repo):
+    found = github_tools.find_symbols("owner", "symbols", query="Engine")
+    module = github_tools.find_symbols("owner", "symbols", path="/app/main.py", kind="class")
+
+    assert found["symbols"] == [{
+        "path": "app/core.py", "kind": "class", "qualname": "Engine",
+        "signature": "class Engine", "start_line": 1, "end_line": 2,
+    }]
+    assert found["indexed_files"] == 3
+    assert module["path"] == "app/main.py"
+    assert [s["qualname"] for s in module["symbols"]] == ["App"]
+    assert module["exports"] == ["App", "main"] and module["main_line"] == 27
+
+
+def test_find_symbols_argument_errors(indexed_repo):
+    assert "query" in github_tools.find_symbols("owner", "symbols")["error"]["message"]
+    assert "Unknown kind" in github_tools.find_symbols("owner", "symbols", query="x", kind="var")["error"]["message"]
+    assert "not an indexed source file" in github_tools.find_symbols("owner", "symbols", path="README.md")["error"]["message"]
+
+
+def test_find_symbols_reports_failed_reads():
+    backend = FlakyBackend()
+    # Content of its own, so the shared per-file cache has no parse of it yet.
+    backend.add_commit("owner/flaky-tool", {**FILES, "app/core.py": b"class Flaky:\n    pass\n"})
+    register_backend(backend)
+    try:
+        found = github_tools.find_symbols("owner", "flaky-tool", query="App")
+        unread = github_tools.find_symbols("owner", "flaky-tool", path="app/core.py")
+    finally:
+        unregister_backend(backend)
+
+    assert found["failed_reads"] == 1 and found["indexed_files"] == 2
+    assert "could not be read" in unread["error"]["message"]